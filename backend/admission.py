@@ -0,0 +1,181 @@
+"""
+Admission Control for LLM-Bound Endpoints
+Caps concurrent Gemini work, queues the overflow by priority lane, and rejects
+early (429/503 + Retry-After) when a request could not be served within its budget.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional
+
+from deadlines import get_deadline
+from metrics import metrics
+
+# Lower number = served first
+DEFAULT_LANES = {"interactive": 0, "batch": 1, "background": 2}
+
+
+class AdmissionRejected(Exception):
+    """Request refused before doing any work; carries the HTTP status and Retry-After hint"""
+
+    def __init__(self, status_code: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+# ============================================================================
+# ADMISSION CONTROLLER
+# ============================================================================
+
+class AdmissionController:
+    """
+    Async semaphore with a bounded priority wait queue.
+
+    - At most `max_concurrent` holders at a time.
+    - Up to `max_queue` waiters; beyond that -> 429.
+    - A waiter is refused up front (503) when the estimated wait exceeds the smaller of
+      its lane's max wait and the request deadline, and gives up (503) if it actually does.
+    - Freed slots go to the highest-priority lane first, FIFO within a lane.
+
+    Worker threads take slots with sync_slot(), which queues them on the event loop
+    given to bind_loop() so they share the same cap and lanes as async callers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int = 8,
+        max_queue: int = 64,
+        lane_max_wait: Optional[Dict[str, float]] = None,
+        lanes: Optional[Dict[str, int]] = None
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.lanes = lanes or DEFAULT_LANES
+        self.lane_max_wait = lane_max_wait or {}
+
+        self._in_flight = 0
+        self._waiters: List = []  # heap of (priority, seq, lane, future)
+        self._seq = itertools.count()
+        self._service_time = 1.0  # EWMA of slot hold time (seconds)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        metrics.register_gauge("admission_in_flight", lambda: self._in_flight, controller=name)
+        for lane in self.lanes:
+            metrics.register_gauge(
+                "admission_queue_depth", lambda lane=lane: self.queue_depth(lane), controller=name, lane=lane
+            )
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def queue_depth(self, lane: Optional[str] = None) -> int:
+        return sum(
+            1 for _, _, waiter_lane, future in self._waiters
+            if not future.done() and (lane is None or waiter_lane == lane)
+        )
+
+    def estimated_wait(self, lane: str) -> float:
+        """Expected wait for a new arrival in `lane` given who is already ahead of it"""
+        priority = self.lanes[lane]
+        ahead = sum(1 for p, _, _, future in self._waiters if p <= priority and not future.done())
+        return self._service_time * (ahead + 1) / self.max_concurrent
+
+    @asynccontextmanager
+    async def slot(self, lane: str = "interactive"):
+        await self.acquire(lane)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    @contextmanager
+    def sync_slot(self, lane: str = "batch"):
+        """slot() for code running on a worker thread (blocks the thread, not the loop)"""
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            # No serving loop (scripts, benchmarks) - nothing to share the cap with
+            yield
+            return
+
+        # acquire() gives up on its own after the lane's max wait, so no timeout is needed here
+        asyncio.run_coroutine_threadsafe(self.acquire(lane), loop).result()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            loop.call_soon_threadsafe(self.release, time.perf_counter() - start)
+
+    async def acquire(self, lane: str = "interactive"):
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown admission lane '{lane}'")
+        arrived = time.perf_counter()
+
+        if self._in_flight < self.max_concurrent and self.queue_depth() == 0:
+            self._in_flight += 1
+            self._admitted(lane, 0.0)
+            return
+
+        if self.queue_depth() >= self.max_queue:
+            self._reject(lane, 429, "queue_full", self._service_time * self.max_queue / self.max_concurrent)
+
+        budget = self.lane_max_wait.get(lane, 30.0)
+        deadline = get_deadline()
+        if deadline is not None:
+            budget = min(budget, deadline.remaining())
+
+        estimate = self.estimated_wait(lane)
+        if estimate > budget:
+            self._reject(lane, 503, "wait_exceeds_deadline", estimate)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (self.lanes[lane], next(self._seq), lane, future))
+        try:
+            await asyncio.wait_for(future, timeout=budget)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # release() handed us the slot just as we gave up (timed out, or the
+                # caller was cancelled) - pass it on instead of leaking it
+                self._hand_off()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._reject(lane, 503, "queue_timeout", self.estimated_wait(lane))
+
+        self._admitted(lane, time.perf_counter() - arrived)
+
+    def release(self, held_for: float = 0.0):
+        self._service_time = 0.8 * self._service_time + 0.2 * held_for
+        self._hand_off()
+
+    # ------------------------------------------------------------------
+
+    def _hand_off(self):
+        # Hand the slot straight to the next live waiter (skipping timed-out ones)
+        while self._waiters:
+            _, _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(True)
+                return
+
+        self._in_flight -= 1
+
+    def _admitted(self, lane: str, waited: float):
+        metrics.inc("admission_admitted_total", controller=self.name, lane=lane)
+        metrics.observe("admission_wait_seconds", waited, controller=self.name, lane=lane)
+
+    def _reject(self, lane: str, status_code: int, reason: str, retry_after: float):
+        metrics.inc("admission_rejected_total", controller=self.name, lane=lane, reason=reason)
+        raise AdmissionRejected(status_code, max(1, math.ceil(retry_after)), reason)
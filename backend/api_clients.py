@@ -4,14 +4,29 @@ Integrates with Reddit, Twitter, YouTube, and News APIs
 """
 
 import os
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime
 import logging
 
+from corpus import comment_corpus
+from hashtag_index import hashtag_index
+from subreddit_router import subreddit_router
+from watermarks import watermarks
+from deadlines import DeadlineSession, check_deadline, deadline_expired, get_deadline
+from metrics import metrics
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default per-call timeout for upstream APIs (shortened further by the request deadline)
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT_SECONDS", "10"))
+
+# Lean Reddit comment fetching: only the needed top-level comments, parsed from raw JSON
+REDDIT_LEAN_COMMENTS = os.getenv("REDDIT_LEAN_COMMENTS", "true").lower() == "true"
+
 # ============================================================================
 # REDDIT API CLIENT (Using PRAW)
 # ============================================================================
@@ -25,7 +40,9 @@ class RedditClient:
             self.client = praw.Reddit(
                 client_id=os.getenv("REDDIT_CLIENT_ID"),
                 client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
-                user_agent="SocialMediaRewriter/1.0"
+                user_agent="SocialMediaRewriter/1.0",
+                timeout=UPSTREAM_TIMEOUT,
+                requestor_kwargs={"session": DeadlineSession(UPSTREAM_TIMEOUT)}
             )
             self.available = True
             logger.info("✅ Reddit API connected")
@@ -55,6 +72,7 @@ class RedditClient:
                     "subreddit": subreddit
                 })
             
+            comment_corpus.record("reddit", "post", posts)
             logger.info(f"✅ Fetched {len(posts)} posts from r/{subreddit}")
             return posts
         
@@ -72,45 +90,22 @@ class RedditClient:
             
             # If it looks like a post ID (alphanumeric, shorter), fetch from that post
             if len(subreddit) < 10 and subreddit.isalnum():
-                submission = self.client.submission(id=subreddit)
-                submission.comment_sort = "top"
-                submission.comments.replace_more(limit=0)
-                
-                for comment in submission.comments[:limit]:
-                    comments.append({
-                        "id": comment.id,
-                        "text": comment.body,
-                        "body": comment.body,
-                        "score": comment.score,
-                        "author": str(comment.author),
-                        "created_utc": comment.created_utc,
-                        "post_title": submission.title
-                    })
+                comments = self._post_comments(self.client.submission(id=subreddit), limit)
             else:
                 # Otherwise, get comments from recent hot posts in the subreddit
                 subreddit_obj = self.client.subreddit(subreddit)
                 
                 for post in subreddit_obj.hot(limit=3):  # Get from 3 posts
-                    post.comment_sort = "top"
-                    post.comments.replace_more(limit=0)
+                    if deadline_expired():
+                        break
                     
-                    for comment in post.comments[:limit]:
-                        if len(comments) >= limit:
-                            break
-                        comments.append({
-                            "id": comment.id,
-                            "text": comment.body,
-                            "body": comment.body,
-                            "score": comment.score,
-                            "author": str(comment.author),
-                            "created_utc": comment.created_utc,
-                            "post_title": post.title,
-                            "subreddit": subreddit
-                        })
+                    for comment in self._post_comments(post, limit - len(comments)):
+                        comments.append({**comment, "subreddit": subreddit})
                     
                     if len(comments) >= limit:
                         break
             
+            comment_corpus.record("reddit", "comment", comments)
             logger.info(f"✅ Fetched {len(comments)} comments")
             return comments
         
@@ -118,68 +113,115 @@ class RedditClient:
             logger.error(f"❌ Error fetching comments: {e}")
             return []
     
+    def _post_comments(self, post, limit: int) -> List[Dict[str, Any]]:
+        """Top `limit` top-level comments of a post (lean raw-JSON fetch unless disabled)"""
+        start = time.perf_counter()
+        mode = "forest"
+        if REDDIT_LEAN_COMMENTS:
+            try:
+                comments = self._lean_post_comments(post.id, limit)
+                mode = "lean"
+            except (AttributeError, TypeError) as e:
+                # PRAW's private session API changed under us - use the public comment forest
+                logger.warning(f"Lean Reddit comment fetch unavailable, using the comment forest: {e}")
+        if mode == "forest":
+            comments = self._forest_post_comments(post, limit)
+        metrics.observe("reddit_post_comments_seconds", time.perf_counter() - start, mode=mode)
+        return comments
+    
+    def _forest_post_comments(self, post, limit: int) -> List[Dict[str, Any]]:
+        """Top-level comments through PRAW's public CommentForest (MoreComments dropped, not expanded)"""
+        post.comment_limit = limit
+        post.comment_sort = "top"
+        post.comments.replace_more(limit=0)
+        return [
+            {
+                "id": comment.id,
+                "text": comment.body,
+                "body": comment.body,
+                "score": comment.score,
+                "author": str(comment.author),
+                "created_utc": comment.created_utc,
+                "post_title": post.title,
+                "subreddit": str(post.subreddit)
+            }
+            for comment in post.comments[:limit]
+        ]
+    
+    def _lean_post_comments(self, post_id: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Ask Reddit for only `limit` top-level comments (depth=1) and build records straight
+        from the raw JSON - no CommentForest objects and no MoreComments expansion.
+        """
+        # prawcore's session (private in PRAW, pinned in requirements.txt) returns the
+        # decoded JSON without PRAW's objectification
+        post_listing, comment_listing = self.client._core.request(
+            "GET", f"/comments/{post_id}",
+            params={"limit": limit, "depth": 1, "sort": "top", "raw_json": 1},
+            timeout=UPSTREAM_TIMEOUT
+        )
+        post = post_listing["data"]["children"][0]["data"]
+        
+        comments = []
+        for child in comment_listing["data"]["children"]:
+            if child["kind"] != "t1":  # "more" placeholders are skipped, never expanded
+                continue
+            comment = child["data"]
+            comments.append({
+                "id": comment["id"],
+                "text": comment["body"],
+                "body": comment["body"],
+                "score": comment["score"],
+                "author": comment.get("author") or "[deleted]",
+                "created_utc": comment["created_utc"],
+                "post_title": post["title"],
+                "subreddit": post["subreddit"]
+            })
+            if len(comments) >= limit:
+                break
+        return comments
+    
     def search_and_get_comments(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get comments from relevant subreddits based on the query topic"""
         if not self.available:
             return []
         
+        comments = list(self.iter_search_comments(query, limit))
+        logger.info(f"✅ Fetched {len(comments)} comments for query '{query}'")
+        return comments
+    
+    def iter_search_comments(self, query: str, limit: int = 10) -> Iterator[Dict[str, Any]]:
+        """Yield comments for the query post by post, as soon as each post's comments are loaded"""
+        if not self.available:
+            return
+        
+        count = 0
         try:
-            comments = []
-            
-            # Map common queries to relevant subreddits
-            query_lower = query.lower()
-            relevant_subreddits = []
-            
-            # Topic-based subreddit mapping
-            if any(word in query_lower for word in ["tech", "technology", "ai", "artificial", "computer", "software", "programming", "code"]):
-                relevant_subreddits = ["technology", "programming", "learnprogramming", "AskReddit"]
-            elif any(word in query_lower for word in ["game", "gaming", "video game"]):
-                relevant_subreddits = ["gaming", "Games", "AskReddit"]
-            elif any(word in query_lower for word in ["movie", "film", "tv", "show"]):
-                relevant_subreddits = ["movies", "television", "AskReddit"]
-            elif any(word in query_lower for word in ["science", "research", "study"]):
-                relevant_subreddits = ["science", "askscience", "AskReddit"]
-            elif any(word in query_lower for word in ["news", "politics", "world"]):
-                relevant_subreddits = ["news", "worldnews", "AskReddit"]
-            elif any(word in query_lower for word in ["book", "read", "novel"]):
-                relevant_subreddits = ["books", "literature", "AskReddit"]
-            else:
-                # Default subreddits for general topics
-                relevant_subreddits = ["AskReddit", "todayilearned", "explainlikeimfive"]
-            
-            # Get comments from hot posts in these subreddits
-            for subreddit_name in relevant_subreddits[:3]:  # Limit to 3 subreddits
-                if len(comments) >= limit:
+            # Get comments from hot posts in the best-scoring subreddits for this query
+            for subreddit_name in subreddit_router.route(query, limit=3):
+                if count >= limit or deadline_expired():
                     break
                 
+                wanted, found = limit - count, 0
                 try:
                     subreddit = self.client.subreddit(subreddit_name)
                     
                     # Get hot posts (doesn't require search)
                     for post in subreddit.hot(limit=2):
-                        if len(comments) >= limit:
+                        if count >= limit or deadline_expired():
                             break
                         
                         try:
-                            post.comment_sort = "top"
-                            post.comments.replace_more(limit=0)
-                            
-                            comments_needed = limit - len(comments)
-                            for comment in post.comments[:comments_needed]:
-                                if len(comment.body) > 20:  # Only meaningful comments
-                                    comments.append({
-                                        "id": comment.id,
-                                        "text": comment.body,
-                                        "body": comment.body,
-                                        "score": comment.score,
-                                        "author": str(comment.author),
-                                        "created_utc": comment.created_utc,
-                                        "post_title": post.title,
-                                        "subreddit": str(post.subreddit),
-                                        "query": query
-                                    })
+                            comments_needed = limit - count
+                            for comment in self._post_comments(post, comments_needed):
+                                if len(comment["body"]) > 20:  # Only meaningful comments
+                                    record = {**comment, "query": query}
+                                    comment_corpus.record("reddit", "comment", [record], query)
+                                    count += 1
+                                    found += 1
+                                    yield record
                                     
-                                    if len(comments) >= limit:
+                                    if count >= limit:
                                         break
                                         
                         except Exception as comment_error:
@@ -188,14 +230,13 @@ class RedditClient:
                             
                 except Exception as subreddit_error:
                     logger.warning(f"Skipping subreddit {subreddit_name}: {subreddit_error}")
-                    continue
-            
-            logger.info(f"✅ Fetched {len(comments)} comments for query '{query}' from {relevant_subreddits}")
-            return comments
+                
+                # Teach the router how well this subreddit answered the query (not when cut short by the deadline)
+                if not deadline_expired():
+                    subreddit_router.record(query, subreddit_name, found, wanted)
         
         except Exception as e:
             logger.error(f"❌ Error searching Reddit: {e}")
-            return []
 
 
 # ============================================================================
@@ -211,6 +252,7 @@ class TwitterClient:
             bearer_token = os.getenv("TWITTER_BEARER_TOKEN")
             if bearer_token:
                 self.client = tweepy.Client(bearer_token=bearer_token)
+                self.client.session = DeadlineSession(UPSTREAM_TIMEOUT)
                 self.available = True
                 logger.info("✅ Twitter API connected")
             else:
@@ -230,53 +272,126 @@ class TwitterClient:
         logger.warning("⚠️  Trending topics require Twitter API elevated access")
         return []
     
-    def search_recent_tweets(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
-        """Search recent tweets by query"""
+    def search_recent_tweets(self, query: str, max_results: int = 10,
+                             since_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Search recent tweets by query (only tweets newer than `since_id` if given)"""
         if not self.available:
             return []
         
         try:
-            tweets = self.client.search_recent_tweets(
-                query=query,
-                max_results=max_results,
-                tweet_fields=["created_at", "public_metrics", "author_id"]
-            )
-            
-            results = []
-            if tweets.data:
-                for tweet in tweets.data:
-                    results.append({
-                        "id": tweet.id,
-                        "text": tweet.text,
-                        "created_at": str(tweet.created_at),
-                        "metrics": {
-                            "likes": tweet.public_metrics.get("like_count", 0),
-                            "retweets": tweet.public_metrics.get("retweet_count", 0),
-                            "replies": tweet.public_metrics.get("reply_count", 0)
-                        }
-                    })
-            
+            results = self._search_page(query, max_results, since_id=since_id)
             logger.info(f"✅ Found {len(results)} tweets for '{query}'")
             return results
         
         except Exception as e:
             logger.error(f"❌ Twitter search error: {e}")
             return []
+    
+    def _search_page(self, query: str, max_results: int, since_id: Optional[int] = None,
+                     until_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """One page of newest-first results strictly between `since_id` and `until_id` (raises on errors)"""
+        tweets = self.client.search_recent_tweets(
+            query=query,
+            max_results=max_results,
+            since_id=since_id,
+            until_id=until_id,
+            tweet_fields=["created_at", "public_metrics", "author_id"]
+        )
+        
+        results = []
+        if tweets.data:
+            for tweet in tweets.data:
+                results.append({
+                    "id": tweet.id,
+                    "text": tweet.text,
+                    "created_at": str(tweet.created_at),
+                    "metrics": {
+                        "likes": tweet.public_metrics.get("like_count", 0),
+                        "retweets": tweet.public_metrics.get("retweet_count", 0),
+                        "replies": tweet.public_metrics.get("reply_count", 0)
+                    }
+                })
+        
+        comment_corpus.record("twitter", "tweet", results, query)
+        return results
+    
+    def poll_recent_tweets(self, query: str, max_results: int = 10, max_pages: int = 5) -> Dict[str, Any]:
+        """
+        Fetch only tweets newer than the last poll (since_id) and merge them into earlier
+        results. A full page means there may be more: we page backwards with until_id, and
+        if more than `max_pages` pages are new, the gap is saved and filled on the next poll.
+        """
+        if not self.available:
+            return {"new": 0, "watermark": {}, "items": []}
+        
+        source = f"twitter:search:{query}"
+        cursor = watermarks.cursor(source)
+        since_id = cursor.get("since_id")
+        new, pages = [], 0
+        
+        def fetch_until(until_id, stop_at):
+            """Page backwards from `until_id` (None = newest) to `stop_at`; returns the id to resume below"""
+            nonlocal pages
+            while pages < max_pages:
+                tweets = self._search_page(query, max_results, since_id=stop_at, until_id=until_id)
+                pages += 1
+                new.extend(tweets)
+                if not stop_at or len(tweets) < max_results:
+                    return None
+                until_id = min(tweet["id"] for tweet in tweets)
+            return until_id
+        
+        try:
+            gap_until_id = cursor.get("gap_until_id")
+            if gap_until_id:
+                # Finish the gap left by the previous poll first
+                gap_until_id = fetch_until(gap_until_id, cursor.get("gap_since_id"))
+            
+            resume_id = fetch_until(None, since_id) if pages < max_pages else None
+        except Exception as e:
+            # Keep the old cursor - moving it past tweets we never got would lose them
+            logger.error(f"❌ Error polling tweets for '{query}': {e}")
+            return {"new": 0, "watermark": cursor, "items": []}
+        
+        state = {"since_id": max((tweet["id"] for tweet in new), default=since_id)}
+        if resume_id:
+            state.update(gap_until_id=resume_id, gap_since_id=since_id)
+        elif gap_until_id:
+            state.update(gap_until_id=gap_until_id, gap_since_id=cursor.get("gap_since_id"))
+        
+        items = watermarks.merge(source, state, new, sort_key="id", full_refresh=not cursor)
+        logger.info(f"✅ Polled {len(new)} new tweets for '{query}' ({pages} pages)")
+        return {"new": len(new), "watermark": state, "items": items}
 
 
 # ============================================================================
 # YOUTUBE API CLIENT
 # ============================================================================
 
+def video_text(item: Dict[str, Any]) -> str:
+    """Title + description of a videos().list item, for the hashtag index"""
+    snippet = item.get("snippet", {})
+    return f"{snippet.get('title', '')}\n{snippet.get('description', '')}"
+
+
 class YouTubeClient:
-    """Fetch video comments and trending videos from YouTube"""
+    """
+    Fetch video comments and trending videos from YouTube.
+
+    The discovery resource is shared, but httplib2.Http is not thread-safe and this client
+    is called from many threads at once (request handlers, exports, the sampler), so every
+    request executes on an Http object owned by the calling thread.
+    """
     
     def __init__(self):
+        self._local = threading.local()
         try:
             from googleapiclient.discovery import build
+            import httplib2
             api_key = os.getenv("YOUTUBE_API_KEY")
             if api_key:
-                self.client = build("youtube", "v3", developerKey=api_key)
+                self.client = build("youtube", "v3", developerKey=api_key,
+                                    http=httplib2.Http(timeout=UPSTREAM_TIMEOUT))
                 self.available = True
                 logger.info("✅ YouTube API connected")
             else:
@@ -286,6 +401,19 @@ class YouTubeClient:
             self.available = False
             logger.warning(f"⚠️  YouTube API unavailable: {e}")
     
+    def _execute(self, request):
+        """Execute a googleapiclient request within the current request deadline"""
+        import httplib2
+        check_deadline("YouTube API call")
+        deadline = get_deadline()
+        if deadline and deadline.remaining() < UPSTREAM_TIMEOUT:
+            return request.execute(http=httplib2.Http(timeout=deadline.timeout()))
+        
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = self._local.http = httplib2.Http(timeout=UPSTREAM_TIMEOUT)
+        return request.execute(http=http)
+    
     def get_trending_videos(self, region_code: str = "US", max_results: int = 10) -> List[Dict[str, Any]]:
         """Fetch trending videos"""
         if not self.available:
@@ -298,7 +426,7 @@ class YouTubeClient:
                 regionCode=region_code,
                 maxResults=max_results
             )
-            response = request.execute()
+            response = self._execute(request)
             
             videos = []
             for item in response.get("items", []):
@@ -312,6 +440,8 @@ class YouTubeClient:
                     "published_at": item["snippet"]["publishedAt"]
                 })
             
+            comment_corpus.record("youtube", "video", videos)
+            hashtag_index.observe(video_text(item) for item in response.get("items", []))
             logger.info(f"✅ Fetched {len(videos)} trending videos")
             return videos
         
@@ -333,7 +463,7 @@ class YouTubeClient:
                 maxResults=max_results,
                 order="relevance"
             )
-            search_response = search_request.execute()
+            search_response = self._execute(search_request)
             
             video_ids = [item["id"]["videoId"] for item in search_response.get("items", [])]
             
@@ -345,7 +475,7 @@ class YouTubeClient:
                 part="snippet,statistics",
                 id=",".join(video_ids)
             )
-            videos_response = videos_request.execute()
+            videos_response = self._execute(videos_request)
             
             videos = []
             for item in videos_response.get("items", []):
@@ -359,6 +489,8 @@ class YouTubeClient:
                     "published_at": item["snippet"]["publishedAt"]
                 })
             
+            comment_corpus.record("youtube", "video", videos, query)
+            hashtag_index.observe(video_text(item) for item in videos_response.get("items", []))
             logger.info(f"✅ Found {len(videos)} videos for '{query}'")
             return videos
         
@@ -371,31 +503,121 @@ class YouTubeClient:
         if not self.available:
             return []
         
+        comments = []
         try:
-            request = self.client.commentThreads().list(
-                part="snippet",
-                videoId=video_id,
-                maxResults=max_results,
-                order="relevance"
-            )
-            response = request.execute()
-            
-            comments = []
-            for item in response.get("items", []):
-                comment = item["snippet"]["topLevelComment"]["snippet"]
-                comments.append({
-                    "text": comment["textDisplay"],
-                    "author": comment["authorDisplayName"],
-                    "likes": comment["likeCount"],
-                    "published_at": comment["publishedAt"]
-                })
-            
+            comments.extend(self.iter_video_comments(video_id, max_items=max_results))
             logger.info(f"✅ Fetched {len(comments)} comments from video {video_id}")
-            return comments
-        
         except Exception as e:
             logger.error(f"❌ Error fetching comments: {e}")
-            return []
+        return comments
+    
+    def iter_video_comments(self, video_id: str, max_items: Optional[int] = None,
+                            max_pages: Optional[int] = None, order: str = "relevance",
+                            page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily follow nextPageToken: the next commentThreads page is requested only once
+        the previous one has been consumed. Stops at `max_items`/`max_pages`, on the last
+        page, or when the request deadline expires.
+        """
+        if not self.available:
+            return
+        
+        produced, pages, page_token = 0, 0, None
+        while max_pages is None or pages < max_pages:
+            if deadline_expired():
+                return
+            size = min(page_size, 100) if max_items is None else min(page_size, 100, max_items - produced)
+            comments, page_token = self._comment_page(video_id, size, order=order, page_token=page_token)
+            pages += 1
+            metrics.inc("paginated_pages_total", source="youtube_comments")
+            for comment in comments:
+                yield comment
+                produced += 1
+                if max_items is not None and produced >= max_items:
+                    return
+            if not page_token:
+                return
+    
+    def _comment_page(self, video_id: str, max_results: int, order: str = "relevance",
+                      page_token: Optional[str] = None):
+        """One commentThreads page -> (comments, nextPageToken)"""
+        request = self.client.commentThreads().list(
+            part="snippet",
+            videoId=video_id,
+            maxResults=max_results,
+            order=order,
+            pageToken=page_token
+        )
+        response = self._execute(request)
+        
+        comments = []
+        for item in response.get("items", []):
+            comment = item["snippet"]["topLevelComment"]["snippet"]
+            comments.append({
+                "id": item["id"],
+                "video_id": video_id,
+                "text": comment["textDisplay"],
+                "author": comment["authorDisplayName"],
+                "likes": comment["likeCount"],
+                "published_at": comment["publishedAt"]
+            })
+        
+        comment_corpus.record("youtube", "comment", comments)
+        hashtag_index.observe(comment["text"] for comment in comments)
+        return comments, response.get("nextPageToken")
+    
+    def poll_video_comments(self, video_id: str, max_results: int = 20, max_pages: int = 5) -> Dict[str, Any]:
+        """
+        Fetch only comments published since the last poll (newest first, stopping at the
+        saved publishedAt watermark) and merge them into earlier results. If more than
+        `max_pages` pages are new, the page token where we stopped is saved and the gap
+        is filled on the next poll.
+        """
+        if not self.available:
+            return {"new": 0, "watermark": {}, "items": []}
+        
+        source = f"youtube:comments:{video_id}"
+        cursor = watermarks.cursor(source)
+        latest = cursor.get("latest_published_at")
+        new, pages = [], 0
+        
+        def fetch_until(page_token, stop_at):
+            """Page through newest-first comments until `stop_at`; returns the token to resume from"""
+            nonlocal pages
+            while pages < max_pages:
+                comments, next_token = self._comment_page(video_id, max_results, order="time", page_token=page_token)
+                pages += 1
+                fresh = [c for c in comments if not stop_at or c["published_at"] > stop_at]
+                new.extend(fresh)
+                if not stop_at or len(fresh) < len(comments) or not next_token:
+                    return None
+                page_token = next_token
+            return page_token
+        
+        try:
+            gap_token = cursor.get("gap_token")
+            if gap_token:
+                # Finish the gap left by the previous poll first
+                try:
+                    gap_token = fetch_until(gap_token, cursor.get("gap_until"))
+                except Exception as e:
+                    logger.warning(f"Dropping stale YouTube page token for {video_id}: {e}")
+                    gap_token = None
+            
+            resume_token = fetch_until(None, latest) if pages < max_pages else None
+        except Exception as e:
+            logger.error(f"❌ Error polling comments: {e}")
+            return {"new": 0, "watermark": cursor, "items": []}
+        
+        state = {"latest_published_at": max((c["published_at"] for c in new), default=latest)}
+        if resume_token:
+            state.update(gap_token=resume_token, gap_until=latest)
+        elif gap_token:
+            state.update(gap_token=gap_token, gap_until=cursor.get("gap_until"))
+        
+        items = watermarks.merge(source, state, new, sort_key="published_at", full_refresh=not cursor)
+        logger.info(f"✅ Polled {len(new)} new comments from video {video_id} ({pages} pages)")
+        return {"new": len(new), "watermark": state, "items": items}
 
 
 # ============================================================================
@@ -410,7 +632,7 @@ class NewsAPIClient:
             from newsapi import NewsApiClient
             api_key = os.getenv("NEWS_API_KEY")
             if api_key:
-                self.client = NewsApiClient(api_key=api_key)
+                self.client = NewsApiClient(api_key=api_key, session=DeadlineSession(UPSTREAM_TIMEOUT))
                 self.available = True
                 logger.info("✅ News API connected")
             else:
@@ -0,0 +1,81 @@
+"""
+Benchmark: LinearPipeline vs LangGraph per-request overhead
+
+Runs the real rewrite nodes with the Gemini call swapped for mock_rewrite,
+so the numbers measure executor overhead rather than network latency.
+
+Usage:
+    python benchmark_pipeline.py [iterations]
+"""
+
+import sys
+import time
+import statistics
+
+import main
+from pipeline import LinearPipeline
+
+
+def offline_generate_node(state):
+    state["rewritten"] = main.mock_rewrite(state["comment"], state["tone"])
+    state["model_used"] = "benchmark-mock"
+    return state
+
+
+def noop_node(state):
+    return state
+
+
+def make_state():
+    return main.build_initial_state(
+        "This update broke everything and the support team is useless",
+        "supportive",
+        platform="youtube"
+    )
+
+
+def time_executor(executor, iterations):
+    executor.invoke(make_state())  # warm-up
+    samples = []
+    for _ in range(iterations):
+        state = make_state()
+        start = time.perf_counter()
+        executor.invoke(state)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": statistics.mean(samples),
+        "p50_us": samples[len(samples) // 2],
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    }
+
+
+def run(iterations: int = 2000):
+    real_nodes = [
+        (name, offline_generate_node if name == "generate_rewrite" else fn)
+        for name, fn in main.REWRITE_PIPELINE_NODES
+    ]
+    noop_nodes = [(name, noop_node) for name, _ in main.REWRITE_PIPELINE_NODES]
+
+    scenarios = {
+        "no-op nodes (pure executor overhead)": noop_nodes,
+        "real nodes (offline LLM)": real_nodes,
+    }
+
+    print(f"Iterations per scenario: {iterations}\n")
+    for label, nodes in scenarios.items():
+        results = {
+            "langgraph": time_executor(main.create_rewrite_workflow(nodes), iterations),
+            "linear": time_executor(LinearPipeline(nodes), iterations),
+        }
+        print(label)
+        for executor, stats in results.items():
+            print(f"  {executor:<10} mean {stats['mean_us']:9.1f} us   "
+                  f"p50 {stats['p50_us']:9.1f} us   p99 {stats['p99_us']:9.1f} us")
+        saved = results["langgraph"]["mean_us"] - results["linear"]["mean_us"]
+        print(f"  linear saves {saved:.1f} us per request "
+              f"({results['langgraph']['mean_us'] / results['linear']['mean_us']:.1f}x)\n")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
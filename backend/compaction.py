@@ -0,0 +1,196 @@
+"""
+Input Compaction
+Normalizes a comment before it goes into the LLM prompt: decodes HTML entities, strips
+HTML/markdown markup, swaps URLs and quoted blocks for short placeholders and trims the
+text to a token budget. Placeholders are put back into the model's output afterwards.
+"""
+
+import html
+import math
+import re
+import secrets
+from typing import Any, Dict, List
+
+# Rough token estimate for Gemini-style tokenizers (~4 characters per token)
+CHARS_PER_TOKEN = 4
+
+HTML_LINK_RE = re.compile(r"<a\s[^>]*?href=\"([^\"]*)\"[^>]*>(.*?)</a>", re.IGNORECASE | re.DOTALL)
+HTML_BREAK_RE = re.compile(r"<br\s*/?>|</p>", re.IGNORECASE)
+HTML_TAG_RE = re.compile(r"</?[a-zA-Z][^>]*>")
+MD_LINK_RE = re.compile(r"!?\[([^\]]*)\]\((\S+?)\)")
+MD_HEADER_RE = re.compile(r"^#{1,6}\s+", re.MULTILINE)
+# Markers must stand outside words, so "2*3*4" and snake_case identifiers survive
+MD_EMPHASIS_RE = re.compile(r"(?<!\w)(\*\*|__|~~|\*|`)(?=\S)(.+?)(?<=\S)\1(?!\w)")
+MD_SPOILER_RE = re.compile(r">!(.+?)!<")
+URL_RE = re.compile(r"(?:https?://|www\.)[^\s<>\"'\]]+[^\s<>\"'\].,;:!?)]")
+PLACEHOLDER_RE = re.compile(r"\[(?:URL|QUOTE)\d+-([0-9a-f]+)\]")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+# ============================================================================
+# NORMALIZATION
+# ============================================================================
+
+def _strip_markup(text: str) -> str:
+    """HTML (YouTube textDisplay) and markdown (Reddit) down to plain text"""
+    # Link text is what the reader sees (timestamps, #hashtags, @mentions); keep the URL only if it *is* the text
+    text = HTML_LINK_RE.sub(lambda m: m.group(1) if URL_RE.fullmatch(m.group(2).strip()) else m.group(2), text)
+    text = HTML_BREAK_RE.sub("\n", text)
+    text = HTML_TAG_RE.sub("", text)
+
+    text = MD_LINK_RE.sub(lambda m: f"{m.group(1)} {m.group(2)}".strip(), text)
+    text = MD_SPOILER_RE.sub(r"\1", text)
+    text = MD_HEADER_RE.sub("", text)
+    text = MD_EMPHASIS_RE.sub(_unemphasize, text)
+    return text
+
+def _unemphasize(match) -> str:
+    # __name__ is a Python dunder far more often than bold text
+    if match.group(1) == "__" and match.group(2).isidentifier():
+        return match.group(0)
+    return match.group(2)
+
+def _collapse_quotes(text: str, placeholders: Dict[str, str], nonce: str) -> str:
+    """Replace each run of "> quoted" lines with one [QUOTEn-nonce] placeholder"""
+    lines, quote = [], []
+
+    def flush():
+        if quote:
+            key = f"[QUOTE{sum(k.startswith('[QUOTE') for k in placeholders) + 1}-{nonce}]"
+            placeholders[key] = "\n".join(quote)
+            lines.append(key)
+            quote.clear()
+
+    for line in text.split("\n"):
+        if line.lstrip().startswith(">"):
+            quote.append(line.strip())
+        else:
+            flush()
+            lines.append(line)
+    flush()
+    return "\n".join(lines)
+
+def _replace_urls(text: str, placeholders: Dict[str, str], nonce: str) -> str:
+    """Swap every URL for [URLn-nonce] (the same URL always gets the same placeholder)"""
+    by_url: Dict[str, str] = {}
+
+    def replace(match):
+        url = match.group(0)
+        if url not in by_url:
+            by_url[url] = f"[URL{len(by_url) + 1}-{nonce}]"
+            placeholders[by_url[url]] = url
+        return by_url[url]
+
+    return URL_RE.sub(replace, text)
+
+def _collapse_whitespace(text: str) -> str:
+    text = re.sub(r"[ \t\u00a0]+", " ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+# ============================================================================
+# TRUNCATION
+# ============================================================================
+
+def truncate_to_budget(text: str, max_tokens: int) -> str:
+    """
+    Keep whole sentences from the start (~70% of the budget) and the end (~30%), joined
+    by an ellipsis - openings and conclusions carry most of a comment's point.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+
+    sentences = [s for s in SENTENCE_RE.split(text) if s.strip()]
+    head: List[str] = []
+    used = 0
+    for sentence in sentences:
+        if used + len(sentence) + 1 > max_chars * 0.7:
+            break
+        head.append(sentence)
+        used += len(sentence) + 1
+
+    if not head:
+        # One very long first sentence - cut it at a word boundary
+        cut = text[:int(max_chars * 0.7)].rsplit(" ", 1)[0]
+        head, used = [cut], len(cut)
+
+    tail: List[str] = []
+    for sentence in reversed(sentences[len(head):]):
+        if used + len(sentence) + 1 > max_chars - 2:
+            break
+        tail.insert(0, sentence)
+        used += len(sentence) + 1
+
+    return " ".join(head) + " … " + " ".join(tail) if tail else " ".join(head) + " …"
+
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+
+def compact_input(text: str, max_tokens: int) -> Dict[str, Any]:
+    """
+    Compacted prompt text plus what is needed to undo it:
+    {"text", "placeholders": {"[URL1-3fa9]": "https://..."}, "stats": {...}}
+    Placeholders carry a per-call nonce so a literal "[URL1]" typed by the user is left alone.
+    """
+    placeholders: Dict[str, str] = {}
+    nonce = secrets.token_hex(2)
+    # Quotes are collapsed before markup is stripped so they are restored exactly as written
+    compacted = html.unescape(text)
+    compacted = _collapse_quotes(compacted, placeholders, nonce)
+    compacted = _strip_markup(compacted)
+    compacted = _replace_urls(compacted, placeholders, nonce)
+    compacted = _collapse_whitespace(compacted)
+
+    truncated = estimate_tokens(compacted) > max_tokens
+    if truncated:
+        compacted = truncate_to_budget(compacted, max_tokens)
+    # Placeholders cut away by truncation are not restored later
+    placeholders = {key: value for key, value in placeholders.items() if key in compacted}
+
+    original_tokens = estimate_tokens(text)
+    prompt_tokens = estimate_tokens(compacted)
+    return {
+        "text": compacted or text.strip(),
+        "placeholders": placeholders,
+        "stats": {
+            "original_tokens": original_tokens,
+            "prompt_tokens": prompt_tokens,
+            "tokens_saved": max(0, original_tokens - prompt_tokens),
+            "placeholders": len(placeholders),
+            "truncated": truncated
+        }
+    }
+
+def restore_placeholders(text: str, placeholders: Dict[str, str]) -> str:
+    """
+    Put URLs back where the model left their placeholders (re-attaching dropped ones at
+    the end). Quoted blocks always go back on top, as their own paragraphs.
+    """
+    if not placeholders:
+        return text
+
+    nonces = {match.group(1) for match in map(PLACEHOLDER_RE.fullmatch, placeholders) if match}
+    quotes, missing_urls = [], []
+    for key, value in placeholders.items():
+        if key.startswith("[QUOTE"):
+            quotes.append(value)
+        elif key in text:
+            text = text.replace(key, value)
+        else:
+            missing_urls.append(value)
+
+    # Quote placeholders and any extra ones the model invented with this call's nonce -
+    # never the user's own bracketed text
+    text = PLACEHOLDER_RE.sub(lambda m: "" if m.group(1) in nonces else m.group(0), text)
+    text = re.sub(r"[ \t]{2,}", " ", text).strip()
+    if missing_urls:
+        text = f"{text} {' '.join(missing_urls)}"
+    return "\n\n".join(quotes + [text])
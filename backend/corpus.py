@@ -0,0 +1,322 @@
+"""
+Local Comment Corpus
+Every comment, post, video and tweet fetched by the API clients and scrapers is kept
+in a local SQLite database, deduplicated by platform id and full-text indexed with
+FTS5, so repeat queries can be answered locally instead of going back upstream.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    platform TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    text TEXT NOT NULL,
+    title TEXT,
+    source TEXT,
+    query TEXT,
+    score INTEGER,
+    fetched_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (platform, kind, item_id)
+);
+CREATE INDEX IF NOT EXISTS idx_items_fetched ON items (platform, kind, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_items_age ON items (fetched_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    text, title, source, query,
+    content='items', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts (rowid, text, title, source, query)
+    VALUES (new.id, new.text, new.title, new.source, new.query);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, text, title, source, query)
+    VALUES ('delete', old.id, old.text, old.title, old.source, old.query);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, text, title, source, query)
+    VALUES ('delete', old.id, old.text, old.title, old.source, old.query);
+    INSERT INTO items_fts (rowid, text, title, source, query)
+    VALUES (new.id, new.text, new.title, new.source, new.query);
+END;
+"""
+
+UPSERT = """
+INSERT INTO items (platform, item_id, kind, text, title, source, query, score, fetched_at, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (platform, kind, item_id) DO UPDATE SET
+    text = excluded.text,
+    title = excluded.title,
+    source = excluded.source,
+    query = CASE
+        WHEN excluded.query IS NULL OR instr(COALESCE(items.query, ''), excluded.query) THEN items.query
+        WHEN items.query IS NULL THEN excluded.query
+        ELSE items.query || ' | ' || excluded.query
+    END,
+    score = excluded.score,
+    fetched_at = excluded.fetched_at,
+    data = excluded.data
+"""
+
+
+# Rows deleted per statement while pruning, so the writer never holds the lock for long
+PRUNE_CHUNK = 5000
+
+
+def fts_query(text: str) -> Optional[str]:
+    """Turn free text into an FTS5 query (every word must match); None if no words"""
+    words = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{word}"' for word in words) or None
+
+
+# ============================================================================
+# CORPUS
+# ============================================================================
+
+class CommentCorpus:
+    """
+    Append-mostly store of fetched items.
+
+    record() only enqueues, so the request that fetched the items never waits on
+    disk; a writer thread upserts them in batches. search() reads directly.
+
+    The writer also prunes every `prune_interval` seconds: items not refetched within
+    `retention` seconds are dropped, then the oldest beyond `max_items`, and the FTS
+    index is merged back down. Freed pages are reused, so the file stops growing.
+    """
+
+    def __init__(self, db_path: str, enabled: bool = True, batch_size: int = 200,
+                 retention: float = 7 * 24 * 3600, max_items: int = 200000, prune_interval: float = 600.0):
+        self.db_path = db_path
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.retention = retention
+        self.max_items = max_items
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+
+        self._pending: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+        if enabled:
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+            metrics.register_gauge("corpus_pending_writes", self._pending.qsize)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def record(self, platform: str, kind: str, items: List[Dict[str, Any]], query: Optional[str] = None):
+        """Queue fetched items for storage (never raises, never blocks on disk)"""
+        if not self.enabled or not items:
+            return
+
+        now = time.time()
+        for item in items:
+            text = item.get("body") or item.get("text") or item.get("selftext") or item.get("title") or ""
+            if not text:
+                continue
+            item_id = item.get("id") or hashlib.sha1(
+                f"{item.get('author')}|{text}".encode("utf-8")
+            ).hexdigest()
+            self._pending.put((
+                platform,
+                str(item_id),
+                kind,
+                text,
+                item.get("post_title") or item.get("video_title") or item.get("title"),
+                item.get("subreddit") or item.get("channel") or item.get("video_id"),
+                query or item.get("query"),
+                item.get("score", item.get("likes")),
+                now,
+                json.dumps(item, default=str)
+            ))
+        self._ensure_writer()
+
+    def flush(self):
+        """Block until every queued item is written"""
+        self._pending.join()
+
+    def close(self):
+        if self._writer is not None:
+            self._pending.put(None)
+            self._writer.join(timeout=5)
+            self._writer = None
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name="corpus-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            first = self._pending.get()
+            if first is None:
+                self._pending.task_done()
+                return
+
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    self._pending.put(None)  # handle the stop marker after this batch
+                    self._pending.task_done()
+                    break
+                batch.append(row)
+
+            try:
+                with self._connect() as conn:
+                    conn.executemany(UPSERT, batch)
+                metrics.inc("corpus_items_written_total", len(batch))
+            except Exception as e:
+                logger.error(f"❌ Corpus write failed ({len(batch)} items): {e}")
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+
+            if time.monotonic() - self._last_prune >= self.prune_interval:
+                self._last_prune = time.monotonic()
+                try:
+                    self.prune()
+                except Exception as e:
+                    logger.error(f"❌ Corpus prune failed: {e}")
+
+    def prune(self) -> int:
+        """Apply the retention window and row cap; returns the number of items removed"""
+        if not self.enabled:
+            return 0
+        removed = 0
+        cutoff = time.time() - self.retention
+        while True:
+            with self._connect() as conn:
+                deleted = conn.execute(
+                    "DELETE FROM items WHERE id IN (SELECT id FROM items WHERE fetched_at < ? LIMIT ?)",
+                    (cutoff, PRUNE_CHUNK)
+                ).rowcount
+            removed += deleted
+            if deleted < PRUNE_CHUNK:
+                break
+
+        while True:
+            with self._connect() as conn:
+                deleted = conn.execute(
+                    "DELETE FROM items WHERE id IN ("
+                    "SELECT id FROM items ORDER BY fetched_at DESC LIMIT ? OFFSET ?)",
+                    (PRUNE_CHUNK, self.max_items)
+                ).rowcount
+            removed += deleted
+            if deleted < PRUNE_CHUNK:
+                break
+
+        if removed:
+            with self._connect() as conn:
+                conn.execute("INSERT INTO items_fts (items_fts) VALUES ('optimize')")
+            metrics.inc("corpus_items_pruned_total", removed)
+            logger.info(f"🧹 Pruned {removed} corpus items")
+        return removed
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def search(self, text: str, platform: Optional[str] = None, kind: Optional[str] = None,
+               limit: int = 10, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Best-matching items (BM25), optionally only those fetched within `max_age` seconds"""
+        match = fts_query(text)
+        if not self.enabled or match is None:
+            return []
+
+        sql = (
+            "SELECT i.data, i.fetched_at FROM items_fts "
+            "JOIN items i ON i.id = items_fts.rowid WHERE items_fts MATCH ?"
+        )
+        params: List[Any] = [match]
+        if platform:
+            sql += " AND i.platform = ?"
+            params.append(platform)
+        if kind:
+            sql += " AND i.kind = ?"
+            params.append(kind)
+        if max_age is not None:
+            sql += " AND i.fetched_at >= ?"
+            params.append(time.time() - max_age)
+        sql += " ORDER BY items_fts.rank LIMIT ?"
+        params.append(limit)
+
+        start = time.perf_counter()
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        metrics.observe("corpus_search_seconds", time.perf_counter() - start)
+
+        return [{**json.loads(data), "fetched_at": fetched_at} for data, fetched_at in rows]
+
+    def recent_texts(self, platform: str, max_age: float, limit: int) -> List[Tuple[str, float]]:
+        """(text, fetched_at) of the newest items from `platform`, oldest first (for rebuilding indexes)"""
+        if not self.enabled:
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT text, fetched_at FROM items WHERE platform = ? AND fetched_at >= ? "
+                "ORDER BY fetched_at DESC LIMIT ?",
+                (platform, time.time() - max_age, limit)
+            ).fetchall()
+        return rows[::-1]
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"enabled": False}
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT platform, kind, COUNT(*) FROM items GROUP BY platform, kind"
+            ).fetchall()
+        return {
+            "enabled": True,
+            "path": self.db_path,
+            "items": {f"{platform}/{kind}": count for platform, kind, count in rows},
+            "pending_writes": self._pending.qsize()
+        }
+
+
+# ============================================================================
+# INITIALIZE GLOBAL CORPUS
+# ============================================================================
+
+comment_corpus = CommentCorpus(
+    os.getenv("CORPUS_DB_PATH", "corpus.db"),
+    enabled=os.getenv("CORPUS_ENABLED", "true").lower() == "true",
+    retention=float(os.getenv("CORPUS_RETENTION_SECONDS", str(7 * 24 * 3600))),
+    max_items=int(os.getenv("CORPUS_MAX_ITEMS", "200000"))
+)
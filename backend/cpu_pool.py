@@ -0,0 +1,197 @@
+"""
+Shared Process Pool for CPU-Bound Text Work
+TextBlob sentiment and BeautifulSoup parsing run in worker processes so they
+don't hold the GIL against request handling. Each worker warms up as it starts
+(lexicons and parsers loaded); until the pool is running every call runs inline.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.context import SpawnContext, SpawnProcess
+from typing import Any, Callable, Iterable, List, Optional
+
+import cpu_worker
+from deadlines import remaining_timeout
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_spawn_lock = threading.Lock()
+
+
+class _WorkerProcess(SpawnProcess):
+    """
+    Spawned process that starts from cpu_worker rather than the server's __main__.
+    spawn re-runs the parent's __main__ in every child - under `python main.py` that is
+    the whole app - so __main__ is pointed at cpu_worker while the child's start-up
+    data is captured (the lock keeps concurrent spawns from seeing each other's swap).
+    """
+
+    @staticmethod
+    def _Popen(process_obj):
+        with _spawn_lock:
+            main_module = sys.modules["__main__"]
+            sys.modules["__main__"] = cpu_worker
+            try:
+                return SpawnProcess._Popen(process_obj)
+            finally:
+                sys.modules["__main__"] = main_module
+
+
+class _WorkerContext(SpawnContext):
+    Process = _WorkerProcess
+
+
+class CpuPool:
+    """
+    ProcessPoolExecutor wrapper with warm-up, chunked map and utilization tracking.
+
+    Uses the "spawn" start method so workers never inherit the server's threads or
+    sockets. If the pool breaks (a worker died), the call runs inline and the pool is
+    replaced with a fresh one.
+    """
+
+    def __init__(self, workers: int, chunk_size: int = 32, task_timeout: float = 10.0):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.task_timeout = task_timeout
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._busy = 0
+        self._lock = threading.Lock()
+
+        metrics.register_gauge("cpu_pool_busy", lambda: self._busy)
+        metrics.register_gauge("cpu_pool_utilization", self.utilization)
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def utilization(self) -> float:
+        return round(self._busy / self.workers, 3) if self.running and self.workers else 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle (called from the app lifespan)
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Create the executor; workers are spawned on demand and warm up in their initializer"""
+        if self.running or self.workers <= 0:
+            return
+
+        self._executor = self._create_executor()
+        logger.info(f"✅ CPU pool started with up to {self.workers} workers")
+
+    def stop(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=_WorkerContext(),
+            initializer=cpu_worker.warm_up
+        )
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        """Replace a broken executor - concurrent callers that hit the same breakage restart it once"""
+        with self._lock:
+            if self._executor is not broken:
+                return  # already replaced (or stopped)
+            self._executor = self._create_executor()
+        logger.error("❌ CPU pool broken - restarted with fresh workers")
+        metrics.inc("cpu_pool_restarts_total")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def _submit(self, executor: ProcessPoolExecutor, fn: Callable, *args, task: Optional[str] = None) -> Future:
+        task = task or getattr(fn, "__name__", "task")
+        start = time.perf_counter()
+        future = executor.submit(fn, *args)  # raises BrokenProcessPool once a worker has died
+        with self._lock:
+            self._busy += 1
+
+        def done(_):
+            with self._lock:
+                self._busy -= 1
+            metrics.observe("cpu_pool_task_seconds", time.perf_counter() - start, task=task)
+
+        future.add_done_callback(done)
+        return future
+
+    def _inline(self, fn: Callable, *args):
+        metrics.inc("cpu_pool_inline_total", task=getattr(fn, "__name__", "task"))
+        return fn(*args)
+
+    def run(self, fn: Callable, *args) -> Any:
+        """Run `fn(*args)` in a worker and wait (bounded by the request deadline)"""
+        executor = self._executor
+        if executor is None:
+            return self._inline(fn, *args)
+        try:
+            return self._submit(executor, fn, *args).result(timeout=remaining_timeout(self.task_timeout))
+        except BrokenProcessPool:
+            self._restart(executor)
+            return self._inline(fn, *args)
+
+    async def arun(self, fn: Callable, *args) -> Any:
+        executor = self._executor
+        if executor is None:
+            return await asyncio.to_thread(self._inline, fn, *args)
+        try:
+            return await asyncio.wrap_future(self._submit(executor, fn, *args))
+        except BrokenProcessPool:
+            self._restart(executor)
+            return await asyncio.to_thread(self._inline, fn, *args)
+
+    async def amap(self, fn: Callable, items: Iterable[Any], chunk_size: Optional[int] = None) -> List[Any]:
+        """
+        `[fn(item) for item in items]` with items sent to the workers in chunks.
+        Raises asyncio.TimeoutError once the batch outlives `task_timeout` per round of
+        chunks (bounded by the request deadline); unstarted chunks are cancelled.
+        """
+        items = list(items)
+        if not items:
+            return []
+        executor = self._executor
+        if executor is None:
+            return await asyncio.to_thread(cpu_worker.apply_chunk, fn, items)
+
+        size = chunk_size or self.chunk_size
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        rounds = math.ceil(len(chunks) / self.workers)
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(*(
+                    asyncio.wrap_future(self._submit(executor, cpu_worker.apply_chunk, fn, chunk, task=f"{fn.__name__}_chunk"))
+                    for chunk in chunks
+                )),
+                timeout=remaining_timeout(self.task_timeout * rounds)
+            )
+        except BrokenProcessPool:
+            self._restart(executor)
+            metrics.inc("cpu_pool_inline_total", len(chunks), task=f"{fn.__name__}_chunk")
+            return await asyncio.to_thread(cpu_worker.apply_chunk, fn, items)
+        metrics.inc("cpu_pool_batch_items_total", len(items))
+        return [result for chunk in results for result in chunk]
+
+
+# ============================================================================
+# INITIALIZE GLOBAL POOL
+# ============================================================================
+
+cpu_pool = CpuPool(
+    workers=int(os.getenv("CPU_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    chunk_size=int(os.getenv("CPU_POOL_CHUNK_SIZE", "32"))
+)
@@ -0,0 +1,16 @@
+"""
+CPU Pool Worker Entry Point
+Spawned pool workers start from this module instead of the server's __main__
+(main.py under `python main.py`), so a worker imports text_tasks and nothing else -
+no FastAPI app, databases, API clients or LLM pool.
+"""
+
+from typing import Any, Callable, List
+
+from text_tasks import warm_up  # noqa: F401 - the pool initializer
+
+
+def apply_chunk(fn: Callable, items: List[Any]) -> List[Any]:
+    """Run `fn` over one chunk inside a worker (one round trip per chunk)"""
+    return [fn(item) for item in items]
+
@@ -0,0 +1,114 @@
+"""
+Per-Request Deadline Budgets
+A deadline is set once per request (header, query parameter or server default)
+and read by every workflow node, API client and scraper through a context variable.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+import requests
+
+# ============================================================================
+# DEADLINE
+# ============================================================================
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's time budget is used up"""
+
+
+class Deadline:
+    """Absolute point in (monotonic) time by which the request must finish"""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def timeout(self, default: Optional[float] = None, minimum: float = 0.05) -> float:
+        """Timeout for the next upstream call: the remaining budget, capped by `default`"""
+        remaining = self.remaining()
+        if default is not None:
+            remaining = min(default, remaining)
+        return max(minimum, remaining)
+
+    def check(self, stage: str = ""):
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline of {self.budget}s exceeded{f' during {stage}' if stage else ''}")
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def get_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def set_deadline(deadline: Optional[Deadline]):
+    """Returns a token for reset_deadline()"""
+    return _current_deadline.set(deadline)
+
+
+def reset_deadline(token):
+    _current_deadline.reset(token)
+
+
+def deadline_expired() -> bool:
+    deadline = get_deadline()
+    return deadline is not None and deadline.expired()
+
+
+def check_deadline(stage: str = ""):
+    deadline = get_deadline()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def remaining_timeout(default: float) -> float:
+    """Timeout for an upstream call: `default`, shortened to the current request's remaining budget"""
+    deadline = get_deadline()
+    return deadline.timeout(default) if deadline else default
+
+
+def parse_deadline(header_value: Optional[str], query_value: Optional[str],
+                   default: float, maximum: float) -> float:
+    """Pick the request budget in seconds: query parameter, then header, then server default"""
+    for value in (query_value, header_value):
+        if value:
+            try:
+                seconds = float(value)
+            except ValueError:
+                continue
+            if seconds > 0:
+                return min(seconds, maximum)
+    return default
+
+
+# ============================================================================
+# DEADLINE-AWARE HTTP SESSION
+# ============================================================================
+
+class DeadlineSession(requests.Session):
+    """
+    requests.Session that caps every call's timeout at the request's remaining budget.
+    Used for libraries that accept a session (prawcore, tweepy, newsapi).
+    """
+
+    def __init__(self, default_timeout: float = 10.0):
+        super().__init__()
+        self.default_timeout = default_timeout
+
+    def request(self, method, url, **kwargs):
+        check_deadline(f"{method} {url}")
+        timeout = kwargs.get("timeout") or self.default_timeout
+        if isinstance(timeout, tuple):
+            kwargs["timeout"] = tuple(remaining_timeout(part) for part in timeout)
+        else:
+            kwargs["timeout"] = remaining_timeout(timeout)
+        return super().request(method, url, **kwargs)
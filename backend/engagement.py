@@ -0,0 +1,94 @@
+"""
+Bulk Engagement Scoring
+The engagement heuristic (length band, tone match, emoji, question) computed with
+NumPy over a whole list of comments at once, so thousands of fetched comments can
+be ranked before choosing which ones to rewrite.
+"""
+
+from typing import Any, Dict, List, Sequence, Union
+
+import numpy as np
+
+BASE_SCORE = 50
+LENGTH_BAND_BONUS = 15
+TONE_MATCH_BONUS = 15
+EMOJI_BONUS = 10
+QUESTION_BONUS = 10
+
+# Code points above this count as emoji (pictographs, symbols, flags)
+EMOJI_MIN_CODEPOINT = 127000
+QUESTION_MARK = ord("?")
+
+# Optimal comment length per platform (chars)
+LENGTH_BANDS = {
+    "reddit": (200, 500),
+    "youtube": (100, 200)
+}
+
+
+def text_features(comments: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Per-comment length, emoji count and question-mark presence.
+
+    All comments are joined into one UTF-32 buffer (NUL-separated, so no segment is
+    empty) and each feature is a single reduceat over it - no per-character Python loop.
+    """
+    if not comments:
+        empty = np.zeros(0, dtype=np.int64)
+        return {"length": empty, "emoji_count": empty, "has_question": empty.astype(bool)}
+
+    lengths = np.fromiter((len(comment) for comment in comments), dtype=np.int64, count=len(comments))
+    codes = np.frombuffer(("\x00".join(comments) + "\x00").encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+
+    return {
+        "length": lengths,
+        "emoji_count": np.add.reduceat((codes > EMOJI_MIN_CODEPOINT).astype(np.int64), starts),
+        "has_question": np.logical_or.reduceat(codes == QUESTION_MARK, starts)
+    }
+
+def score_engagement(comments: Sequence[str], tones: Union[str, Sequence[str]],
+                     platform: str, config: Dict[str, Any]) -> np.ndarray:
+    """
+    Virality scores (0-100) for every comment under one platform config - the single
+    feature set behind both /rewrite predictions and /api/engagement/score
+    """
+    features = text_features(comments)
+    scores = np.full(len(comments), BASE_SCORE, dtype=np.int64)
+
+    length_band = LENGTH_BANDS.get(platform)
+    if length_band:
+        low, high = length_band
+        scores += LENGTH_BAND_BONUS * ((features["length"] >= low) & (features["length"] <= high))
+
+    best_tones = config.get("best_tones", [])
+    if isinstance(tones, str):
+        scores += TONE_MATCH_BONUS * (tones in best_tones)
+    else:
+        scores += TONE_MATCH_BONUS * np.fromiter((tone in best_tones for tone in tones), dtype=bool, count=len(comments))
+
+    if config.get("emoji_friendly"):
+        scores += EMOJI_BONUS * (features["emoji_count"] > 0)
+    scores += QUESTION_BONUS * features["has_question"]
+
+    return np.minimum(scores, 100)
+
+def engagement_levels(scores: np.ndarray) -> np.ndarray:
+    return np.where(scores > 70, "High", np.where(scores > 40, "Medium", "Low"))
+
+def engagement_predictions(scores: np.ndarray) -> List[Dict[str, Any]]:
+    """The per-comment prediction dict returned by the rewrite endpoints"""
+    likes = (scores * 1.5).astype(np.int64)
+    shares = (scores * 0.5).astype(np.int64)
+    replies = (scores * 0.3).astype(np.int64)
+    return [
+        {
+            "virality_score": int(score),
+            "predicted_likes": int(like),
+            "predicted_shares": int(share),
+            "predicted_comments": int(reply),
+            "optimal_post_time": "Best time: 9-11 AM or 7-9 PM (local time)",
+            "engagement_level": str(level)
+        }
+        for score, like, share, reply, level in zip(scores, likes, shares, replies, engagement_levels(scores))
+    ]
@@ -0,0 +1,205 @@
+"""
+Hashtag Index
+Real hashtags seen in fetched YouTube titles, descriptions and comments, with their
+co-occurrence with the surrounding keywords. Counts decay over time, and every
+keyword keeps a small top-k heap of tags, so a suggestion is a few dict/heap reads.
+"""
+
+import heapq
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from metrics import metrics
+
+# "#tag" not preceded by a word character or "&" (skips HTML entities like &#39;) and containing a letter
+HASHTAG_RE = re.compile(r"(?<![\w&])#(\w*[^\W\d_]\w*)")
+WORD_RE = re.compile(r"[^\W\d_]{4,}")
+
+# Long descriptions are mostly link lists and boilerplate - cap the work per text
+MAX_TAGS_PER_TEXT = 30
+MAX_KEYWORDS_PER_TEXT = 64
+
+STOPWORDS = {
+    "this", "that", "with", "have", "from", "they", "will", "would", "there", "their", "what",
+    "about", "which", "when", "your", "just", "like", "been", "were", "into", "than", "then",
+    "them", "also", "only", "some", "more", "very", "really", "here", "other", "over", "because",
+    "could", "should", "these", "those", "does", "dont", "cant", "youre", "much", "even",
+    "http", "https", "www", "com", "video", "videos", "watch", "channel", "subscribe", "href", "quot"
+}
+
+
+def extract_hashtags(text: str) -> List[str]:
+    return HASHTAG_RE.findall(text)
+
+def extract_keywords(text: str) -> Set[str]:
+    return {word for word in WORD_RE.findall(text.lower()) if word not in STOPWORDS}
+
+
+class _TopK:
+    """Decayed tag scores for one keyword plus a min-heap of the current top `k`"""
+
+    __slots__ = ("scores", "heap")
+
+    def __init__(self):
+        self.scores: Dict[str, float] = {}
+        self.heap: List[Tuple[float, str]] = []
+
+    def add(self, tag: str, weight: float, k: int, max_tags: int):
+        score = self.scores.get(tag, 0.0) + weight
+        self.scores[tag] = score
+
+        if any(entry_tag == tag for _, entry_tag in self.heap):
+            self.heap = [(score if entry_tag == tag else entry_score, entry_tag) for entry_score, entry_tag in self.heap]
+            heapq.heapify(self.heap)
+        elif len(self.heap) < k:
+            heapq.heappush(self.heap, (score, tag))
+        elif score > self.heap[0][0]:
+            heapq.heapreplace(self.heap, (score, tag))
+
+        if len(self.scores) > max_tags:
+            # Forget the weakest tags outside the heap
+            keep = {entry_tag for _, entry_tag in self.heap}
+            for weak_tag, _ in sorted(self.scores.items(), key=lambda item: item[1])[:len(self.scores) - max_tags]:
+                if weak_tag not in keep:
+                    del self.scores[weak_tag]
+
+
+class HashtagIndex:
+    """
+    Keyword -> top-k hashtags, with exponential time decay. Plain words are keyed as-is
+    and hashtags as "#tag", so the word "minecraft" can suggest #Minecraft while the
+    hashtag #minecraft only suggests the tags seen alongside it.
+
+    Decay uses "forward decay": an observation at time t adds exp(t / tau) instead of 1,
+    so older counts never have to be rewritten and rankings stay correct. Scores are
+    rescaled once the exponent grows large. Keywords are evicted least-recently-updated
+    first beyond `max_keywords`; the overall tag counts keep the `max_hashtags` strongest.
+    """
+
+    def __init__(self, half_life: float = 24 * 3600, top_k: int = 20, max_keywords: int = 50000,
+                 max_hashtags: int = 50000):
+        self.tau = half_life / math.log(2)
+        self.top_k = top_k
+        self.max_tags = top_k * 4
+        self.max_keywords = max_keywords
+        self.max_hashtags = max_hashtags
+
+        self._epoch = time.time()
+        self._keywords: "OrderedDict[str, _TopK]" = OrderedDict()
+        self._tags: Dict[str, float] = {}
+        self._display: Dict[str, str] = {}  # lowercase tag -> most recently seen spelling
+        self._lock = threading.Lock()
+        self.observed = 0
+
+        metrics.register_gauge("hashtag_index_keywords", lambda: len(self._keywords))
+        metrics.register_gauge("hashtag_index_tags", lambda: len(self._tags))
+
+    def _weight(self, at: float) -> float:
+        return math.exp((at - self._epoch) / self.tau)
+
+    def _rescale(self, now: float):
+        """Move the epoch forward so weights don't overflow (called with the lock held)"""
+        factor = 1.0 / self._weight(now)
+        for entry in self._keywords.values():
+            entry.scores = {tag: score * factor for tag, score in entry.scores.items()}
+            entry.heap = [(score * factor, tag) for score, tag in entry.heap]
+        self._tags = {tag: score * factor for tag, score in self._tags.items()}
+        self._epoch = now
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def observe(self, texts: Iterable[Optional[str]], at: Optional[float] = None):
+        """Index the hashtags in each text against that text's keywords and other hashtags"""
+        at = at or time.time()
+        with self._lock:
+            if (at - self._epoch) / self.tau > 50:
+                self._rescale(at)
+            weight = self._weight(at)
+
+            for text in texts:
+                if not text or "#" not in text:
+                    continue
+                tags = {}
+                for tag in extract_hashtags(text)[:MAX_TAGS_PER_TEXT]:
+                    tags[tag.lower()] = tag
+                if not tags:
+                    continue
+
+                keywords = set(list(extract_keywords(text))[:MAX_KEYWORDS_PER_TEXT]) | {f"#{key}" for key in tags}
+                for key, display in tags.items():
+                    self._display[key] = display
+                    self._tags[key] = self._tags.get(key, 0.0) + weight
+                for keyword in keywords:
+                    entry = self._keywords.get(keyword)
+                    if entry is None:
+                        entry = self._keywords[keyword] = _TopK()
+                    else:
+                        self._keywords.move_to_end(keyword)
+                    for key in tags:
+                        if keyword != f"#{key}":
+                            entry.add(key, weight, self.top_k, self.max_tags)
+                self.observed += 1
+
+            while len(self._keywords) > self.max_keywords:
+                self._keywords.popitem(last=False)
+            if len(self._tags) > self.max_hashtags:
+                for tag, _ in heapq.nsmallest(len(self._tags) - self.max_hashtags, self._tags.items(), key=lambda item: item[1]):
+                    del self._tags[tag]
+                    self._display.pop(tag, None)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def suggest(self, text: str, limit: int = 5) -> List[str]:
+        """Hashtags that co-occur most with the text's keywords, excluding tags already in it"""
+        start = time.perf_counter()
+        present = {tag.lower() for tag in extract_hashtags(text)}
+        keywords = extract_keywords(text) | {f"#{tag}" for tag in present}
+
+        combined: Dict[str, float] = {}
+        with self._lock:
+            for keyword in keywords:
+                entry = self._keywords.get(keyword)
+                if entry is None:
+                    continue
+                for score, tag in entry.heap:
+                    if tag not in present:
+                        combined[tag] = combined.get(tag, 0.0) + score
+            ranked = heapq.nlargest(limit, combined.items(), key=lambda item: item[1])
+            suggestions = [f"#{self._display.get(tag, tag)}" for tag, _ in ranked]
+
+        metrics.observe("hashtag_suggest_seconds", time.perf_counter() - start)
+        return suggestions
+
+    def trending(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most used hashtags overall, with their decayed counts"""
+        with self._lock:
+            now_factor = 1.0 / self._weight(time.time())
+            ranked = heapq.nlargest(limit, self._tags.items(), key=lambda item: item[1])
+            return [
+                {"tag": f"#{self._display.get(tag, tag)}", "score": round(score * now_factor, 3)}
+                for tag, score in ranked
+            ]
+
+    def stats(self) -> Dict[str, int]:
+        return {"keywords": len(self._keywords), "tags": len(self._tags), "texts_indexed": self.observed}
+
+
+# ============================================================================
+# INITIALIZE GLOBAL INDEX
+# ============================================================================
+
+hashtag_index = HashtagIndex(
+    half_life=float(os.getenv("HASHTAG_HALF_LIFE_HOURS", "24")) * 3600,
+    top_k=int(os.getenv("HASHTAG_TOP_K", "20")),
+    max_keywords=int(os.getenv("HASHTAG_MAX_KEYWORDS", "50000")),
+    max_hashtags=int(os.getenv("HASHTAG_MAX_TAGS", "50000"))
+)
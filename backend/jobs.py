@@ -0,0 +1,377 @@
+"""
+Asynchronous Rewrite Job Queue
+Large rewrite batches run on a dedicated worker pool with job state persisted in SQLite,
+so jobs survive restarts and can be polled, streamed or cancelled.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Job / item states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    comment TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    finished_at REAL,
+    owner TEXT,
+    lease_until REAL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_job_items_pending ON job_items (status, job_id, idx);
+"""
+
+# Columns added after the first release (ALTER TABLE on existing databases)
+MIGRATIONS = {"owner": "TEXT", "lease_until": "REAL"}
+
+# One statement, so two workers (threads or processes sharing the file) can never claim the same item.
+# Pending items and running items whose owner's lease ran out (crashed worker) are both claimable.
+CLAIM = """
+UPDATE job_items SET status = :running, owner = :owner, lease_until = :lease_until
+WHERE rowid = (
+    SELECT i.rowid FROM job_items i JOIN jobs j ON j.id = i.job_id
+    WHERE (i.status = :pending OR (i.status = :running AND COALESCE(i.lease_until, 0) < :now))
+      AND j.status IN (:queued, :running)
+    ORDER BY j.created_at, i.idx LIMIT 1
+)
+AND (status = :pending OR (status = :running AND COALESCE(lease_until, 0) < :now))
+RETURNING job_id, idx, comment
+"""
+
+# rewrite_fn(comment, params) -> JSON-serialisable result
+RewriteFn = Callable[[str, Dict[str, Any]], Dict[str, Any]]
+
+
+class RetryItem(Exception):
+    """Raised by rewrite_fn when the item can't run yet (e.g. no LLM capacity); retried after `delay` seconds"""
+
+    def __init__(self, delay: float, reason: str = "retry"):
+        super().__init__(reason)
+        self.delay = delay
+        self.reason = reason
+
+
+# ============================================================================
+# JOB MANAGER
+# ============================================================================
+
+class JobManager:
+    """
+    SQLite-backed job queue with its own worker threads.
+
+    Each worker claims one pending item at a time (oldest job first), runs
+    `rewrite_fn` on it and writes the result back. A claim is a lease of
+    `lease_seconds` owned by this process: items left `running` by a crashed
+    process are picked up again once their lease expires, and a result is only
+    written by the worker that still owns the item.
+
+    rewrite_fn may raise RetryItem to wait and try again (at most `max_retries` times).
+    While waiting the lease is renewed, and the wait ends early if the job is
+    cancelled or the manager stops (the item then goes back to `pending`).
+    """
+
+    def __init__(self, db_path: str, rewrite_fn: RewriteFn, workers: int = 4, lease_seconds: float = 300.0,
+                 max_retries: int = 20):
+        self.db_path = db_path
+        self.rewrite_fn = rewrite_fn
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_retries = max_retries
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._busy_lock = threading.Lock()
+        self._busy = 0
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(job_items)")}
+            for column, column_type in MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE job_items ADD COLUMN {column} {column_type}")
+
+        metrics.register_gauge("job_workers_busy", lambda: self._busy)
+        metrics.register_gauge("job_items_pending", self._pending_count)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection per operation (commits on success, always closes)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._threads:
+            return
+        self._stopping.clear()
+
+        # Items other processes are still working on keep their lease - only expired ones are resumed
+        with self._connect() as conn:
+            resumed = conn.execute(
+                "SELECT COUNT(*) FROM job_items WHERE status = ? AND COALESCE(lease_until, 0) < ?",
+                (RUNNING, time.time())
+            ).fetchone()[0]
+        if resumed:
+            logger.info(f"♻️  Resuming {resumed} interrupted job items")
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"✅ Job queue started with {self.workers} workers ({self.db_path})")
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout / max(len(self._threads), 1))
+        self._threads = []
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, comments: List[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, params, total, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(params), len(comments), now, now)
+            )
+            conn.executemany(
+                "INSERT INTO job_items (job_id, idx, comment, status) VALUES (?, ?, ?, ?)",
+                [(job_id, idx, comment, PENDING) for idx, comment in enumerate(comments)]
+            )
+
+        metrics.inc("jobs_submitted_total")
+        metrics.inc("job_items_submitted_total", len(comments))
+        with self._wakeup:
+            self._wakeup.notify_all()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        processed = row["completed"] + row["failed"]
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "params": json.loads(row["params"]),
+            "total": row["total"],
+            "completed": row["completed"],
+            "failed": row["failed"],
+            "progress": round(processed / row["total"], 4) if row["total"] else 1.0,
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"]
+        }
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Finished items (done or failed) in input order"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT idx, comment, status, result, error FROM job_items "
+                "WHERE job_id = ? AND status IN (?, ?) ORDER BY idx LIMIT ? OFFSET ?",
+                (job_id, DONE, FAILED, limit, offset)
+            ).fetchall()
+        return [self._item_dict(row) for row in rows]
+
+    def results_since(self, job_id: str, since: float) -> List[Dict[str, Any]]:
+        """Items finished at or after `since` (used for streaming partial results)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT idx, comment, status, result, error, finished_at FROM job_items "
+                "WHERE job_id = ? AND finished_at >= ? ORDER BY finished_at, idx",
+                (job_id, since)
+            ).fetchall()
+        return [{**self._item_dict(row), "finished_at": row["finished_at"]} for row in rows]
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                (CANCELLED, time.time(), job_id, QUEUED, RUNNING)
+            )
+            conn.execute(
+                "UPDATE job_items SET status = ? WHERE job_id = ? AND status = ?",
+                (CANCELLED, job_id, PENDING)
+            )
+        metrics.inc("jobs_cancelled_total")
+        return self.get(job_id)
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            item = self._claim_next()
+            if item is None:
+                with self._wakeup:
+                    self._wakeup.wait(timeout=1.0)
+                continue
+
+            with self._busy_lock:
+                self._busy += 1
+            try:
+                self._process(item)
+            finally:
+                with self._busy_lock:
+                    self._busy -= 1
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(CLAIM, {
+                "running": RUNNING, "pending": PENDING, "queued": QUEUED,
+                "owner": self.owner, "lease_until": now + self.lease_seconds, "now": now
+            }).fetchall()
+            if not rows:
+                return None
+
+            item = dict(rows[0])
+            item["params"] = conn.execute("SELECT params FROM jobs WHERE id = ?", (item["job_id"],)).fetchone()[0]
+            conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, now, item["job_id"], QUEUED)
+            )
+            return item
+
+    def _process(self, item: Dict[str, Any]):
+        start = time.perf_counter()
+        result, error = None, None
+        retries = 0
+        while True:
+            try:
+                result = self.rewrite_fn(item["comment"], json.loads(item["params"]))
+            except RetryItem as e:
+                retries += 1
+                if retries > self.max_retries:
+                    error = f"Gave up after {self.max_retries} retries ({e.reason})"
+                elif self._wait_to_retry(item, e.delay):
+                    metrics.inc("job_item_retries_total", reason=e.reason)
+                    continue
+                else:
+                    return
+            except Exception as e:
+                error = str(e)
+            break
+        metrics.observe("job_item_seconds", time.perf_counter() - start)
+        metrics.inc("job_items_processed_total", outcome="failed" if error else "done")
+
+        with self._write_lock, self._connect() as conn:
+            written = conn.execute(
+                "UPDATE job_items SET status = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL "
+                "WHERE job_id = ? AND idx = ? AND status = ? AND owner = ?",
+                (FAILED if error else DONE, json.dumps(result) if result is not None else None,
+                 error, time.time(), item["job_id"], item["idx"], RUNNING, self.owner)
+            ).rowcount
+            if not written:
+                # Lease expired and another worker took the item over (or the job was cancelled)
+                metrics.inc("job_items_lease_lost_total")
+                return
+            counter = "failed" if error else "completed"
+            conn.execute(
+                f"UPDATE jobs SET {counter} = {counter} + 1, updated_at = ? WHERE id = ?",
+                (time.time(), item["job_id"])
+            )
+            conn.execute(
+                "UPDATE jobs SET status = ? WHERE id = ? AND status = ? AND completed + failed >= total",
+                (COMPLETED, item["job_id"], RUNNING)
+            )
+
+    def _wait_to_retry(self, item: Dict[str, Any], delay: float) -> bool:
+        """Sleep before a retry, keeping the lease; False if the item should not be retried here"""
+        key = (item["job_id"], item["idx"])
+        if self._stopping.wait(delay):
+            # Shutting down - hand the item back so another worker can take it right away
+            with self._write_lock, self._connect() as conn:
+                conn.execute(
+                    "UPDATE job_items SET status = ?, owner = NULL, lease_until = NULL "
+                    "WHERE job_id = ? AND idx = ? AND status = ? AND owner = ?",
+                    (PENDING, *key, RUNNING, self.owner)
+                )
+            return False
+
+        with self._write_lock, self._connect() as conn:
+            job_status = conn.execute("SELECT status FROM jobs WHERE id = ?", (item["job_id"],)).fetchone()
+            if job_status is None or job_status[0] == CANCELLED:
+                conn.execute(
+                    "UPDATE job_items SET status = ?, lease_until = NULL "
+                    "WHERE job_id = ? AND idx = ? AND status = ? AND owner = ?",
+                    (CANCELLED, *key, RUNNING, self.owner)
+                )
+                return False
+            renewed = conn.execute(
+                "UPDATE job_items SET lease_until = ? WHERE job_id = ? AND idx = ? AND status = ? AND owner = ?",
+                (time.time() + self.lease_seconds, *key, RUNNING, self.owner)
+            ).rowcount
+        if not renewed:
+            metrics.inc("job_items_lease_lost_total")
+        return bool(renewed)
+
+    def _pending_count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM job_items WHERE status = ?", (PENDING,)
+            ).fetchone()[0]
+
+    @staticmethod
+    def _item_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "index": row["idx"],
+            "original": row["comment"],
+            "status": row["status"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"]
+        }
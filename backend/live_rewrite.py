@@ -0,0 +1,105 @@
+"""
+Live Rewrite Sessions
+One session per WebSocket connection: drafts are debounced on the server and a
+newer draft cancels whatever the previous one was doing (waiting or generating),
+so only the latest draft reaches Gemini.
+"""
+
+import asyncio
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from metrics import metrics
+
+# send(message) delivers one JSON message to the client
+SendFn = Callable[[Dict[str, Any]], Awaitable[None]]
+# generate(draft, emit) streams partial / final messages for one draft through emit()
+GenerateFn = Callable[[Dict[str, Any], SendFn], Awaitable[None]]
+
+
+class LiveRewriteSession:
+    """
+    Debounce + cancel-on-supersede for one client.
+
+    submit() never blocks: it cancels the current draft's task and schedules a new
+    one that sleeps `debounce` seconds before calling `generate`. Messages from a
+    superseded draft are dropped, every message carries its `draft_id`.
+    """
+
+    active = 0  # open sessions across the process
+
+    def __init__(self, send: SendFn, generate: GenerateFn, debounce: float = 0.4):
+        self.send = send
+        self.generate = generate
+        self.debounce = debounce
+
+        self._draft_ids = itertools.count(1)
+        self._current_id = 0
+        self._task: Optional[asyncio.Task] = None
+        self._generating = False
+        self._closed = False
+
+        LiveRewriteSession.active += 1
+        metrics.inc("live_rewrite_connections_total")
+
+    async def submit(self, draft: Dict[str, Any]) -> int:
+        await self._cancel_current()
+
+        draft_id = next(self._draft_ids)
+        self._current_id = draft_id
+        metrics.inc("live_rewrite_drafts_total")
+        self._task = asyncio.create_task(self._run(draft_id, draft))
+        return draft_id
+
+    async def cancel(self):
+        """Drop the current draft without submitting a new one"""
+        await self._cancel_current()
+
+    async def close(self):
+        await self._cancel_current()
+        if not self._closed:
+            self._closed = True
+            LiveRewriteSession.active -= 1
+
+    # ------------------------------------------------------------------
+
+    async def _cancel_current(self):
+        task = self._task
+        if task is None or task.done():
+            return
+
+        stage = "generating" if self._generating else "debounce"
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        metrics.inc("live_rewrite_cancelled_total", stage=stage)
+
+    async def _run(self, draft_id: int, draft: Dict[str, Any]):
+        await asyncio.sleep(self.debounce)
+
+        async def emit(message: Dict[str, Any]):
+            if draft_id == self._current_id:
+                await self.send({**message, "draft_id": draft_id})
+
+        self._generating = True
+        start = time.perf_counter()
+        try:
+            await self.generate(draft, emit)
+            metrics.inc("live_rewrite_completed_total")
+            metrics.observe("live_rewrite_seconds", time.perf_counter() - start)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            metrics.inc("live_rewrite_errors_total")
+            try:
+                await emit({"type": "error", "detail": str(e)})
+            except Exception:
+                pass  # the socket itself is what failed
+        finally:
+            self._generating = False
+
+
+metrics.register_gauge("live_rewrite_connections", lambda: LiveRewriteSession.active)
@@ -0,0 +1,189 @@
+"""
+Multi-Key, Multi-Model LLM Pool
+Spreads Gemini traffic over several API keys and models with weighted routing,
+per-key quota/error tracking and temporary ejection of keys that hit 429.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import metrics
+
+# factory(api_key, model) -> chat model client
+ClientFactory = Callable[[str, str], Any]
+
+
+class LLMPoolExhausted(Exception):
+    """Every pool member is ejected or out of quota"""
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True for quota / rate-limit errors (HTTP 429, gRPC RESOURCE_EXHAUSTED)"""
+    if getattr(error, "code", None) == 429 or type(error).__name__ == "ResourceExhausted":
+        return True
+    message = str(error)
+    return "429" in message or "RESOURCE_EXHAUSTED" in message or "quota" in message.lower()
+
+
+# ============================================================================
+# POOL MEMBER
+# ============================================================================
+
+class PoolMember:
+    """One (API key, model) pair with its own client, quota window and health"""
+
+    def __init__(self, api_key: str, model: str, weight: int, factory: ClientFactory, rpm_limit: int = 0,
+                 key_index: int = 0):
+        self.api_key = api_key
+        self.model = model
+        self.weight = max(1, weight)
+        self.rpm_limit = rpm_limit
+        # By position, not key suffix: two keys can end in the same characters (and the name is a metric label)
+        self.name = f"key{key_index + 1}/{model}"
+
+        self._factory = factory
+        self._client = None
+        self.current_weight = 0
+        self.recent_calls = deque()  # call timestamps within the last minute
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.consecutive_errors = 0
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._factory(self.api_key, self.model)
+        return self._client
+
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+
+    def has_quota(self, now: float) -> bool:
+        while self.recent_calls and now - self.recent_calls[0] > 60:
+            self.recent_calls.popleft()
+        return not self.rpm_limit or len(self.recent_calls) < self.rpm_limit
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "weight": self.weight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "calls_last_minute": len(self.recent_calls),
+            "rpm_limit": self.rpm_limit or None,
+            "ejected": self.is_ejected(now),
+            "ejected_for": round(max(0.0, self.ejected_until - now), 1)
+        }
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+class LLMPool:
+    """
+    Smooth weighted round-robin over healthy members.
+
+    A member that returns 429 is ejected for `eject_seconds`, doubling on each
+    repeated ejection (capped at `max_eject_seconds`). `max_consecutive_errors`
+    other failures in a row also eject it. Members over their per-minute quota are skipped.
+    """
+
+    def __init__(
+        self,
+        members: List[PoolMember],
+        eject_seconds: float = 30.0,
+        max_eject_seconds: float = 300.0,
+        max_consecutive_errors: int = 5
+    ):
+        self.members = members
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.max_consecutive_errors = max_consecutive_errors
+        self._lock = threading.Lock()
+
+        for member in members:
+            metrics.register_gauge(
+                "llm_pool_member_ejected", lambda m=member: int(m.is_ejected(time.monotonic())), member=member.name
+            )
+        metrics.register_gauge("llm_pool_healthy_members", self.healthy_count)
+
+    @classmethod
+    def from_config(cls, api_keys: List[str], models: List[str], factory: ClientFactory,
+                    model_weights: Optional[Dict[str, int]] = None, rpm_limit: int = 0, **kwargs) -> "LLMPool":
+        """One member per (key, model) pair"""
+        model_weights = model_weights or {}
+        members = [
+            PoolMember(key, model, model_weights.get(model, 1), factory, rpm_limit, key_index=index)
+            for index, key in enumerate(api_keys)
+            for model in models
+        ]
+        return cls(members, **kwargs)
+
+    @property
+    def available(self) -> bool:
+        return bool(self.members)
+
+    def healthy_count(self) -> int:
+        now = time.monotonic()
+        return sum(1 for m in self.members if not m.is_ejected(now))
+
+    def acquire(self, exclude: Optional[List[PoolMember]] = None) -> PoolMember:
+        """Pick the next member by smooth weighted round-robin, skipping ejected/over-quota ones"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                m for m in self.members
+                if not m.is_ejected(now) and m.has_quota(now) and not (exclude and m in exclude)
+            ]
+            if not candidates:
+                metrics.inc("llm_pool_exhausted_total")
+                raise LLMPoolExhausted("All Gemini keys are ejected or out of quota")
+
+            total = sum(m.weight for m in candidates)
+            for member in candidates:
+                member.current_weight += member.weight
+            chosen = max(candidates, key=lambda m: m.current_weight)
+            chosen.current_weight -= total
+
+            chosen.recent_calls.append(now)
+            chosen.requests += 1
+
+        metrics.inc("llm_pool_requests_total", member=chosen.name)
+        return chosen
+
+    def report_success(self, member: PoolMember, latency: float):
+        with self._lock:
+            member.consecutive_errors = 0
+            member.ejections = 0
+        metrics.observe("llm_pool_latency_seconds", latency, member=member.name)
+
+    def report_failure(self, member: PoolMember, error: Exception):
+        rate_limited = is_rate_limited(error)
+        with self._lock:
+            member.errors += 1
+            member.consecutive_errors += 1
+            if rate_limited:
+                member.rate_limited += 1
+            eject = rate_limited or member.consecutive_errors >= self.max_consecutive_errors
+            if eject:
+                duration = min(self.max_eject_seconds, self.eject_seconds * (2 ** member.ejections))
+                member.ejected_until = time.monotonic() + duration
+                member.ejections += 1
+                member.consecutive_errors = 0
+
+        metrics.inc("llm_pool_errors_total", member=member.name, kind="rate_limited" if rate_limited else "error")
+        if eject:
+            metrics.inc("llm_pool_ejections_total", member=member.name)
+            print(f"LLM pool: ejected {member.name} for {duration:.0f}s ({'429' if rate_limited else 'errors'})")
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {member.name: member.snapshot(now) for member in self.members}
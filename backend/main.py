@@ -4,11 +4,18 @@ os.environ['TOKENIZERS_PARALLELISM'] = 'false'
 os.environ['TRANSFORMERS_OFFLINE'] = '1'
 os.environ['HF_HUB_OFFLINE'] = '1'
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any, Literal, Annotated, TypedDict
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any, Literal, Annotated, Tuple, TypedDict
 import uvicorn
+import numpy as np
+import asyncio
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -26,6 +33,28 @@ except ImportError as e:
 
 load_dotenv()
 
+from pipeline import LinearPipeline
+from metrics import metrics
+from resilience import CLOSED, CircuitBreaker, CircuitOpenError, RequestHedger
+from jobs import JobManager, RetryItem
+from admission import AdmissionController, AdmissionRejected
+from llm_pool import LLMPool, LLMPoolExhausted, PoolMember, is_rate_limited
+from shared_cache import create_cache_backend, make_key
+from live_rewrite import LiveRewriteSession
+from speculative import SpeculativeRewriter
+from corpus import comment_corpus
+from cpu_pool import cpu_pool
+from hashtag_index import hashtag_index
+from subreddit_router import subreddit_router
+from responses import compact_endpoint
+from compaction import compact_input, restore_placeholders
+from engagement import engagement_levels, engagement_predictions, score_engagement
+from text_tasks import explain_original, explain_rewrite, sentiment_label
+from deadlines import (
+    Deadline, DeadlineExceeded, get_deadline, set_deadline, reset_deadline,
+    deadline_expired, parse_deadline, remaining_timeout
+)
+
 # Import API clients and scrapers
 try:
     from api_clients import social_apis
@@ -37,10 +66,47 @@ except ImportError as e:
     social_apis = None
     web_scrapers = None
 
+# Warm-up / readiness state (see run_warmup and /ready)
+WARMUP_STATE: Dict[str, Any] = {
+    "ready": False,
+    "started_at": None,
+    "finished_at": None,
+    "duration": None,
+    "steps": {}
+}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the warm-up stage in the background so /ready can report progress"""
+    warmup_task = None
+    if os.getenv("WARMUP_ENABLED", "true").lower() == "true":
+        warmup_task = asyncio.create_task(asyncio.to_thread(run_warmup))
+    else:
+        WARMUP_STATE["ready"] = True
+    
+    # Job workers queue for LLM admission on this loop
+    llm_admission.bind_loop(asyncio.get_running_loop())
+    job_manager.start()
+    cpu_pool_task = asyncio.create_task(asyncio.to_thread(cpu_pool.start))
+    hashtag_task = asyncio.create_task(asyncio.to_thread(warm_hashtag_index))
+    if SPECULATIVE_ENABLED:
+        speculative_rewriter.start()
+    
+    yield
+    
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    await speculative_rewriter.stop()
+    job_manager.stop()
+    comment_corpus.close()
+    await asyncio.gather(cpu_pool_task, hashtag_task, return_exceptions=True)
+    await asyncio.to_thread(cpu_pool.stop)
+
 app = FastAPI(
     title="AI Comment Rewriter API",
     description="Transform your tone with Gemini AI + Real Social Media Data",
-    version="3.0.0"
+    version="3.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -51,6 +117,165 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request deadline: ?deadline=<seconds> or X-Request-Deadline: <seconds>, else server default
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "30"))
+MAX_DEADLINE_SECONDS = float(os.getenv("MAX_REQUEST_DEADLINE_SECONDS", "120"))
+
+@app.middleware("http")
+async def deadline_middleware(request, call_next):
+    seconds = parse_deadline(
+        request.headers.get("X-Request-Deadline"),
+        request.query_params.get("deadline"),
+        DEFAULT_DEADLINE_SECONDS,
+        MAX_DEADLINE_SECONDS
+    )
+    token = set_deadline(Deadline(seconds))
+    try:
+        return await call_next(request)
+    finally:
+        reset_deadline(token)
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": f"Server busy ({exc.reason}), retry later", "reason": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# Admission control for Gemini-bound work - interactive requests are served before batch work
+llm_admission = AdmissionController(
+    "llm",
+    max_concurrent=int(os.getenv("ADMISSION_MAX_CONCURRENT", "8")),
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "64")),
+    lane_max_wait={
+        "interactive": float(os.getenv("ADMISSION_MAX_WAIT_INTERACTIVE", "10")),
+        "batch": float(os.getenv("ADMISSION_MAX_WAIT_BATCH", "30")),
+        "background": float(os.getenv("ADMISSION_MAX_WAIT_BACKGROUND", "60"))
+    }
+)
+
+async def run_within_deadline(lane: str, fn, *args):
+    """
+    Run blocking work in a thread under an admission slot, giving up (504) once the request budget is spent.
+    The thread can't be interrupted, so the slot is held until it actually finishes - an abandoned
+    workflow still counts against the concurrency cap instead of letting a new request pile on top.
+    """
+    await llm_admission.acquire(lane)
+    start = time.perf_counter()
+    task = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+    
+    def finished(done: asyncio.Future):
+        llm_admission.release(time.perf_counter() - start)
+        if not done.cancelled():
+            done.exception()  # retrieved here so an abandoned failure isn't logged as unhandled
+    task.add_done_callback(finished)
+    
+    deadline = get_deadline()
+    try:
+        return await asyncio.wait_for(
+            asyncio.shield(task),
+            timeout=deadline.remaining() if deadline else None
+        )
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"Deadline of {deadline.budget}s exceeded")
+
+# Shared cache (rewrite results + upstream social data) - one store for all uvicorn workers
+shared_cache = create_cache_backend(
+    os.getenv("CACHE_BACKEND", "sqlite:///cache.db"),
+    max_bytes=int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+)
+REWRITE_CACHE_TTL = float(os.getenv("REWRITE_CACHE_TTL", "86400"))
+SOCIAL_CACHE_TTL = float(os.getenv("SOCIAL_CACHE_TTL", "300"))
+
+def cache_get(namespace: str, key: str) -> Optional[Any]:
+    """Cache read that never fails the request"""
+    try:
+        return shared_cache.get(namespace, key)
+    except Exception as e:
+        print(f"Cache read error: {e}")
+        return None
+
+def cache_set(namespace: str, key: str, value: Any, ttl: float):
+    try:
+        shared_cache.set(namespace, key, value, ttl)
+    except Exception as e:
+        print(f"Cache write error: {e}")
+
+def cached_fetch(fn, *args, **kwargs):
+    """Serve an upstream API/scraper call from the shared cache; empty or deadline-cut results aren't stored"""
+    key = make_key(fn.__qualname__, args, kwargs)
+    cached = cache_get("social", key)
+    if cached is not None:
+        return cached
+    
+    result = fn(*args, **kwargs)
+    if result and not deadline_expired():
+        cache_set("social", key, result, SOCIAL_CACHE_TTL)
+    return result
+
+# Local corpus: answer comment queries from the FTS index when it has enough fresh matches
+CORPUS_MAX_AGE = float(os.getenv("CORPUS_MAX_AGE_SECONDS", "3600"))
+
+def corpus_lookup(query: Optional[str], platform: str, kind: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """`limit` fresh matches from the corpus, or None to fall back to a live fetch"""
+    if not query or not comment_corpus.enabled:
+        return None
+    try:
+        hits = comment_corpus.search(query, platform=platform, kind=kind, limit=limit, max_age=CORPUS_MAX_AGE)
+    except Exception as e:
+        print(f"Corpus search error: {e}")
+        return None
+    
+    metrics.inc("corpus_lookups_total", platform=platform, result="hit" if len(hits) >= limit else "miss")
+    return hits if len(hits) >= limit else None
+
+# Hashtag index: rebuilt from the corpus's recent YouTube items on startup, then updated on every fetch
+HASHTAG_SUGGESTIONS = int(os.getenv("HASHTAG_SUGGESTIONS", "5"))
+HASHTAG_WARM_LIMIT = int(os.getenv("HASHTAG_WARM_LIMIT", "20000"))
+
+def warm_hashtag_index():
+    try:
+        rows = comment_corpus.recent_texts("youtube", hashtag_index.tau * 5, HASHTAG_WARM_LIMIT)
+    except Exception as e:
+        print(f"Hashtag index warm-up error: {e}")
+        return
+    for text, fetched_at in rows:
+        hashtag_index.observe([text], at=fetched_at)
+    print(f"✅ Hashtag index warmed from {len(rows)} corpus items")
+
+# Negative cache: YouTube videos that returned no comments (disabled or empty) are skipped for a while
+YOUTUBE_NO_COMMENTS_TTL = float(os.getenv("YOUTUBE_NO_COMMENTS_TTL", "21600"))
+
+def youtube_has_comments(video: Dict[str, Any]) -> bool:
+    """False if statistics.commentCount is 0/missing or the video is in the negative cache"""
+    if not video.get("comments"):
+        return False
+    try:
+        return not shared_cache.contains("youtube_no_comments", video["id"])
+    except Exception:
+        return True
+
+def fetch_youtube_comments(video_id: str, limit: int) -> List[Dict[str, Any]]:
+    """get_video_comments that remembers (and skips) videos without comments"""
+    if not youtube_has_comments({"id": video_id, "comments": True}):
+        metrics.inc("youtube_negative_cache_total", result="skipped")
+        return []
+    
+    comments = cached_fetch(social_apis.youtube.get_video_comments, video_id, max_results=limit)
+    if not comments and not deadline_expired():
+        cache_set("youtube_no_comments", video_id, True, YOUTUBE_NO_COMMENTS_TTL)
+        metrics.inc("youtube_negative_cache_total", result="stored")
+    return comments
+
+def rewrite_cache_key(comment: str, tone: str, context: Optional[str] = None,
+                      persona: Optional[str] = None, platform: Optional[str] = None) -> str:
+    return make_key(comment, tone, context, persona, platform)
+
 # Pydantic models
 class RewriteRequest(BaseModel):
     comment: str
@@ -71,6 +296,48 @@ class RewriteResponse(BaseModel):
     platform_info: Optional[Dict[str, Any]] = None
     suggested_hashtags: Optional[List[str]] = None
     engagement_prediction: Optional[Dict[str, Any]] = None
+    input_compaction: Optional[Dict[str, Any]] = None
+    cached: bool = False
+
+ToneName = Literal["casual", "professional", "supportive", "sarcastic", "respectful", "empathetic", "funny", "motivational"]
+
+class MultiToneRewriteRequest(BaseModel):
+    comment: str
+    tones: Optional[List[ToneName]] = None  # defaults to every tone
+    context: Optional[str] = None
+    persona: Optional[str] = None
+    platform: Optional[Literal["reddit", "youtube"]] = None
+
+class ToneVariant(BaseModel):
+    tone: str
+    rewritten: str
+    explanation: List[str]
+    model_used: str
+    platform_info: Optional[Dict[str, Any]] = None
+    suggested_hashtags: Optional[List[str]] = None
+    engagement_prediction: Optional[Dict[str, Any]] = None
+
+class MultiToneRewriteResponse(BaseModel):
+    original: str
+    persona: Optional[str]
+    detected_sentiment: Optional[str]
+    variants: List[ToneVariant]
+    fallback_tones: List[str]
+    processing_time: float
+
+class JobSubmitRequest(BaseModel):
+    comments: List[str]
+    tone: ToneName = "professional"
+    context: Optional[str] = None
+    persona: Optional[str] = None
+    platform: Optional[Literal["reddit", "youtube"]] = None
+
+class EngagementScoreRequest(BaseModel):
+    comments: List[str]
+    tone: ToneName = "professional"
+    tones: Optional[List[ToneName]] = None  # per-comment tones, overrides `tone`
+    platform: Literal["reddit", "youtube"] = "youtube"
+    top_k: Optional[int] = Field(default=None, ge=1)  # only the k highest-scoring comments
 
 class ToneInfo(BaseModel):
     name: str
@@ -142,6 +409,9 @@ TONE_DEFINITIONS = {
 # LangGraph State
 class RewriteState(TypedDict):
     comment: str
+    prompt_comment: Optional[str]  # compacted text sent to the LLM
+    placeholders: Dict[str, str]
+    input_compaction: Optional[Dict[str, Any]]
     tone: str
     context: Optional[str]
     persona: Optional[str]
@@ -178,25 +448,187 @@ PLATFORM_CONFIGS = {
     }
 }
 
-def get_gemini_llm():
+def create_gemini_client(api_key: str, model: str):
+    return ChatGoogleGenerativeAI(
+        model=model,
+        google_api_key=api_key,
+        temperature=0.7
+    )
+
+def parse_list_env(name: str) -> List[str]:
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
+
+def create_llm_pool() -> LLMPool:
+    """
+    One pool member per (API key, model) pair.
+    GEMINI_API_KEYS / GEMINI_MODELS (comma-separated) fall back to GOOGLE_API_KEY / GEMINI_MODEL.
+    """
     if not LANGCHAIN_AVAILABLE:
-        return None
+        return LLMPool([])
     
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
+    api_keys = parse_list_env("GEMINI_API_KEYS") or parse_list_env("GOOGLE_API_KEY")
+    if not api_keys:
         print("Warning: GOOGLE_API_KEY not found")
+        return LLMPool([])
+    
+    models = parse_list_env("GEMINI_MODELS") or [os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")]
+    model_weights = {}
+    for entry in parse_list_env("GEMINI_MODEL_WEIGHTS"):  # e.g. gemini-2.0-flash-exp=3
+        model, _, weight = entry.partition("=")
+        model_weights[model.strip()] = int(weight or 1)
+    
+    return LLMPool.from_config(
+        api_keys,
+        models,
+        create_gemini_client,
+        model_weights=model_weights,
+        rpm_limit=int(os.getenv("GEMINI_KEY_RPM", "0")),
+        eject_seconds=float(os.getenv("GEMINI_EJECT_SECONDS", "30")),
+        max_eject_seconds=float(os.getenv("GEMINI_MAX_EJECT_SECONDS", "300"))
+    )
+
+llm_pool = create_llm_pool()
+
+# Without an explicit limit, admit 8 concurrent Gemini calls per API key so throughput scales with keys
+if not os.getenv("ADMISSION_MAX_CONCURRENT"):
+    llm_admission.max_concurrent = 8 * max(1, len({member.api_key for member in llm_pool.members}))
+
+# Rate-limited calls are retried on another key up to this many times
+GEMINI_POOL_RETRIES = int(os.getenv("GEMINI_POOL_RETRIES", "1"))
+
+def get_gemini_llm():
+    """Client of the first pool member (clients are created once and reused across requests)"""
+    if not llm_pool.available:
         return None
     
     try:
-        return ChatGoogleGenerativeAI(
-            model=os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp"),
-            google_api_key=api_key,
-            temperature=0.7
-        )
+        return llm_pool.members[0].client
     except Exception as e:
         print(f"Error initializing Gemini: {e}")
         return None
 
+# Circuit breaker around Gemini - while open, requests go straight to mock_rewrite
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    failure_rate_threshold=float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5")),
+    slow_call_seconds=float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "10")),
+    slow_call_rate_threshold=float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.8")),
+    window_size=int(os.getenv("CIRCUIT_WINDOW", "20")),
+    min_calls=int(os.getenv("CIRCUIT_MIN_CALLS", "5")),
+    open_seconds=float(os.getenv("CIRCUIT_OPEN_SECONDS", "30")),
+    half_open_probes=int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "2"))
+)
+
+# Optional request hedging - duplicate slow Gemini calls past a latency percentile
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+gemini_hedger = RequestHedger(
+    "gemini",
+    latency_metric="llm_latency_seconds",
+    latency_labels={"outcome": "ok"},
+    percentile=float(os.getenv("HEDGE_PERCENTILE", "0.95")),
+    min_delay=float(os.getenv("HEDGE_MIN_DELAY", "0.3")),
+    max_delay=float(os.getenv("HEDGE_MAX_DELAY", "5")),
+    default_delay=float(os.getenv("HEDGE_DEFAULT_DELAY", "2")),
+    budget=float(os.getenv("HEDGE_BUDGET", "0.1"))
+)
+
+# Per-call Gemini timeout when the request budget allows more
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+
+def invoke_gemini(messages):
+    """
+    Call Gemini through the key pool and circuit breaker (hedged if enabled).
+    Returns (response, model). A 429 ejects the key and retries on another one.
+    Raises CircuitOpenError when the breaker refuses the call.
+    
+    Each attempt is reported to the key pool; the breaker only sees the request's final
+    outcome, so a rate limit on one key can't open it while healthy keys remain.
+    """
+    permit = gemini_breaker.allow_request()
+    if not permit:
+        raise CircuitOpenError(f"Circuit breaker '{gemini_breaker.name}' is open")
+    
+    timeout = remaining_timeout(GEMINI_TIMEOUT)
+    request_start = time.perf_counter()
+    
+    # A half-open probe permit covers exactly one upstream call, so probes are never hedged
+    if HEDGE_ENABLED and permit == CLOSED:
+        try:
+            result = gemini_hedger.run(lambda: ainvoke_gemini(messages, timeout), timeout=timeout)
+        except LLMPoolExhausted:
+            raise  # nothing went upstream
+        except Exception:
+            # Including concurrent.futures.TimeoutError: the hedger cancelled every attempt
+            gemini_breaker.record_failure(time.perf_counter() - request_start)
+            raise
+        gemini_breaker.record_success(time.perf_counter() - request_start)
+        return result
+    
+    tried = []
+    while True:
+        try:
+            member = llm_pool.acquire(exclude=tried)
+        except LLMPoolExhausted:
+            if tried:
+                # Every key we could still try is rate limited - the request failed
+                gemini_breaker.record_failure(time.perf_counter() - request_start)
+            else:
+                # The breaker granted a permit but nothing went upstream
+                gemini_breaker.release_probe()
+            raise
+        start = time.perf_counter()
+        try:
+            response = member.client.invoke(messages, timeout=timeout)
+        except Exception as e:
+            record_gemini_call(member, time.perf_counter() - start, error=e)
+            tried.append(member)
+            if is_rate_limited(e) and len(tried) <= GEMINI_POOL_RETRIES and not deadline_expired():
+                continue
+            gemini_breaker.record_failure(time.perf_counter() - request_start)
+            raise
+        
+        record_gemini_call(member, time.perf_counter() - start)
+        gemini_breaker.record_success(time.perf_counter() - request_start)
+        return response, member.model
+
+async def ainvoke_gemini(messages, timeout: Optional[float] = None):
+    """Single async Gemini attempt (used by the hedger, which records the attempts it cancels)"""
+    member = llm_pool.acquire()
+    start = time.perf_counter()
+    try:
+        response = await member.client.ainvoke(messages, timeout=timeout)
+    except Exception as e:
+        record_gemini_call(member, time.perf_counter() - start, error=e)
+        raise
+    
+    record_gemini_call(member, time.perf_counter() - start)
+    return response, member.model
+
+async def astream_gemini(messages, member: PoolMember):
+    """Stream one Gemini completion from `member`; cancelling the consumer aborts the upstream call"""
+    start = time.perf_counter()
+    try:
+        async for chunk in member.client.astream(messages):
+            if chunk.content:
+                yield chunk.content
+    except asyncio.CancelledError:
+        raise  # superseded by a newer draft - neither a success nor a failure
+    except Exception as e:
+        record_gemini_call(member, time.perf_counter() - start, error=e)
+        gemini_breaker.record_failure(time.perf_counter() - start)
+        raise
+    
+    record_gemini_call(member, time.perf_counter() - start)
+    gemini_breaker.record_success(time.perf_counter() - start)
+
+def record_gemini_call(member: PoolMember, latency: float, error: Optional[Exception] = None):
+    """Per-attempt bookkeeping (key health + latency); the breaker is recorded once per request by the caller"""
+    if error is None:
+        llm_pool.report_success(member, latency)
+    else:
+        llm_pool.report_failure(member, error)
+    metrics.observe("llm_latency_seconds", latency, outcome="error" if error else "ok")
+
 def generate_hashtags(comment: str, platform: str, tone: str) -> List[str]:
     """Generate platform-appropriate hashtags"""
     if not platform or platform == "reddit":
@@ -205,7 +637,12 @@ def generate_hashtags(comment: str, platform: str, tone: str) -> List[str]:
     config = PLATFORM_CONFIGS.get(platform, {})
     limit = config.get("hashtag_limit", 3)
     
-    # Extract keywords from comment
+    # Real hashtags that co-occur with the comment's keywords in fetched YouTube content
+    hashtags = hashtag_index.suggest(comment, min(limit, HASHTAG_SUGGESTIONS))
+    if hashtags:
+        return hashtags
+    
+    # Nothing indexed for these keywords yet - fall back to templates
     words = comment.lower().split()
     keywords = [w.strip('.,!?') for w in words if len(w) > 5][:3]
     
@@ -215,7 +652,6 @@ def generate_hashtags(comment: str, platform: str, tone: str) -> List[str]:
     }
     
     templates = hashtag_templates.get(platform, ["#{}"])
-    hashtags = []
     
     for keyword in keywords[:limit]:
         for template in templates:
@@ -232,41 +668,9 @@ def predict_engagement(comment: str, tone: str, platform: str) -> Dict[str, Any]
     if not platform:
         return {}
     
-    config = PLATFORM_CONFIGS.get(platform, {})
-    comment_len = len(comment)
-    
-    # Simple heuristic-based engagement prediction
-    base_score = 50  # baseline
-    
-    # Length optimization
-    if platform == "twitter" and 71 <= comment_len <= 100:
-        base_score += 20
-    elif platform == "linkedin" and 150 <= comment_len <= 300:
-        base_score += 15
-    
-    # Tone matching
-    if tone in config.get("best_tones", []):
-        base_score += 15
-    
-    # Emoji bonus
-    emoji_count = sum(1 for c in comment if ord(c) > 127000)
-    if emoji_count > 0 and config.get("emoji_friendly"):
-        base_score += 10
-    
-    # Question bonus (drives engagement)
-    if "?" in comment:
-        base_score += 10
-    
-    virality_score = min(100, base_score)
-    
-    return {
-        "virality_score": virality_score,
-        "predicted_likes": int(virality_score * 1.5),
-        "predicted_shares": int(virality_score * 0.5),
-        "predicted_comments": int(virality_score * 0.3),
-        "optimal_post_time": "Best time: 9-11 AM or 7-9 PM (local time)",
-        "engagement_level": "High" if virality_score > 70 else "Medium" if virality_score > 40 else "Low"
-    }
+    # Same engine as /api/engagement/score, for a batch of one
+    scores = score_engagement([comment], tone, platform, PLATFORM_CONFIGS.get(platform, {}))
+    return engagement_predictions(scores)[0]
 
 def optimize_for_platform(comment: str, platform: str) -> str:
     """Optimize comment for specific platform"""
@@ -282,18 +686,74 @@ def optimize_for_platform(comment: str, platform: str) -> str:
     
     return comment
 
+def build_initial_state(comment: str, tone: str, context: Optional[str] = None,
+                        persona: Optional[str] = None, platform: Optional[str] = None,
+                        detected_sentiment: Optional[str] = None) -> RewriteState:
+    return {
+        "comment": comment,
+        "prompt_comment": None,
+        "placeholders": {},
+        "input_compaction": None,
+        "tone": tone,
+        "context": context,
+        "persona": persona,
+        "platform": platform,
+        "detected_sentiment": detected_sentiment,
+        "system_prompt": None,
+        "user_prompt": None,
+        "rewritten": None,
+        "explanation": [],
+        "model_used": "unknown",
+        "platform_info": None,
+        "suggested_hashtags": None,
+        "engagement_prediction": None
+    }
+
+# Input compaction: markup/URLs/quotes out, token budget enforced, before any LLM prompt
+INPUT_COMPACTION_ENABLED = os.getenv("INPUT_COMPACTION_ENABLED", "true").lower() == "true"
+INPUT_MAX_TOKENS = int(os.getenv("INPUT_MAX_TOKENS", "512"))
+
+def compact_input_node(state: RewriteState) -> RewriteState:
+    if state.get("prompt_comment") is not None:
+        return state  # already compacted (shared multi-tone state)
+    
+    if not INPUT_COMPACTION_ENABLED:
+        state["prompt_comment"] = state["comment"]
+        return state
+    
+    compacted = compact_input(state["comment"], INPUT_MAX_TOKENS)
+    state["prompt_comment"] = compacted["text"]
+    state["placeholders"] = compacted["placeholders"]
+    state["input_compaction"] = compacted["stats"]
+    metrics.inc("llm_input_tokens_saved_total", compacted["stats"]["tokens_saved"])
+    if compacted["stats"]["truncated"]:
+        metrics.inc("llm_input_truncated_total")
+    return state
+
+def restore_placeholders_node(state: RewriteState) -> RewriteState:
+    if state.get("placeholders") and not state["model_used"].startswith("mock"):
+        state["rewritten"] = restore_placeholders(state["rewritten"], state["placeholders"])
+    return state
+
+def prompt_comment(state: RewriteState) -> str:
+    return state.get("prompt_comment") or state["comment"]
+
+def placeholder_rule(state: RewriteState, number: int) -> str:
+    """Extra prompt rule when the comment contains [URLn-nonce]/[QUOTEn-nonce] placeholders"""
+    if not state.get("placeholders"):
+        return ""
+    return f"\n{number}. Keep placeholders such as {' or '.join(list(state['placeholders'])[:2])} exactly as written"
+
 def detect_tone_node(state: RewriteState) -> RewriteState:
+    if state.get("detected_sentiment"):
+        return state  # precomputed for the whole batch
+    
+    if deadline_expired():
+        state["detected_sentiment"] = "neutral"
+        return state
+    
     try:
-        from textblob import TextBlob
-        blob = TextBlob(state["comment"])
-        polarity = blob.sentiment.polarity
-        
-        if polarity < -0.3:
-            state["detected_sentiment"] = "negative"
-        elif polarity > 0.3:
-            state["detected_sentiment"] = "positive"
-        else:
-            state["detected_sentiment"] = "neutral"
+        state["detected_sentiment"] = cpu_pool.run(sentiment_label, prompt_comment(state))
     except:
         state["detected_sentiment"] = "neutral"
     
@@ -315,14 +775,14 @@ RULES:
 2. Match the {tone_info["name"]} tone precisely
 3. Be natural and authentic
 4. Keep it concise (social media appropriate)
-5. Return ONLY the rewritten comment without quotes or extra text"""
+5. Return ONLY the rewritten comment without quotes or extra text{placeholder_rule(state, 6)}"""
 
     context_str = f"\\nCONTEXT: {state.get('context')}" if state.get("context") else ""
     persona_str = f"\\nWrite in the style of: {state.get('persona')}" if state.get("persona") else ""
     
     user_prompt = f"""Rewrite this comment in a {tone_info["name"]} tone:{context_str}{persona_str}
 
-Original comment: {state["comment"]}
+Original comment: {prompt_comment(state)}
 
 Rewritten comment:"""
     
@@ -331,21 +791,31 @@ Rewritten comment:"""
     return state
 
 def generate_rewrite_node(state: RewriteState) -> RewriteState:
-    llm = get_gemini_llm()
-    
-    if llm is None:
+    if not llm_pool.available:
         state["rewritten"] = mock_rewrite(state["comment"], state["tone"])
         state["model_used"] = "mock-fallback"
         return state
     
+    # Deadline first: invoke_gemini() takes a probe slot while half-open
+    if deadline_expired():
+        state["rewritten"] = mock_rewrite(state["comment"], state["tone"])
+        state["model_used"] = "mock-deadline-fallback"
+        return state
+    
     try:
         messages = [
             SystemMessage(content=state["system_prompt"]),
             HumanMessage(content=state["user_prompt"])
         ]
-        response = llm.invoke(messages)
+        response, model = invoke_gemini(messages)
         state["rewritten"] = response.content.strip().strip('"').strip("'")
-        state["model_used"] = "gemini-2.0-flash-exp"
+        state["model_used"] = model
+    except CircuitOpenError:
+        state["rewritten"] = mock_rewrite(state["comment"], state["tone"])
+        state["model_used"] = "mock-circuit-open"
+    except LLMPoolExhausted:
+        state["rewritten"] = mock_rewrite(state["comment"], state["tone"])
+        state["model_used"] = "mock-pool-exhausted"
     except Exception as e:
         print(f"Gemini error: {e}")
         state["rewritten"] = mock_rewrite(state["comment"], state["tone"])
@@ -354,24 +824,13 @@ def generate_rewrite_node(state: RewriteState) -> RewriteState:
     return state
 
 def explain_changes_node(state: RewriteState) -> RewriteState:
-    explanations = []
-    original = state["comment"].lower()
-    rewritten = state["rewritten"].lower()
-    tone = state["tone"]
-    
-    if any(word in original for word in ["trash", "suck", "terrible", "awful"]):
-        explanations.append("Removed harsh language for constructive tone")
-    if "wrong" in original or "stupid" in original:
-        explanations.append("Softened criticism to maintain respect")
-    if len(rewritten) > len(original) * 1.3:
-        explanations.append("Added context and clarity")
-    if state.get("detected_sentiment") == "negative" and tone in ["supportive", "empathetic"]:
-        explanations.append(f"Shifted from negative to {tone} sentiment")
-    
-    if not explanations:
-        explanations.append(f"Adjusted phrasing to match {tone} tone")
-    
-    state["explanation"] = explanations
+    state["explanation"] = explain_rewrite(
+        explain_original(state["comment"]),
+        state["comment"],
+        state["rewritten"],
+        state["tone"],
+        state.get("detected_sentiment")
+    )
     return state
 
 def platform_optimization_node(state: RewriteState) -> RewriteState:
@@ -405,24 +864,123 @@ def platform_optimization_node(state: RewriteState) -> RewriteState:
     
     return state
 
-def create_rewrite_workflow():
+# Ordered workflow nodes - shared by the LangGraph workflow and the linear executor
+REWRITE_PIPELINE_NODES = [
+    ("compact_input", compact_input_node),
+    ("detect_tone", detect_tone_node),
+    ("create_prompt", create_prompt_node),
+    ("generate_rewrite", generate_rewrite_node),
+    ("restore_placeholders", restore_placeholders_node),
+    ("explain_changes", explain_changes_node),
+    ("platform_optimization", platform_optimization_node),
+]
+
+def create_rewrite_workflow(nodes=None):
+    nodes = nodes or REWRITE_PIPELINE_NODES
     workflow = StateGraph(RewriteState)
     
-    workflow.add_node("detect_tone", detect_tone_node)
-    workflow.add_node("create_prompt", create_prompt_node)
-    workflow.add_node("generate_rewrite", generate_rewrite_node)
-    workflow.add_node("explain_changes", explain_changes_node)
-    workflow.add_node("platform_optimization", platform_optimization_node)
+    for name, node in nodes:
+        workflow.add_node(name, node)
     
-    workflow.set_entry_point("detect_tone")
-    workflow.add_edge("detect_tone", "create_prompt")
-    workflow.add_edge("create_prompt", "generate_rewrite")
-    workflow.add_edge("generate_rewrite", "explain_changes")
-    workflow.add_edge("explain_changes", "platform_optimization")
-    workflow.add_edge("platform_optimization", END)
+    workflow.set_entry_point(nodes[0][0])
+    for (current, _), (following, _) in zip(nodes, nodes[1:]):
+        workflow.add_edge(current, following)
+    workflow.add_edge(nodes[-1][0], END)
     
     return workflow.compile()
 
+def create_rewrite_pipeline():
+    """Build the rewrite executor selected by PIPELINE_EXECUTOR (langgraph | linear)"""
+    if not LANGCHAIN_AVAILABLE:
+        return None
+    
+    if PIPELINE_EXECUTOR == "linear":
+        return LinearPipeline(REWRITE_PIPELINE_NODES)
+    
+    return create_rewrite_workflow()
+
+def create_multi_tone_prompt(state: RewriteState, tones: List[str]) -> List[str]:
+    """Build one prompt that asks for every tone at once as a JSON object"""
+    tone_lines = []
+    for tone in tones:
+        tone_info = TONE_DEFINITIONS[tone]
+        tone_lines.append(
+            f'- "{tone}": {tone_info["name"]} - {tone_info["description"]} '
+            f'(e.g. "{tone_info["example_input"]}" -> "{tone_info["example_output"]}")'
+        )
+    tone_list = "\n".join(tone_lines)
+    
+    system_prompt = f"""You are an expert at rewriting social media comments to match specific tones.
+
+Rewrite the comment once for EACH target tone below.
+
+TARGET TONES:
+{tone_list}
+
+RULES:
+1. Keep the core message intact
+2. Match each tone precisely
+3. Be natural and authentic
+4. Keep it concise (social media appropriate)
+5. Return ONLY a JSON object mapping each tone key to its rewritten comment, with no extra text{placeholder_rule(state, 6)}"""
+
+    context_str = f"\nCONTEXT: {state.get('context')}" if state.get("context") else ""
+    persona_str = f"\nWrite in the style of: {state.get('persona')}" if state.get("persona") else ""
+    
+    user_prompt = f"""Rewrite this comment in each target tone:{context_str}{persona_str}
+
+Original comment: {prompt_comment(state)}
+
+JSON:"""
+    
+    return [system_prompt, user_prompt]
+
+def parse_tone_variants(text: str, tones: List[str], original: str) -> Dict[str, str]:
+    """Parse the model's JSON answer, keeping only valid variants"""
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    
+    variants = {}
+    for tone in tones:
+        value = data.get(tone)
+        if not isinstance(value, str):
+            continue
+        value = value.strip().strip('"').strip("'")
+        if value and value != original.strip():
+            variants[tone] = value
+    return variants
+
+def generate_multi_tone(state: RewriteState, tones: List[str]) -> Tuple[Dict[str, str], Optional[str]]:
+    """Single Gemini call for every requested tone - returns (tones it got right, model)"""
+    if not llm_pool.available or deadline_expired():
+        return {}, None
+    
+    system_prompt, user_prompt = create_multi_tone_prompt(state, tones)
+    try:
+        response, model = invoke_gemini([
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ])
+        variants = parse_tone_variants(response.content, tones, state["comment"])
+        return {tone: restore_placeholders(text, state.get("placeholders")) for tone, text in variants.items()}, model
+    except CircuitOpenError:
+        return {}, None
+    except Exception as e:
+        print(f"Gemini multi-tone error: {e}")
+        return {}, None
+
+def generate_single_tone(state: RewriteState, tone: str) -> RewriteState:
+    """Per-tone fallback: the regular prompt + generate nodes on a copy of the shared state"""
+    tone_state = {**state, "tone": tone}
+    tone_state = create_prompt_node(tone_state)
+    return restore_placeholders_node(generate_rewrite_node(tone_state))
+
 def mock_rewrite(comment: str, tone: str) -> str:
     templates = {
         "casual": lambda c: f"Hey, {c.lower().rstrip('!.')}",
@@ -436,7 +994,136 @@ def mock_rewrite(comment: str, tone: str) -> str:
     }
     return templates.get(tone, lambda c: c)(comment)
 
-rewrite_workflow = create_rewrite_workflow() if LANGCHAIN_AVAILABLE else None
+PIPELINE_EXECUTOR = os.getenv("PIPELINE_EXECUTOR", "langgraph").lower()
+rewrite_workflow = create_rewrite_pipeline()
+
+def run_rewrite_job_item(comment: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Rewrite one job item through the same workflow as /rewrite (runs on a job worker thread)"""
+    state = build_initial_state(
+        comment, params["tone"], params.get("context"), params.get("persona"), params.get("platform")
+    )
+    if rewrite_workflow:
+        # Same global cap as /rewrite, in the batch lane so interactive requests go first.
+        # No capacity is not a failure for a job item - the job manager retries it later.
+        try:
+            with llm_admission.sync_slot("batch"):
+                state = rewrite_workflow.invoke(state)
+        except AdmissionRejected as e:
+            raise RetryItem(e.retry_after, e.reason)
+    else:
+        state["rewritten"] = mock_rewrite(comment, params["tone"])
+        state["explanation"] = [f"Adjusted phrasing to match {params['tone']} tone (mock mode)"]
+        state["model_used"] = "mock"
+    
+    return {
+        "rewritten": state["rewritten"],
+        "explanation": state["explanation"],
+        "model_used": state["model_used"],
+        "platform_info": state.get("platform_info"),
+        "suggested_hashtags": state.get("suggested_hashtags"),
+        "engagement_prediction": state.get("engagement_prediction")
+    }
+
+# Background job queue - its worker pool is separate from the request-serving workers
+JOB_MAX_ITEMS = int(os.getenv("JOB_MAX_ITEMS", "10000"))
+job_manager = JobManager(
+    os.getenv("JOBS_DB_PATH", "jobs.db"),
+    run_rewrite_job_item,
+    workers=int(os.getenv("JOB_WORKERS", "4")),
+    lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "300")),
+    max_retries=int(os.getenv("JOB_MAX_RETRIES", "20"))
+)
+
+# Speculative pre-rewrites of fetched comments (background lane, spare capacity only)
+SPECULATIVE_ENABLED = os.getenv("SPECULATIVE_ENABLED", "false").lower() == "true"
+SPECULATIVE_TOP_N = int(os.getenv("SPECULATIVE_TOP_N", "3"))
+SPECULATIVE_MAX_LOAD = float(os.getenv("SPECULATIVE_MAX_LOAD", "0.5"))
+SPECULATIVE_DEADLINE = float(os.getenv("SPECULATIVE_DEADLINE_SECONDS", "60"))
+
+async def speculative_rewrite(comment: str, tone: str, platform: Optional[str]):
+    token = set_deadline(Deadline(SPECULATIVE_DEADLINE))
+    try:
+        await perform_rewrite(RewriteRequest(comment=comment, tone=tone, platform=platform), lane="background")
+    finally:
+        reset_deadline(token)
+
+def speculative_is_cached(comment: str, tone: str, platform: Optional[str]) -> bool:
+    try:
+        return shared_cache.contains("rewrite", rewrite_cache_key(comment, tone, platform=platform))
+    except Exception:
+        return False
+
+def llm_busy() -> bool:
+    """True while interactive/batch work is queued or the LLM is above the speculative load cap"""
+    return (
+        llm_admission.queue_depth() > 0
+        or llm_admission.in_flight >= llm_admission.max_concurrent * SPECULATIVE_MAX_LOAD
+        or gemini_breaker.state != "closed"
+        or llm_pool.healthy_count() == 0
+    )
+
+speculative_rewriter = SpeculativeRewriter(
+    speculative_rewrite,
+    speculative_is_cached,
+    llm_busy,
+    workers=int(os.getenv("SPECULATIVE_WORKERS", "1")),
+    max_queue=int(os.getenv("SPECULATIVE_QUEUE_SIZE", "100")),
+    max_per_minute=int(os.getenv("SPECULATIVE_MAX_PER_MINUTE", "30"))
+)
+
+def schedule_speculative_rewrites(comments: List[Dict[str, Any]], platform: str):
+    """Queue the top comments (by score/likes) for the platform's best tones"""
+    if not SPECULATIVE_ENABLED or not llm_pool.available or not comments:
+        return
+    
+    ranked = sorted(comments, key=lambda c: c.get("score", c.get("likes", 0)) or 0, reverse=True)
+    texts = [c.get("body") or c.get("text") for c in ranked[:SPECULATIVE_TOP_N]]
+    tones = PLATFORM_CONFIGS.get(platform, {}).get("best_tones", [])
+    speculative_rewriter.schedule([t for t in texts if t and t.strip()], tones, platform)
+
+def run_warmup() -> Dict[str, Any]:
+    """
+    Warm up everything the first /rewrite would otherwise pay for:
+    Gemini client creation, TextBlob corpus loading, and a synthetic
+    rewrite through every workflow node (which also opens the Gemini connection).
+    Step failures are recorded but never block readiness - the mock fallback still works.
+    """
+    WARMUP_STATE["started_at"] = datetime.now().isoformat()
+    start = time.perf_counter()
+    
+    def step(name, fn):
+        step_start = time.perf_counter()
+        try:
+            fn()
+            WARMUP_STATE["steps"][name] = {"ok": True}
+        except Exception as e:
+            print(f"Warm-up step '{name}' failed: {e}")
+            WARMUP_STATE["steps"][name] = {"ok": False, "error": str(e)}
+        WARMUP_STATE["steps"][name]["duration"] = round(time.perf_counter() - step_start, 4)
+    
+    def warm_llm_clients():
+        for member in llm_pool.members:
+            member.client
+    step("llm_clients", warm_llm_clients)
+    
+    def warm_textblob():
+        from textblob import TextBlob
+        TextBlob("Warming up the sentiment lexicon").sentiment
+    step("textblob", warm_textblob)
+    
+    def warm_pipeline():
+        state = build_initial_state("This update broke everything", "supportive", platform="youtube")
+        if rewrite_workflow:
+            rewrite_workflow.invoke(state)
+        else:
+            mock_rewrite(state["comment"], state["tone"])
+    step("pipeline", warm_pipeline)
+    
+    WARMUP_STATE["duration"] = round(time.perf_counter() - start, 4)
+    WARMUP_STATE["finished_at"] = datetime.now().isoformat()
+    WARMUP_STATE["ready"] = True
+    print(f"Warm-up finished in {WARMUP_STATE['duration']}s")
+    return WARMUP_STATE
 
 @app.get("/")
 async def root():
@@ -446,10 +1133,15 @@ async def root():
         "status": "running",
         "langchain_available": LANGCHAIN_AVAILABLE,
         "gemini_available": get_gemini_llm() is not None,
+        "pipeline_executor": PIPELINE_EXECUTOR,
         "endpoints": {
             "rewrite": "/rewrite",
+            "rewrite_tones": "/rewrite/tones",
             "tones": "/tones",
-            "health": "/health"
+            "health": "/health",
+            "ready": "/ready",
+            "metrics": "/metrics",
+            "live_rewrite": "/ws/rewrite"
         }
     }
 
@@ -464,6 +1156,30 @@ async def health_check():
         "gemini_configured": get_gemini_llm() is not None
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe - 503 until the warm-up stage has finished"""
+    body = {
+        "status": "ready" if WARMUP_STATE["ready"] else "warming_up",
+        "warmup": WARMUP_STATE
+    }
+    return JSONResponse(status_code=200 if WARMUP_STATE["ready"] else 503, content=body)
+
+@app.get("/metrics")
+async def get_metrics():
+    """In-process metrics: counters, gauges and latency summaries"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "circuit_breakers": {"gemini": gemini_breaker.snapshot()},
+        "llm_pool": llm_pool.snapshot(),
+        "cache": shared_cache.stats(),
+        "speculative": speculative_rewriter.snapshot(),
+        "corpus": comment_corpus.stats(),
+        "cpu_pool": {"workers": cpu_pool.workers, "running": cpu_pool.running, "utilization": cpu_pool.utilization()},
+        "hashtag_index": hashtag_index.stats(),
+        **metrics.snapshot()
+    }
+
 @app.get("/tones")
 async def get_tones() -> List[ToneInfo]:
     return [
@@ -490,35 +1206,40 @@ async def get_platforms():
 
 @app.post("/rewrite", response_model=RewriteResponse)
 async def rewrite_comment(request: RewriteRequest):
+    return await perform_rewrite(request, lane="interactive")
+
+async def perform_rewrite(request: RewriteRequest, lane: str, sentiment: Optional[str] = None) -> RewriteResponse:
+    """
+    Shared /rewrite implementation; `lane` is the admission priority for the Gemini call.
+    `sentiment` skips detection when the caller already computed it (batch paths).
+    """
     start_time = datetime.now()
     
     if not request.comment.strip():
         raise HTTPException(status_code=400, detail="Comment cannot be empty")
     
+    cache_key = rewrite_cache_key(
+        request.comment, request.tone, request.context, request.persona, request.platform
+    )
+    cached = await asyncio.to_thread(cache_get, "rewrite", cache_key)
+    if cached is not None:
+        return RewriteResponse(
+            **cached,
+            processing_time=(datetime.now() - start_time).total_seconds(),
+            cached=True
+        )
+    
     try:
         if rewrite_workflow and LANGCHAIN_AVAILABLE:
-            initial_state: RewriteState = {
-                "comment": request.comment,
-                "tone": request.tone,
-                "context": request.context,
-                "persona": request.persona,
-                "platform": request.platform,
-                "detected_sentiment": None,
-                "system_prompt": None,
-                "user_prompt": None,
-                "rewritten": None,
-                "explanation": [],
-                "model_used": "unknown",
-                "platform_info": None,
-                "suggested_hashtags": None,
-                "engagement_prediction": None
-            }
+            initial_state = build_initial_state(
+                request.comment, request.tone, request.context, request.persona, request.platform, sentiment
+            )
             
-            result = rewrite_workflow.invoke(initial_state)
+            result = await run_within_deadline(lane, rewrite_workflow.invoke, initial_state)
             
             processing_time = (datetime.now() - start_time).total_seconds()
             
-            return RewriteResponse(
+            response = RewriteResponse(
                 original=request.comment,
                 rewritten=result["rewritten"],
                 tone=request.tone,
@@ -528,8 +1249,14 @@ async def rewrite_comment(request: RewriteRequest):
                 model_used=result["model_used"],
                 platform_info=result.get("platform_info"),
                 suggested_hashtags=result.get("suggested_hashtags"),
-                engagement_prediction=result.get("engagement_prediction")
+                engagement_prediction=result.get("engagement_prediction"),
+                input_compaction=result.get("input_compaction")
             )
+            
+            # Fallback rewrites are not cached so the next request retries Gemini
+            if not response.model_used.startswith("mock"):
+                await asyncio.to_thread(cache_set, "rewrite", cache_key, response.model_dump(exclude={"processing_time", "cached"}), REWRITE_CACHE_TTL)
+            return response
         else:
             rewritten = mock_rewrite(request.comment, request.tone)
             processing_time = (datetime.now() - start_time).total_seconds()
@@ -544,6 +1271,226 @@ async def rewrite_comment(request: RewriteRequest):
                 model_used="mock"
             )
     
+    except (DeadlineExceeded, AdmissionRejected):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rewriting failed: {str(e)}")
+
+# ============================================================================
+# LIVE REWRITE (WebSocket)
+# ============================================================================
+
+LIVE_REWRITE_DEBOUNCE = float(os.getenv("LIVE_REWRITE_DEBOUNCE_MS", "400")) / 1000
+
+async def stream_gemini_draft(messages, state: RewriteState, emit) -> Tuple[str, str]:
+    """
+    Stream one draft's rewrite (the caller holds a breaker permit). Returns (text, model).
+    Every way out either records the call or gives the permit back.
+    """
+    text = ""
+    try:
+        member = llm_pool.acquire()
+    except LLMPoolExhausted:
+        gemini_breaker.release_probe()
+        return mock_rewrite(state["comment"], state["tone"]), "mock-pool-exhausted"
+    
+    start = time.perf_counter()
+    client_gone = False
+    try:
+        async with asyncio.timeout(remaining_timeout(GEMINI_TIMEOUT)):
+            async for piece in astream_gemini(messages, member):
+                text += piece
+                try:
+                    await emit({"type": "partial", "delta": piece, "text": text})
+                except Exception:
+                    client_gone = True
+                    raise
+        return text.strip().strip('"').strip("'"), member.model
+    except asyncio.CancelledError:
+        # Superseded by a newer draft - astream_gemini records nothing
+        gemini_breaker.release_probe()
+        raise
+    except TimeoutError as e:
+        record_gemini_call(member, time.perf_counter() - start, error=e)
+        gemini_breaker.record_failure(time.perf_counter() - start)
+        print(f"Gemini stream error: {e!r}")
+    except Exception as e:
+        if client_gone:
+            # The socket closed under us - not Gemini's fault, and nobody is left to send a fallback to
+            gemini_breaker.release_probe()
+            raise
+        print(f"Gemini stream error: {e}")  # already recorded by astream_gemini
+    return mock_rewrite(state["comment"], state["tone"]), "mock-error-fallback"
+
+async def stream_live_rewrite(draft: Dict[str, Any], emit):
+    """Rewrite one draft for the live channel, emitting partial text as Gemini streams it"""
+    start_time = datetime.now()
+    request = RewriteRequest(**draft)
+    if not request.comment.strip():
+        await emit({"type": "error", "detail": "Comment cannot be empty"})
+        return
+    
+    cache_key = rewrite_cache_key(
+        request.comment, request.tone, request.context, request.persona, request.platform
+    )
+    cached = await asyncio.to_thread(cache_get, "rewrite", cache_key)
+    if cached is not None:
+        await emit({"type": "final", **cached, "processing_time": 0.0, "cached": True})
+        return
+    
+    # Only a look at the state - the breaker permit is taken right before streaming starts
+    can_stream = (
+        rewrite_workflow and LANGCHAIN_AVAILABLE and llm_pool.available and gemini_breaker.state != "open"
+    )
+    token = set_deadline(Deadline(DEFAULT_DEADLINE_SECONDS))
+    try:
+        if not can_stream:
+            response = await perform_rewrite(request, lane="interactive")
+            await emit({"type": "final", **response.model_dump()})
+            return
+        
+        state = build_initial_state(
+            request.comment, request.tone, request.context, request.persona, request.platform
+        )
+        state = await asyncio.to_thread(lambda: create_prompt_node(detect_tone_node(compact_input_node(state))))
+        messages = [
+            SystemMessage(content=state["system_prompt"]),
+            HumanMessage(content=state["user_prompt"])
+        ]
+        
+        async with llm_admission.slot("interactive"):
+            if gemini_breaker.allow_request():
+                rewritten, model = await stream_gemini_draft(messages, state, emit)
+            else:
+                rewritten, model = mock_rewrite(request.comment, request.tone), "mock-circuit-open"
+        state["rewritten"] = rewritten if model.startswith("mock") else restore_placeholders(rewritten, state["placeholders"])
+        state["model_used"] = model
+        
+        state = platform_optimization_node(explain_changes_node(state))
+        response = RewriteResponse(
+            original=request.comment,
+            rewritten=state["rewritten"],
+            tone=request.tone,
+            persona=request.persona,
+            explanation=state["explanation"],
+            processing_time=(datetime.now() - start_time).total_seconds(),
+            model_used=state["model_used"],
+            platform_info=state.get("platform_info"),
+            suggested_hashtags=state.get("suggested_hashtags"),
+            engagement_prediction=state.get("engagement_prediction"),
+            input_compaction=state.get("input_compaction")
+        )
+        if not response.model_used.startswith("mock"):
+            await asyncio.to_thread(cache_set, "rewrite", cache_key, response.model_dump(exclude={"processing_time", "cached"}), REWRITE_CACHE_TTL)
+        await emit({"type": "final", **response.model_dump()})
+    except AdmissionRejected as e:
+        await emit({"type": "error", "detail": e.reason, "retry_after": e.retry_after})
+    except DeadlineExceeded as e:
+        await emit({"type": "error", "detail": str(e)})
+    finally:
+        reset_deadline(token)
+
+@app.websocket("/ws/rewrite")
+async def live_rewrite(websocket: WebSocket):
+    """
+    Live preview channel. Send {"comment", "tone", ...} (same fields as /rewrite) on every
+    keystroke pause; receive "partial" messages while the latest draft is generated and a
+    "final" message with the full rewrite. Older drafts are cancelled. {"type": "cancel"}
+    stops the current draft.
+    """
+    await websocket.accept()
+    session = LiveRewriteSession(websocket.send_json, stream_live_rewrite, debounce=LIVE_REWRITE_DEBOUNCE)
+    
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except (json.JSONDecodeError, KeyError):
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON objects"})
+                continue
+            
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON objects"})
+            elif message.get("type") == "cancel":
+                await session.cancel()
+            else:
+                draft_id = await session.submit({k: v for k, v in message.items() if k != "type"})
+                await websocket.send_json({"type": "accepted", "draft_id": draft_id})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await session.close()
+
+@app.post("/rewrite/tones", response_model=MultiToneRewriteResponse)
+async def rewrite_comment_all_tones(request: MultiToneRewriteRequest):
+    """Rewrite one comment into several tones with a single structured LLM call"""
+    start_time = datetime.now()
+    
+    if not request.comment.strip():
+        raise HTTPException(status_code=400, detail="Comment cannot be empty")
+    
+    tones = list(dict.fromkeys(request.tones or TONE_DEFINITIONS.keys()))
+    
+    try:
+        # Shared passes over the original: one sentiment analysis, one explanation scan
+        base_state = build_initial_state(
+            request.comment, tones[0], request.context, request.persona, request.platform
+        )
+        # detect_tone_node blocks on the CPU pool - keep it off the event loop
+        base_state = await asyncio.to_thread(lambda: detect_tone_node(compact_input_node(base_state)))
+        original_notes = explain_original(request.comment)
+        
+        rewritten: Dict[str, str] = {}
+        models: Dict[str, str] = {}
+        
+        if LANGCHAIN_AVAILABLE:
+            rewritten, model = await run_within_deadline("interactive", generate_multi_tone, base_state, tones)
+            models = {tone: model for tone in rewritten}
+        
+        # Only the tones the combined call missed go out as parallel per-tone calls
+        fallback_tones = [tone for tone in tones if tone not in rewritten]
+        if fallback_tones:
+            if LANGCHAIN_AVAILABLE:
+                fallback_states = await asyncio.gather(*[
+                    run_within_deadline("interactive", generate_single_tone, base_state, tone)
+                    for tone in fallback_tones
+                ])
+                for tone, tone_state in zip(fallback_tones, fallback_states):
+                    rewritten[tone] = tone_state["rewritten"]
+                    models[tone] = tone_state["model_used"]
+            else:
+                for tone in fallback_tones:
+                    rewritten[tone] = mock_rewrite(request.comment, tone)
+                    models[tone] = "mock"
+        
+        variants = []
+        for tone in tones:
+            tone_state = {**base_state, "tone": tone, "rewritten": rewritten[tone]}
+            tone_state["explanation"] = explain_rewrite(
+                original_notes, request.comment, rewritten[tone], tone, base_state.get("detected_sentiment")
+            )
+            tone_state = platform_optimization_node(tone_state)
+            variants.append(ToneVariant(
+                tone=tone,
+                rewritten=tone_state["rewritten"],
+                explanation=tone_state["explanation"],
+                model_used=models[tone],
+                platform_info=tone_state.get("platform_info"),
+                suggested_hashtags=tone_state.get("suggested_hashtags"),
+                engagement_prediction=tone_state.get("engagement_prediction")
+            ))
+        
+        return MultiToneRewriteResponse(
+            original=request.comment,
+            persona=request.persona,
+            detected_sentiment=base_state.get("detected_sentiment"),
+            variants=variants,
+            fallback_tones=fallback_tones,
+            processing_time=(datetime.now() - start_time).total_seconds()
+        )
+    
+    except (DeadlineExceeded, AdmissionRejected):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Rewriting failed: {str(e)}")
 
@@ -572,17 +1519,17 @@ async def get_reddit_trending(subreddit: str = "popular", limit: int = 10):
     if not API_CLIENTS_AVAILABLE or not social_apis:
         # Fallback to scraping
         if web_scrapers:
-            posts = web_scrapers.fetch_reddit_content(subreddit, limit)
+            posts = await asyncio.to_thread(cached_fetch, web_scrapers.fetch_reddit_content, subreddit, limit)
             return {"source": "scraper", "posts": posts}
         return {"error": "APIs and scrapers not available"}
     
     if social_apis.reddit.available:
-        posts = social_apis.reddit.get_trending_posts(subreddit, limit)
+        posts = await asyncio.to_thread(cached_fetch, social_apis.reddit.get_trending_posts, subreddit, limit)
         return {"source": "api", "posts": posts}
     else:
         # Fallback to scraper
         if web_scrapers:
-            posts = web_scrapers.fetch_reddit_content(subreddit, limit)
+            posts = await asyncio.to_thread(cached_fetch, web_scrapers.fetch_reddit_content, subreddit, limit)
             return {"source": "scraper", "posts": posts}
         return {"error": "Reddit API and scraper not available"}
 
@@ -592,7 +1539,7 @@ async def get_youtube_trending(region: str = "US", limit: int = 10):
     if not API_CLIENTS_AVAILABLE or not social_apis or not social_apis.youtube.available:
         return {"error": "YouTube API not available. Add YOUTUBE_API_KEY to .env"}
     
-    videos = social_apis.youtube.get_trending_videos(region, limit)
+    videos = await asyncio.to_thread(cached_fetch, social_apis.youtube.get_trending_videos, region, limit)
     return {"source": "api", "videos": videos}
 
 @app.get("/api/youtube/comments/{video_id}")
@@ -601,7 +1548,7 @@ async def get_youtube_comments(video_id: str, limit: int = 20):
     if not API_CLIENTS_AVAILABLE or not social_apis or not social_apis.youtube.available:
         return {"error": "YouTube API not available"}
     
-    comments = social_apis.youtube.get_video_comments(video_id, limit)
+    comments = await asyncio.to_thread(fetch_youtube_comments, video_id, limit)
     return {"source": "api", "comments": comments}
 
 @app.get("/api/twitter/search")
@@ -610,7 +1557,11 @@ async def search_twitter(query: str, limit: int = 10):
     if not API_CLIENTS_AVAILABLE or not social_apis or not social_apis.twitter.available:
         return {"error": "Twitter API not available. Add TWITTER_BEARER_TOKEN to .env"}
     
-    tweets = social_apis.twitter.search_recent_tweets(query, limit)
+    tweets = await asyncio.to_thread(corpus_lookup, query, "twitter", "tweet", limit)
+    if tweets is not None:
+        return {"source": "corpus", "tweets": tweets}
+    
+    tweets = await asyncio.to_thread(cached_fetch, social_apis.twitter.search_recent_tweets, query, limit)
     return {"source": "api", "tweets": tweets}
 
 @app.get("/api/news/headlines")
@@ -619,7 +1570,7 @@ async def get_news_headlines(category: str = "technology", country: str = "us"):
     if not API_CLIENTS_AVAILABLE or not social_apis or not social_apis.news.available:
         return {"error": "News API not available. Add NEWS_API_KEY to .env"}
     
-    articles = social_apis.news.get_top_headlines(category, country)
+    articles = await asyncio.to_thread(cached_fetch, social_apis.news.get_top_headlines, category, country)
     return {"source": "api", "articles": articles}
 
 @app.get("/api/trending/hashtags/{platform}")
@@ -629,7 +1580,65 @@ async def get_trending_hashtags(platform: str):
         return {"error": "Scrapers not available"}
     
     hashtags = web_scrapers.fetch_trending_hashtags(platform)
-    return {"platform": platform, "hashtags": hashtags, "source": "scraper"}
+    return {"platform": platform, "hashtags": hashtags, "source": "index"}
+
+@app.get("/api/hashtags/suggest")
+async def suggest_hashtags(text: str, limit: int = 5):
+    """Hashtags that co-occur with the text's keywords in fetched YouTube titles, descriptions and comments"""
+    return {"text": text, "hashtags": hashtag_index.suggest(text, max(1, min(limit, 30)))}
+
+@app.get("/api/reddit/route")
+async def route_reddit_query(query: str):
+    """Subreddits the comment search would use for `query`, with their learned scores"""
+    return {
+        "query": query,
+        "subreddits": subreddit_router.route(query),
+        "scores": subreddit_router.snapshot(query)
+    }
+
+@app.get("/api/corpus/search")
+async def search_corpus(q: str, platform: Optional[str] = None, kind: Optional[str] = None,
+                        limit: int = 20, max_age: Optional[float] = None):
+    """Full-text search over every comment/post/video/tweet fetched so far"""
+    results = await asyncio.to_thread(
+        comment_corpus.search, q, platform, kind, min(limit, 200), max_age
+    )
+    return {"query": q, "results": results, "count": len(results)}
+
+# ============================================================================
+# INCREMENTAL INGESTION (watermark-based polling)
+# ============================================================================
+
+@app.get("/api/ingest/twitter")
+async def poll_twitter(query: str, limit: int = 10):
+    """Tweets newer than the last poll (since_id), merged into earlier results"""
+    if not API_CLIENTS_AVAILABLE or not social_apis or not social_apis.twitter.available:
+        return {"error": "Twitter API not available. Add TWITTER_BEARER_TOKEN to .env"}
+    
+    result = await asyncio.to_thread(social_apis.twitter.poll_recent_tweets, query, max(10, min(limit, 100)))
+    return {"source": "api", "query": query, **result}
+
+@app.get("/api/ingest/reddit/{subreddit}")
+async def poll_reddit(subreddit: str, limit: int = 25):
+    """New posts since the last poll (listing before=<fullname>), merged into earlier results"""
+    if not web_scrapers:
+        return {"error": "Reddit scraper not available"}
+    if limit <= 0:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    
+    result = await asyncio.to_thread(web_scrapers.reddit.poll_new_posts, subreddit, min(limit, 100))
+    return {"source": "scraper", "subreddit": subreddit, **result}
+
+@app.get("/api/ingest/youtube/{video_id}")
+async def poll_youtube_comments(video_id: str, limit: int = 20, max_pages: int = 5):
+    """Comments published since the last poll (publishedAt + page tokens), merged into earlier results"""
+    if not API_CLIENTS_AVAILABLE or not social_apis or not social_apis.youtube.available:
+        return {"error": "YouTube API not available"}
+    
+    result = await asyncio.to_thread(
+        social_apis.youtube.poll_video_comments, video_id, min(limit, 100), max(1, min(max_pages, 20))
+    )
+    return {"source": "api", "video_id": video_id, **result}
 
 @app.post("/api/analyze/url")
 async def analyze_social_url(url: str):
@@ -637,27 +1646,96 @@ async def analyze_social_url(url: str):
     if not API_CLIENTS_AVAILABLE or not web_scrapers:
         return {"error": "Scrapers not available"}
     
-    metadata = web_scrapers.analyze_url(url)
+    metadata = await asyncio.to_thread(cached_fetch, web_scrapers.analyze_url, url)
     return {"url": url, "metadata": metadata}
 
+SAMPLE_PLATFORMS = ["reddit", "twitter", "youtube", "news"]
+SAMPLE_TIMEOUT_SECONDS = float(os.getenv("SAMPLE_TIMEOUT_SECONDS", "5"))
+
+def fetch_sample_source(platform: str, limit: int, deadline: Deadline, start: float) -> Dict[str, Any]:
+    """One platform's sample under the shared sampler deadline (runs in a worker thread)"""
+    token = set_deadline(deadline)
+    try:
+        content = cached_fetch(social_apis.fetch_content_sample, platform, limit)
+        entry = {"status": "ok" if content else "empty", "content": content}
+    except Exception as e:
+        entry = {"status": "error", "content": [], "error": str(e)}
+    finally:
+        reset_deadline(token)
+    entry["latency"] = round(time.perf_counter() - start, 3)
+    return entry
+
+@app.get("/api/content/sample")
+async def get_content_samples(platforms: str = ",".join(SAMPLE_PLATFORMS), limit: int = 5,
+                              timeout: Optional[float] = None):
+    """
+    Sample every platform concurrently under one shared deadline. Sources that finish in
+    time return their content; slower ones are reported as timed out (partial) instead of
+    holding up the whole response. Each source reports its own latency.
+    """
+    if not API_CLIENTS_AVAILABLE or not social_apis:
+        return {"error": "APIs not available"}
+    
+    requested = [p.strip() for p in platforms.split(",") if p.strip() in SAMPLE_PLATFORMS]
+    budget = min(timeout or SAMPLE_TIMEOUT_SECONDS, SAMPLE_TIMEOUT_SECONDS)
+    request_deadline = get_deadline()
+    if request_deadline:
+        budget = min(budget, request_deadline.remaining())
+    deadline = Deadline(budget)
+    
+    start = time.perf_counter()
+    sources: Dict[str, Dict[str, Any]] = {}
+    tasks: Dict[asyncio.Task, str] = {}
+    for platform in requested:
+        if not getattr(social_apis, platform).available:
+            sources[platform] = {"status": "unavailable", "content": [], "latency": 0.0}
+            continue
+        task = asyncio.create_task(asyncio.to_thread(fetch_sample_source, platform, limit, deadline, start))
+        tasks[task] = platform
+    
+    done, pending = await asyncio.wait(tasks, timeout=budget) if tasks else (set(), set())
+    
+    for task in done:
+        platform = tasks[task]
+        entry = sources[platform] = task.result()
+        metrics.observe("content_sample_seconds", entry["latency"], platform=platform, outcome=entry["status"])
+    
+    for task in pending:
+        # Left to finish in its thread - its upstream calls give up at the shared deadline
+        platform = tasks[task]
+        sources[platform] = {"status": "timeout", "content": [], "latency": round(budget, 3), "partial": True}
+        metrics.observe("content_sample_seconds", budget, platform=platform, outcome="timeout")
+    
+    return {
+        "platforms": requested,
+        "sources": {platform: sources[platform] for platform in requested},
+        "partial": bool(pending),
+        "budget": round(budget, 3),
+        "elapsed": round(time.perf_counter() - start, 3)
+    }
+
 @app.get("/api/content/sample/{platform}")
 async def get_content_sample(platform: str, limit: int = 5):
     """Fetch sample content from any platform"""
     if not API_CLIENTS_AVAILABLE or not social_apis:
         return {"error": "APIs not available"}
     
-    content = social_apis.fetch_content_sample(platform, limit)
+    content = await asyncio.to_thread(cached_fetch, social_apis.fetch_content_sample, platform, limit)
     return {"platform": platform, "content": content}
 
 @app.get("/api/comments/reddit")
+@compact_endpoint
 async def get_reddit_comments(query: str = "technology", limit: int = 10):
     """Search Reddit for posts containing the query and fetch comments"""
     if not API_CLIENTS_AVAILABLE or not social_apis:
         return {"error": "Reddit API not available"}
     
     try:
-        # Use the new search method
-        comments = social_apis.reddit.search_and_get_comments(query, limit=limit)
+        comments = await asyncio.to_thread(corpus_lookup, query, "reddit", "comment", limit)
+        source = "corpus" if comments else "live"
+        if not comments:
+            # Use the new search method
+            comments = await asyncio.to_thread(cached_fetch, social_apis.reddit.search_and_get_comments, query, limit=limit)
         
         if not comments:
             return {
@@ -665,60 +1743,86 @@ async def get_reddit_comments(query: str = "technology", limit: int = 10):
                 "query": query
             }
         
+        schedule_speculative_rewrites(comments, "reddit")
+        
         return {
             "platform": "reddit",
             "query": query,
+            "source": source,
             "comments": comments,
-            "count": len(comments)
+            "count": len(comments),
+            "partial": deadline_expired()
         }
     except Exception as e:
         return {"error": str(e)}
 
 @app.get("/api/comments/youtube")
+@compact_endpoint
 async def get_youtube_comments(video_id: str = None, query: str = None, limit: int = 10):
     """Fetch real comments from a YouTube video by ID or search query"""
     if not API_CLIENTS_AVAILABLE or not social_apis:
         return {"error": "YouTube API not available"}
     
     try:
+        if query and not video_id:
+            comments = await asyncio.to_thread(corpus_lookup, query, "youtube", "comment", limit)
+            if comments:
+                schedule_speculative_rewrites(comments, "youtube")
+                return {
+                    "platform": "youtube",
+                    "video_id": comments[0].get("video_id"),
+                    "video_title": comments[0].get("video_title"),
+                    "query": query,
+                    "source": "corpus",
+                    "comments": comments,
+                    "count": len(comments)
+                }
+        
         actual_video_id = video_id
         video_title = None
+        comments = []
         
         # If query is provided, search for videos first
         if query and not video_id:
-            videos = social_apis.youtube.search_videos(query, max_results=5)
+            videos = await asyncio.to_thread(cached_fetch, social_apis.youtube.search_videos, query, max_results=5)
             if not videos:
                 return {"error": f"No videos found for '{query}'"}
             
-            # Try to find a video with comments enabled
-            for video in videos:
-                if video.get("comments", 0) > 0:
-                    actual_video_id = video["id"]
-                    video_title = video["title"]
-                    break
+            # Only try videos that report comments and aren't known to be empty/disabled
+            candidates = [video for video in videos if await asyncio.to_thread(youtube_has_comments, video)]
+            if not candidates:
+                return {"error": f"No videos with comments found for '{query}'", "videos_checked": len(videos)}
             
-            if not actual_video_id:
-                # Use first video even if comments count is 0 (might be inaccurate)
-                actual_video_id = videos[0]["id"]
-                video_title = videos[0]["title"]
+            for video in candidates:
+                if deadline_expired():
+                    break
+                actual_video_id = video["id"]
+                video_title = video["title"]
+                comments = await asyncio.to_thread(fetch_youtube_comments, actual_video_id, limit)
+                if comments:
+                    break
+        elif actual_video_id:
+            comments = await asyncio.to_thread(fetch_youtube_comments, actual_video_id, limit)
         
         if not actual_video_id:
             return {"error": "Please provide either a video_id or query parameter"}
         
-        # Fetch comments
-        comments = social_apis.youtube.get_video_comments(actual_video_id, max_results=limit)
-        
         # Add body field for consistency with Reddit comments
         for comment in comments:
             comment["body"] = comment.get("text", "")
             if video_title:
                 comment["video_title"] = video_title
+        # Re-record with the video title and query so later searches can match them
+        await asyncio.to_thread(comment_corpus.record, "youtube", "comment", comments, query)
+        
+        schedule_speculative_rewrites(comments, "youtube")
         
         return {
             "platform": "youtube",
             "video_id": actual_video_id,
             "video_title": video_title,
             "query": query,
+            "source": "live",
             "comments": comments,
             "count": len(comments)
         }
@@ -726,6 +1830,7 @@ async def get_youtube_comments(video_id: str = None, query: str = None, limit: i
         return {"error": str(e)}
 
 @app.get("/api/comments/youtube/trending")
+@compact_endpoint
 async def get_trending_youtube_comments(limit: int = 5):
     """Fetch comments from trending YouTube videos"""
     if not API_CLIENTS_AVAILABLE or not social_apis:
@@ -733,7 +1838,7 @@ async def get_trending_youtube_comments(limit: int = 5):
     
     try:
         # Get trending videos
-        videos = social_apis.youtube.get_trending_videos(max_results=10)
+        videos = await asyncio.to_thread(cached_fetch, social_apis.youtube.get_trending_videos, max_results=10)
         
         if not videos:
             return {"error": "No trending videos found"}
@@ -741,19 +1846,19 @@ async def get_trending_youtube_comments(limit: int = 5):
         all_comments = []
         videos_checked = 0
         
-        # Try to get comments from multiple videos (some may have comments disabled)
+        # Try to get comments from multiple videos, skipping ones known to have none
         for video in videos:
-            if len(all_comments) >= limit * 3:
+            if len(all_comments) >= limit * 3 or deadline_expired():
                 break
                 
             video_id = video.get("id")
-            if not video_id:
+            if not video_id or not await asyncio.to_thread(youtube_has_comments, video):
                 continue
                 
             videos_checked += 1
             try:
                 # Try to fetch comments from this video
-                comments = social_apis.youtube.get_video_comments(video_id, max_results=limit)
+                comments = await asyncio.to_thread(fetch_youtube_comments, video_id, limit)
                 
                 if comments:  # Only add if we got comments
                     for comment in comments:
@@ -777,12 +1882,14 @@ async def get_trending_youtube_comments(limit: int = 5):
             "source": "trending",
             "comments": all_comments[:limit * 3],
             "count": len(all_comments[:limit * 3]),
-            "videos_checked": videos_checked
+            "videos_checked": videos_checked,
+            "partial": deadline_expired()
         }
     except Exception as e:
         return {"error": str(e)}
 
 @app.post("/api/rewrite/batch")
+@compact_endpoint
 async def batch_rewrite_comments(
     comments: List[str],
     tone: str = "professional",
@@ -793,24 +1900,347 @@ async def batch_rewrite_comments(
         return {"error": "LangChain not available"}
     
     results = []
-    for comment in comments[:10]:  # Limit to 10 at a time
+    batch = comments[:10]  # Limit to 10 at a time
+    # One chunked process-pool submission for the whole batch instead of one per comment
+    try:
+        sentiments = await cpu_pool.amap(sentiment_label, batch)
+    except asyncio.TimeoutError:
+        sentiments = [None] * len(batch)  # each rewrite detects its own sentiment
+    for comment, sentiment in zip(batch, sentiments):
+        if deadline_expired():
+            break
         try:
             request = RewriteRequest(comment=comment, tone=tone, platform=platform)
-            result = await rewrite_comment(request)
+            result = await perform_rewrite(request, lane="batch", sentiment=sentiment)
             results.append({
                 "original": comment,
                 "rewritten": result
             })
+        except AdmissionRejected:
+            if not results:
+                raise
+            break
         except Exception as e:
             results.append({
                 "original": comment,
                 "error": str(e)
             })
     
-    return {
+    response = {
         "batch_size": len(results),
         "results": results
     }
+    if len(results) < len(batch):
+        # Deadline or admission limit hit - return what finished and say what was skipped
+        response["partial"] = True
+        response["skipped"] = batch[len(results):]
+    return response
+
+ENGAGEMENT_MAX_ITEMS = int(os.getenv("ENGAGEMENT_MAX_ITEMS", "10000"))
+
+@app.post("/api/engagement/score")
+@compact_endpoint
+async def score_comments_engagement(request: EngagementScoreRequest):
+    """Score a whole list of comments with the engagement heuristic and rank them, highest first"""
+    if len(request.comments) > ENGAGEMENT_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many comments (max {ENGAGEMENT_MAX_ITEMS} per request)")
+    if request.tones is not None and len(request.tones) != len(request.comments):
+        raise HTTPException(status_code=400, detail="`tones` must have one entry per comment")
+    
+    start = time.perf_counter()
+    scores = score_engagement(
+        request.comments, request.tones or request.tone, request.platform, PLATFORM_CONFIGS[request.platform]
+    )
+    levels = engagement_levels(scores)
+    ranked = np.argsort(-scores, kind="stable")[:request.top_k]
+    metrics.observe("engagement_scoring_seconds", time.perf_counter() - start)
+    
+    return {
+        "platform": request.platform,
+        "count": len(request.comments),
+        "results": [
+            {"index": int(i), "score": int(scores[i]), "engagement_level": str(levels[i])}
+            for i in ranked
+        ]
+    }
+
+# ============================================================================
+# FETCH-AND-REWRITE STREAMING PIPELINE
+# ============================================================================
+
+PIPELINE_MAX_ITEMS = int(os.getenv("PIPELINE_MAX_ITEMS", "50"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+PIPELINE_MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", "8"))
+
+def iter_platform_comments(platform: str, query: Optional[str], video_id: Optional[str], limit: int):
+    """Blocking generator of comments from RedditClient/YouTubeClient, one post/video at a time"""
+    if platform == "reddit":
+        yield from social_apis.reddit.iter_search_comments(query or "technology", limit)
+        return
+    
+    if video_id:
+        videos = [{"id": video_id, "title": None}]
+    else:
+        videos = [v for v in social_apis.youtube.search_videos(query, max_results=5) if youtube_has_comments(v)]
+    
+    produced = 0
+    for video in videos:
+        if produced >= limit or deadline_expired():
+            return
+        for comment in fetch_youtube_comments(video["id"], limit - produced):
+            comment["body"] = comment.get("text", "")
+            comment["video_id"] = video["id"]
+            comment["video_title"] = video["title"]
+            produced += 1
+            yield comment
+
+@app.get("/api/comments/rewrite/stream")
+async def stream_fetch_and_rewrite(
+    platform: Literal["reddit", "youtube"] = "reddit",
+    query: Optional[str] = None,
+    video_id: Optional[str] = None,
+    tone: ToneName = "professional",
+    target_platform: Optional[Literal["reddit", "youtube"]] = None,
+    limit: int = 10,
+    concurrency: int = 4
+):
+    """
+    Fetch comments and rewrite them in one pass: the fetcher feeds a bounded queue,
+    `concurrency` rewrite workers drain it, and each rewrite is emitted as an NDJSON
+    line as soon as it is ready. Ends with an {"event": "end"} summary line.
+    """
+    if not API_CLIENTS_AVAILABLE or not social_apis:
+        raise HTTPException(status_code=503, detail="Social media APIs not available")
+    if platform == "youtube" and not (query or video_id):
+        raise HTTPException(status_code=400, detail="Please provide either a video_id or query parameter")
+    
+    limit = max(1, min(limit, PIPELINE_MAX_ITEMS))
+    concurrency = max(1, min(concurrency, PIPELINE_MAX_WORKERS))
+    deadline = get_deadline()
+    
+    async def event_stream():
+        token = set_deadline(deadline)
+        loop = asyncio.get_running_loop()
+        comments: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        results: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        stats = {"fetched": 0, "rewritten": 0, "failed": 0}
+        start = time.perf_counter()
+        
+        def produce():
+            """Runs in a thread; blocks on the bounded queue when the rewriters fall behind"""
+            try:
+                source = iter_platform_comments(platform, query, video_id, limit)
+                for index, comment in enumerate(source):
+                    if stop.is_set():
+                        break
+                    stats["fetched"] += 1
+                    asyncio.run_coroutine_threadsafe(comments.put((index, comment)), loop).result()
+            finally:
+                if not stop.is_set():
+                    asyncio.run_coroutine_threadsafe(comments.put(None), loop).result()
+        
+        async def rewrite_worker():
+            try:
+                while not deadline_expired():
+                    try:
+                        item = await asyncio.wait_for(comments.get(), deadline.remaining() if deadline else None)
+                    except asyncio.TimeoutError:
+                        return
+                    if item is None:
+                        comments.put_nowait(None)  # pass the end marker on to the next worker
+                        return
+                    index, comment = item
+                    line = {"index": index, "source": {k: v for k, v in comment.items() if k not in ("text", "body")}}
+                    try:
+                        request = RewriteRequest(
+                            comment=comment["body"], tone=tone, platform=target_platform or platform
+                        )
+                        line["rewritten"] = (await perform_rewrite(request, lane="batch")).model_dump()
+                        stats["rewritten"] += 1
+                    except Exception as e:
+                        line["original"] = comment["body"]
+                        line["error"] = getattr(e, "reason", None) or getattr(e, "detail", None) or str(e)
+                        stats["failed"] += 1
+                    metrics.inc("pipeline_items_total", outcome="error" if "error" in line else "rewritten")
+                    await results.put(line)
+            finally:
+                await results.put(None)
+        
+        producer = asyncio.create_task(asyncio.to_thread(produce))
+        workers = [asyncio.create_task(rewrite_worker()) for _ in range(concurrency)]
+        try:
+            finished, first = 0, True
+            while finished < concurrency:
+                line = await results.get()
+                if line is None:
+                    finished += 1
+                    continue
+                if first:
+                    metrics.observe("pipeline_first_item_seconds", time.perf_counter() - start)
+                    first = False
+                yield json.dumps(line) + "\n"
+            
+            yield json.dumps({
+                "event": "end",
+                "platform": platform,
+                **stats,
+                "partial": deadline_expired(),
+                "elapsed": round(time.perf_counter() - start, 3)
+            }) + "\n"
+        finally:
+            # Stop the fetcher and unblock it if it is waiting on a full queue
+            stop.set()
+            for worker in workers:
+                worker.cancel()
+            while not comments.empty():
+                comments.get_nowait()
+            reset_deadline(token)
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+# ============================================================================
+# PAGINATED EXPORTS (constant-memory NDJSON)
+# ============================================================================
+
+EXPORT_MAX_ITEMS = int(os.getenv("EXPORT_MAX_ITEMS", "5000"))
+EXPORT_MAX_PAGES = int(os.getenv("EXPORT_MAX_PAGES", "50"))
+
+def stream_items(source, summary: Dict[str, Any], max_items: int) -> StreamingResponse:
+    """
+    NDJSON response over a blocking paginated iterator. Each next() runs in a thread,
+    so only the page being consumed is held in memory. Ends with an {"event": "end"} line.
+    """
+    deadline = get_deadline()
+    
+    async def event_stream():
+        token = set_deadline(deadline)
+        start = time.perf_counter()
+        count, error = 0, None
+        try:
+            while True:
+                try:
+                    item = await asyncio.to_thread(next, source, None)
+                except Exception as e:
+                    error = str(e)
+                    break
+                if item is None:
+                    break
+                count += 1
+                yield json.dumps(item, default=str) + "\n"
+            
+            metrics.inc("export_items_total", count, source=summary["platform"])
+            yield json.dumps({
+                "event": "end",
+                **summary,
+                "count": count,
+                "budget_reached": count >= max_items,
+                "partial": deadline_expired() or error is not None,
+                **({"error": error} if error else {}),
+                "elapsed": round(time.perf_counter() - start, 3)
+            }) + "\n"
+        finally:
+            try:
+                source.close()
+            except ValueError:
+                pass  # client left while a page was being fetched; the generator ends with that thread
+            reset_deadline(token)
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+@app.get("/api/export/youtube/{video_id}")
+async def export_youtube_comments(video_id: str, max_items: int = 1000, max_pages: int = 10,
+                                  order: Literal["relevance", "time"] = "relevance"):
+    """Every comment thread of a video (following nextPageToken) as NDJSON, within the item/page budget"""
+    if not API_CLIENTS_AVAILABLE or not social_apis or not social_apis.youtube.available:
+        raise HTTPException(status_code=503, detail="YouTube API not available")
+    
+    max_items = max(1, min(max_items, EXPORT_MAX_ITEMS))
+    max_pages = max(1, min(max_pages, EXPORT_MAX_PAGES))
+    source = social_apis.youtube.iter_video_comments(video_id, max_items=max_items, max_pages=max_pages, order=order)
+    return stream_items(source, {"platform": "youtube", "video_id": video_id}, max_items)
+
+@app.get("/api/export/reddit/{subreddit}")
+async def export_subreddit_posts(subreddit: str, sort: Literal["hot", "new", "top", "rising"] = "hot",
+                                 max_items: int = 1000, max_pages: int = 10):
+    """Subreddit listing (following the `after` cursor) as NDJSON, within the item/page budget"""
+    if not web_scrapers:
+        raise HTTPException(status_code=503, detail="Reddit scraper not available")
+    
+    max_items = max(1, min(max_items, EXPORT_MAX_ITEMS))
+    max_pages = max(1, min(max_pages, EXPORT_MAX_PAGES))
+    source = web_scrapers.reddit.iter_subreddit_posts(subreddit, sort, max_items=max_items, max_pages=max_pages)
+    return stream_items(source, {"platform": "reddit", "subreddit": subreddit, "sort": sort}, max_items)
+
+# ============================================================================
+# BACKGROUND REWRITE JOBS
+# ============================================================================
+
+@app.post("/api/jobs/rewrite")
+async def submit_rewrite_job(request: JobSubmitRequest):
+    """Submit a large batch of comments; returns a job id to poll, stream or cancel"""
+    comments = [c for c in request.comments if c.strip()]
+    if not comments:
+        raise HTTPException(status_code=400, detail="No comments to rewrite")
+    if len(comments) > JOB_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many comments (max {JOB_MAX_ITEMS} per job)")
+    
+    params = {
+        "tone": request.tone,
+        "context": request.context,
+        "persona": request.persona,
+        "platform": request.platform
+    }
+    return await asyncio.to_thread(job_manager.submit, comments, params)
+
+@app.get("/api/jobs/{job_id}")
+async def get_rewrite_job(job_id: str):
+    """Job status and progress"""
+    job = await asyncio.to_thread(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/jobs/{job_id}/results")
+async def get_rewrite_job_results(job_id: str, offset: int = 0, limit: int = 100):
+    """Finished items so far, in input order"""
+    job = await asyncio.to_thread(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    results = await asyncio.to_thread(job_manager.results, job_id, offset, min(limit, 1000))
+    return {**job, "offset": offset, "results": results}
+
+@app.get("/api/jobs/{job_id}/stream")
+async def stream_rewrite_job(job_id: str, poll_interval: float = 0.5):
+    """Stream finished items as NDJSON until the job completes or is cancelled"""
+    job = await asyncio.to_thread(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        since, seen = 0.0, set()
+        while True:
+            current = await asyncio.to_thread(job_manager.get, job_id)
+            for item in await asyncio.to_thread(job_manager.results_since, job_id, since):
+                since = max(since, item.pop("finished_at"))
+                if item["index"] not in seen:
+                    seen.add(item["index"])
+                    yield json.dumps(item) + "\n"
+            if current["status"] in ("completed", "cancelled"):
+                yield json.dumps({"event": "end", "job": current}) + "\n"
+                return
+            await asyncio.sleep(max(0.1, poll_interval))
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_rewrite_job(job_id: str):
+    """Cancel a job - pending items are dropped, finished results are kept"""
+    job = await asyncio.to_thread(job_manager.cancel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 if __name__ == "__main__":
     print("\\n Starting AI Comment Rewriter API...")
@@ -820,7 +2250,7 @@ if __name__ == "__main__":
     print(f" Gemini Available: {gemini_llm is not None}")
     
     if gemini_llm:
-        print(f" Model: {os.getenv('GEMINI_MODEL', 'gemini-2.0-flash-exp')}")
+        print(f" LLM pool: {', '.join(member.name for member in llm_pool.members)}")
         print(" Ready to rewrite with AI!")
     else:
         print("  Running in MOCK mode - set GOOGLE_API_KEY for AI features")
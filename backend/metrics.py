@@ -0,0 +1,121 @@
+"""
+In-Process Metrics Registry
+Counters, gauges and latency summaries exposed through the /metrics endpoint
+"""
+
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+# Recent samples kept per summary (for percentiles)
+SUMMARY_WINDOW = 1024
+
+
+def _key(name: str, labels: Dict[str, Any]) -> str:
+    if not labels:
+        return name
+    label_str = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return f"{name}{{{label_str}}}"
+
+
+# ============================================================================
+# SUMMARY (rolling latency distribution)
+# ============================================================================
+
+class Summary:
+    """Count/sum over all observations plus a rolling window for percentiles"""
+
+    def __init__(self, window: int = SUMMARY_WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99)
+        }
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class MetricsRegistry:
+    """Thread-safe registry - workflow nodes run in worker threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.summaries: Dict[str, Summary] = {}
+        self.gauge_callbacks: Dict[str, Callable[[], Any]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def register_gauge(self, name: str, callback: Callable[[], Any], **labels):
+        """Gauge computed on read (e.g. current circuit state)"""
+        with self._lock:
+            self.gauge_callbacks[_key(name, labels)] = callback
+
+    def observe(self, name: str, value: float, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            summary = self.summaries.get(key)
+            if summary is None:
+                summary = self.summaries[key] = Summary()
+            summary.observe(value)
+
+    def get_summary(self, name: str, **labels) -> Optional[Summary]:
+        with self._lock:
+            return self.summaries.get(_key(name, labels))
+
+    def percentile(self, name: str, q: float, **labels) -> Optional[float]:
+        summary = self.get_summary(name, **labels)
+        return summary.percentile(q) if summary else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            gauges = dict(self.gauges)
+            callbacks = dict(self.gauge_callbacks)
+            result = {
+                "counters": dict(self.counters),
+                "summaries": {key: summary.snapshot() for key, summary in self.summaries.items()}
+            }
+
+        for key, callback in callbacks.items():
+            try:
+                gauges[key] = callback()
+            except Exception as e:
+                gauges[key] = f"error: {e}"
+        result["gauges"] = gauges
+        return result
+
+
+# ============================================================================
+# INITIALIZE GLOBAL REGISTRY
+# ============================================================================
+
+metrics = MetricsRegistry()
@@ -0,0 +1,65 @@
+"""
+Lightweight Linear Pipeline Executor
+Runs an ordered list of workflow nodes without LangGraph's state-channel bookkeeping
+"""
+
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+NodeFn = Callable[[Dict[str, Any]], Union[Dict[str, Any], Awaitable[Dict[str, Any]], None]]
+
+# ============================================================================
+# LINEAR PIPELINE
+# ============================================================================
+
+class LinearPipeline:
+    """
+    Drop-in replacement for a compiled linear StateGraph.
+
+    Nodes receive the state dict and may mutate it in place and/or return it
+    (returning None keeps the current state). Both sync and async nodes are supported.
+    """
+
+    def __init__(self, nodes: List[Tuple[str, NodeFn]]):
+        self.nodes = list(nodes)
+        self.node_names = [name for name, _ in self.nodes]
+        self._is_async = [inspect.iscoroutinefunction(fn) for _, fn in self.nodes]
+
+    def invoke(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Run every node in order and return the final state"""
+        state = dict(state)
+
+        for (_, fn), is_async in zip(self.nodes, self._is_async):
+            if is_async:
+                result = _run_coroutine(fn(state))
+            else:
+                result = fn(state)
+            if result is not None:
+                state = result
+
+        return state
+
+    async def ainvoke(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant - awaits async nodes, calls sync nodes inline"""
+        state = dict(state)
+
+        for (_, fn), is_async in zip(self.nodes, self._is_async):
+            result = fn(state)
+            if is_async or inspect.isawaitable(result):
+                result = await result
+            if result is not None:
+                state = result
+
+        return state
+
+
+def _run_coroutine(coro) -> Optional[Dict[str, Any]]:
+    """Run an async node from the sync invoke() path"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    coro.close()
+    raise RuntimeError("Async node called from a running event loop - use ainvoke() instead")
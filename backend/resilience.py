@@ -0,0 +1,332 @@
+"""
+Resilience Primitives for Upstream Calls
+Circuit breaker and request hedging used around the Gemini call
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from metrics import metrics
+
+# ============================================================================
+# CIRCUIT BREAKER
+# ============================================================================
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """The breaker refused the call - use the fallback"""
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker.
+
+    Trips OPEN when, over the last `window_size` calls (and at least `min_calls`),
+    the failure rate or the slow-call rate reaches its threshold. After
+    `open_seconds` it goes HALF_OPEN and lets `half_open_probes` calls through:
+    all succeed -> CLOSED, any failure or slow call -> OPEN again.
+    While OPEN, allow_request() is a lock + comparison, so callers can fall back instantly.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate_threshold: float = 0.8,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 2
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._outcomes = deque(maxlen=window_size)  # (failed, slow)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+        metrics.register_gauge("circuit_breaker_state", lambda: STATE_CODES[self.state], breaker=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow_request(self) -> Optional[str]:
+        """
+        The state the permit was granted in if the call may go upstream (CLOSED, or
+        HALF_OPEN for a probe - exactly one upstream call); None means use the fallback now
+        """
+        with self._lock:
+            self._maybe_half_open()
+
+            if self._state == CLOSED:
+                return CLOSED
+
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return HALF_OPEN
+
+        metrics.inc("circuit_breaker_calls_total", breaker=self.name, outcome="rejected")
+        return None
+
+    def release_probe(self):
+        """
+        Give back a permit from allow_request() when no call went upstream after all
+        (pool exhausted, deadline hit, draft cancelled) - otherwise a HALF_OPEN probe
+        slot would stay taken and the breaker could never close again.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def record_success(self, latency: float):
+        slow = latency >= self.slow_call_seconds
+        metrics.inc("circuit_breaker_calls_total", breaker=self.name, outcome="slow" if slow else "success")
+        self._record(failed=False, slow=slow)
+
+    def record_failure(self, latency: float = 0.0):
+        metrics.inc("circuit_breaker_calls_total", breaker=self.name, outcome="failure")
+        self._record(failed=True, slow=latency >= self.slow_call_seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            failure_rate, slow_rate = self._rates()
+            return {
+                "state": self._state,
+                "window_calls": len(self._outcomes),
+                "failure_rate": round(failure_rate, 3),
+                "slow_call_rate": round(slow_rate, 3)
+            }
+
+    # ------------------------------------------------------------------
+    # Internal state machine (helpers below _record expect self._lock held)
+    # ------------------------------------------------------------------
+
+    def _record(self, failed: bool, slow: bool):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed or slow:
+                    self._transition(OPEN)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(CLOSED)
+                return
+
+            if self._state == OPEN:
+                # Late result from a call started before the circuit opened
+                return
+
+            self._outcomes.append((failed, slow))
+            if len(self._outcomes) < self.min_calls:
+                return
+
+            failure_rate, slow_rate = self._rates()
+            if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                self._transition(OPEN)
+
+    def _rates(self):
+        if not self._outcomes:
+            return 0.0, 0.0
+        total = len(self._outcomes)
+        failures = sum(1 for failed, _ in self._outcomes if failed)
+        slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+        return failures / total, slow / total
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+
+    def _transition(self, new_state: str):
+        old_state = self._state
+        self._state = new_state
+        if new_state == OPEN:
+            self._opened_at = time.monotonic()
+        if new_state in (OPEN, CLOSED):
+            self._outcomes.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        metrics.inc("circuit_breaker_transitions_total", breaker=self.name, to=new_state)
+        print(f"Circuit breaker '{self.name}': {old_state} -> {new_state}")
+
+
+# ============================================================================
+# REQUEST HEDGING
+# ============================================================================
+
+class RequestHedger:
+    """
+    Sends a duplicate request when the first one is slower than a latency percentile.
+
+    The hedge delay is the `percentile` of the recorded `latency_metric` summary
+    (clamped to [min_delay, max_delay]; `default_delay` until `min_samples` exist).
+    Whichever attempt succeeds first wins and the other task is cancelled.
+    At most `budget` of the last `budget_window` requests may be hedged.
+
+    Attempts that are abandoned (the loser of a race, or everything still running when
+    the caller times out or is cancelled) are observed under outcome="abandoned", apart
+    from the completed calls the percentile is taken over. The hedger doesn't touch the
+    circuit breaker: the caller records one outcome per request, hedged or not.
+
+    Attempts run as coroutines on a private event loop thread, so callers can be
+    sync code (workflow nodes) and losers are really cancelled rather than abandoned.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latency_metric: str,
+        latency_labels: Optional[Dict[str, Any]] = None,
+        percentile: float = 0.95,
+        min_delay: float = 0.3,
+        max_delay: float = 5.0,
+        default_delay: float = 2.0,
+        min_samples: int = 20,
+        budget: float = 0.1,
+        budget_window: int = 100
+    ):
+        self.name = name
+        self.latency_metric = latency_metric
+        self.latency_labels = latency_labels or {}
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.budget = budget
+
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=budget_window)  # True = request was hedged
+        self._requests = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        metrics.register_gauge("hedge_rate", self._hedge_rate, hedger=name)
+        metrics.register_gauge("hedge_win_rate", self._win_rate, hedger=name)
+
+    def delay(self) -> float:
+        summary = metrics.get_summary(self.latency_metric, **self.latency_labels)
+        if summary is None or summary.count < self.min_samples:
+            return self.default_delay
+        value = summary.percentile(self.percentile) or self.default_delay
+        return min(self.max_delay, max(self.min_delay, value))
+
+    def run(self, make_attempt: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """Blocking entry point for sync callers - cancels all attempts after `timeout`"""
+        future = asyncio.run_coroutine_threadsafe(self.run_async(make_attempt), self._get_loop())
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    async def run_async(self, make_attempt: Callable[[], Awaitable[Any]]) -> Any:
+        with self._lock:
+            self._requests += 1
+
+        started: Dict[asyncio.Future, float] = {}
+
+        def launch() -> asyncio.Future:
+            task = asyncio.ensure_future(make_attempt())
+            started[task] = time.perf_counter()
+            return task
+
+        primary = launch()
+        won = False
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.delay())
+            if done:
+                with self._lock:
+                    self._recent.append(False)
+                result = primary.result()
+                won = True
+                return result
+            if not self._take_budget():
+                result = await primary
+                won = True
+                return result
+
+            metrics.inc("hedge_requests_total", hedger=self.name)
+            hedge = launch()
+            pending = {primary, hedge}
+            error = None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = "hedge" if task is hedge else "primary"
+                        metrics.inc("hedge_wins_total", hedger=self.name, winner=winner)
+                        if winner == "hedge":
+                            with self._lock:
+                                self._hedge_wins += 1
+                        won = True
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            self._abandon(started, timed_out=not won)
+
+    # ------------------------------------------------------------------
+
+    def _abandon(self, started: Dict[asyncio.Future, float], timed_out: bool):
+        """Cancel attempts that are still running (or were cancelled under us) and record them"""
+        now = time.perf_counter()
+        labels = {**self.latency_labels, "outcome": "abandoned"}
+        for task, start in started.items():
+            if task.done() and not task.cancelled():
+                continue  # finished on its own - the attempt recorded itself
+            task.cancel()
+            metrics.observe(self.latency_metric, now - start, **labels)
+            metrics.inc("hedge_abandoned_total", hedger=self.name, reason="timeout" if timed_out else "lost")
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            hedged = sum(self._recent)
+            allowed = hedged < self.budget * max(len(self._recent), 1)
+            self._recent.append(allowed)
+            if allowed:
+                self._hedges += 1
+        if not allowed:
+            metrics.inc("hedge_skipped_total", hedger=self.name, reason="budget")
+        return allowed
+
+    def _hedge_rate(self) -> float:
+        return round(self._hedges / self._requests, 4) if self._requests else 0.0
+
+    def _win_rate(self) -> float:
+        return round(self._hedge_wins / self._hedges, 4) if self._hedges else 0.0
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name=f"hedger-{self.name}", daemon=True
+                ).start()
+            return self._loop
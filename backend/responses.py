@@ -0,0 +1,175 @@
+"""
+Compact JSON Responses
+Field selection, per-batch metadata deduplication, a fast serializer (orjson when
+installed) and negotiated gzip/brotli compression for the list-heavy endpoints.
+"""
+
+import functools
+import gzip
+import inspect
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from metrics import metrics
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Bodies smaller than this are sent uncompressed (compression costs more than it saves)
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Keys of the payload that hold the per-item list
+ITEM_LISTS = ("comments", "results")
+
+
+# ============================================================================
+# SERIALIZATION
+# ============================================================================
+
+def _default(obj: Any) -> Any:
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+def dumps(payload: Any) -> bytes:
+    """UTF-8 JSON bytes; orjson if installed, else the stdlib encoder"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# ============================================================================
+# FIELD SELECTION & DEDUPLICATION
+# ============================================================================
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """"id,body,score" -> ["id", "body", "score"]; None when no selection was asked for"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()] or None
+
+def select_fields(items: List[Dict[str, Any]], fields: List[str]) -> List[Dict[str, Any]]:
+    return [{key: item[key] for key in fields if key in item} for item in items]
+
+def dedupe_items(items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Drop `text` where it repeats `body`, and move keys whose value is the same in
+    every item (video_title, query, subreddit...) into one shared dict.
+    """
+    items = [
+        {key: value for key, value in item.items() if not (key == "text" and value == item.get("body"))}
+        for item in items
+    ]
+    if len(items) < 2:
+        return items, {}
+
+    first = items[0]
+    shared = {
+        key: value for key, value in first.items()
+        if not isinstance(value, (dict, list)) and all(key in item and item[key] == value for item in items[1:])
+    }
+    if shared:
+        items = [{key: value for key, value in item.items() if key not in shared} for item in items]
+    return items, shared
+
+def compact_payload(payload: Dict[str, Any], fields: Optional[List[str]], compact: bool) -> Dict[str, Any]:
+    """Apply field selection and (if asked for) deduplication to the payload's item list"""
+    for list_key in ITEM_LISTS:
+        items = payload.get(list_key)
+        if not isinstance(items, list) or not items or not isinstance(items[0], dict):
+            continue
+        if fields:
+            items = select_fields(items, fields)
+        if compact:
+            items, shared = dedupe_items(items)
+            if shared:
+                payload["shared"] = shared
+        payload[list_key] = items
+    return payload
+
+
+# ============================================================================
+# COMPRESSION
+# ============================================================================
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Best encoding the client accepts (br > gzip), honouring q=0"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        try:
+            quality = float(params.strip()[2:]) if params.strip().startswith("q=") else 1.0
+        except ValueError:
+            quality = 1.0
+        if quality > 0:
+            accepted.add(name.strip())
+
+    if BROTLI_AVAILABLE and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+# ============================================================================
+# RESPONSE
+# ============================================================================
+
+def compact_response(request: Request, payload: Any, fields: Optional[str] = None,
+                     compact: bool = False) -> Response:
+    """Serialize `payload` with the fast encoder and compress it if the client accepts it"""
+    if isinstance(payload, Response):
+        return payload
+    if isinstance(payload, dict):
+        payload = compact_payload(payload, parse_fields(fields), compact)
+
+    body = dumps(payload)
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", "")) if len(body) >= COMPRESS_MIN_BYTES else None
+    if encoding:
+        raw_size = len(body)
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+        metrics.inc("response_bytes_saved_total", raw_size - len(body), encoding=encoding)
+    metrics.inc("response_bytes_total", len(body), encoding=encoding or "identity")
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def compact_endpoint(endpoint: Callable) -> Callable:
+    """
+    Decorator for async endpoints returning a dict: adds `?fields=` and `?compact=`
+    query parameters and sends the result through compact_response().
+    """
+    @functools.wraps(endpoint)
+    async def wrapper(http_request: Request, *args, fields: Optional[str] = None, compact: bool = False, **kwargs):
+        return compact_response(http_request, await endpoint(*args, **kwargs), fields, compact)
+
+    # FastAPI injects the Request by annotation, so the name doesn't clash with an endpoint's own `request` body
+    signature = inspect.signature(endpoint)
+    wrapper.__signature__ = signature.replace(parameters=[
+        inspect.Parameter("http_request", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=Request),
+        *signature.parameters.values(),
+        inspect.Parameter("fields", inspect.Parameter.KEYWORD_ONLY, default=None, annotation=Optional[str]),
+        inspect.Parameter("compact", inspect.Parameter.KEYWORD_ONLY, default=False, annotation=bool)
+    ])
+    return wrapper
@@ -4,14 +4,24 @@ Scrapes public data when APIs are unavailable or rate-limited
 """
 
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 import logging
-import re
+import os
 from urllib.parse import urljoin, quote
 
+from corpus import comment_corpus
+from hashtag_index import hashtag_index
+from cpu_pool import cpu_pool
+from text_tasks import parse_opengraph, parse_trend_titles
+from watermarks import watermarks
+from deadlines import check_deadline, deadline_expired, remaining_timeout
+from metrics import metrics
+
 logger = logging.getLogger(__name__)
 
+# Default scraper timeout (shortened further by the request deadline)
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT_SECONDS", "10"))
+
 # ============================================================================
 # TRENDING HASHTAG SCRAPER
 # ============================================================================
@@ -32,21 +42,14 @@ class HashtagScraper:
         try:
             # Using Trendsmap or similar aggregator
             url = "https://getdaytrends.com/united-states/"
-            response = requests.get(url, headers=self.headers, timeout=10)
+            check_deadline(url)
+            response = requests.get(url, headers=self.headers, timeout=remaining_timeout(SCRAPER_TIMEOUT))
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                trends = []
-                
-                # Parse trending topics (structure may vary)
-                trend_elements = soup.find_all('a', class_='trend-title', limit=10)
-                
-                for trend in trend_elements:
-                    trends.append({
-                        "name": trend.text.strip(),
-                        "platform": "twitter",
-                        "source": "scraped"
-                    })
+                trends = [
+                    {"name": name, "platform": "twitter", "source": "scraped"}
+                    for name in cpu_pool.run(parse_trend_titles, response.content, 10)
+                ]
                 
                 logger.info(f"✅ Scraped {len(trends)} Twitter trends")
                 return trends
@@ -63,7 +66,8 @@ class HashtagScraper:
         """
         try:
             url = f"https://www.instagram.com/explore/tags/{tag}/?__a=1"
-            response = requests.get(url, headers=self.headers, timeout=10)
+            check_deadline(url)
+            response = requests.get(url, headers=self.headers, timeout=remaining_timeout(SCRAPER_TIMEOUT))
             
             if response.status_code == 200:
                 data = response.json()
@@ -84,8 +88,12 @@ class HashtagScraper:
     def get_popular_hashtags_by_topic(self, topic: str) -> List[str]:
         """
         Generate popular hashtags related to a topic
-        Uses a combination of common patterns and online tools
+        Uses hashtags indexed from fetched YouTube content, else common patterns
         """
+        indexed = hashtag_index.suggest(topic, 5)
+        if indexed:
+            return indexed
+        
         # Common hashtag patterns
         topic_clean = topic.strip().replace(" ", "")
         
@@ -113,30 +121,16 @@ class RedditScraper:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
         }
     
-    def scrape_subreddit_posts(self, subreddit: str, sort: str = "hot", limit: int = 10) -> List[Dict[str, Any]]:
-        """Scrape posts from a subreddit (public data)"""
+    def scrape_subreddit_posts(self, subreddit: str, sort: str = "hot", limit: int = 10,
+                               before: Optional[str] = None, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Scrape posts from a subreddit (public data); `before`/`after` are listing fullnames"""
         try:
-            # Use Reddit's JSON endpoint (no auth needed for public subs)
-            url = f"https://www.reddit.com/r/{subreddit}/{sort}.json?limit={limit}"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                posts = []
-                
-                for post in data['data']['children']:
-                    post_data = post['data']
-                    posts.append({
-                        "id": post_data['id'],
-                        "title": post_data['title'],
-                        "score": post_data['score'],
-                        "num_comments": post_data['num_comments'],
-                        "author": post_data['author'],
-                        "url": f"https://reddit.com{post_data['permalink']}",
-                        "selftext": post_data.get('selftext', '')[:500],
-                        "created_utc": post_data['created_utc']
-                    })
-                
+            if limit > 100 and not before:
+                # A listing page holds at most 100 posts - follow the `after` cursor for the rest
+                posts = list(self.iter_subreddit_posts(subreddit, sort, max_items=limit, after=after))
+            else:
+                posts, _ = self._fetch_listing(subreddit, sort, limit, before, after)
+            if posts is not None:
                 logger.info(f"✅ Scraped {len(posts)} posts from r/{subreddit}")
                 return posts
         
@@ -144,6 +138,90 @@ class RedditScraper:
             logger.error(f"❌ Error scraping r/{subreddit}: {e}")
         
         return []
+    
+    def iter_subreddit_posts(self, subreddit: str, sort: str = "hot", max_items: Optional[int] = None,
+                             max_pages: Optional[int] = None, after: Optional[str] = None,
+                             page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily follow the listing's `after` cursor, one page per request as the previous
+        page is consumed. Stops at `max_items`/`max_pages`, at the end of the listing,
+        or when the request deadline expires.
+        """
+        produced, pages = 0, 0
+        while max_pages is None or pages < max_pages:
+            if deadline_expired():
+                return
+            size = min(page_size, 100) if max_items is None else min(page_size, 100, max_items - produced)
+            posts, after = self._fetch_listing(subreddit, sort, size, after=after)
+            if posts is None:
+                return
+            pages += 1
+            metrics.inc("paginated_pages_total", source="reddit_listing")
+            for post in posts:
+                yield post
+                produced += 1
+                if max_items is not None and produced >= max_items:
+                    return
+            if not after:
+                return
+    
+    def _fetch_listing(self, subreddit: str, sort: str, limit: int,
+                       before: Optional[str] = None, after: Optional[str] = None):
+        """One listing page -> (posts, after fullname); posts is None on a non-200 response"""
+        # Use Reddit's JSON endpoint (no auth needed for public subs)
+        url = f"https://www.reddit.com/r/{subreddit}/{sort}.json?limit={limit}"
+        if before:
+            url += f"&before={quote(before)}"
+        if after:
+            url += f"&after={quote(after)}"
+        check_deadline(url)
+        response = requests.get(url, headers=self.headers, timeout=remaining_timeout(SCRAPER_TIMEOUT))
+        
+        if response.status_code != 200:
+            return None, None
+        
+        data = response.json()
+        posts = []
+        
+        for post in data['data']['children']:
+            post_data = post['data']
+            posts.append({
+                "id": post_data['id'],
+                "name": post_data['name'],
+                "title": post_data['title'],
+                "score": post_data['score'],
+                "num_comments": post_data['num_comments'],
+                "author": post_data['author'],
+                "url": f"https://reddit.com{post_data['permalink']}",
+                "selftext": post_data.get('selftext', '')[:500],
+                "created_utc": post_data['created_utc']
+            })
+        
+        comment_corpus.record("reddit", "post", [{**post, "subreddit": subreddit} for post in posts])
+        return posts, data['data'].get('after')
+    
+    def poll_new_posts(self, subreddit: str, limit: int = 25) -> Dict[str, Any]:
+        """
+        Fetch only posts newer than the last poll (r/<sub>/new with before=<newest fullname>)
+        and merge them into earlier results.
+        """
+        if limit <= 0:
+            raise ValueError("limit must be at least 1")
+        source = f"reddit:new:{subreddit}"
+        cursor = watermarks.cursor(source)
+        
+        try:
+            posts, _ = self._fetch_listing(subreddit, "new", limit, before=cursor.get("before"))
+        except Exception as e:
+            logger.error(f"❌ Error polling r/{subreddit}: {e}")
+            posts = None
+        if posts is None:
+            return {"new": 0, "watermark": cursor, "items": []}
+        
+        state = {"before": posts[0]["name"] if posts else cursor.get("before")}
+        items = watermarks.merge(source, state, posts, sort_key="created_utc", full_refresh=not cursor)
+        logger.info(f"✅ Polled {len(posts)} new posts from r/{subreddit}")
+        return {"new": len(posts), "watermark": state, "items": items}
 
 
 # ============================================================================
@@ -191,38 +269,11 @@ class OpenGraphScraper:
     def extract_metadata(self, url: str) -> Dict[str, Any]:
         """Extract OpenGraph metadata from any URL"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            check_deadline(url)
+            response = requests.get(url, headers=self.headers, timeout=remaining_timeout(SCRAPER_TIMEOUT))
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                metadata = {
-                    "url": url,
-                    "title": None,
-                    "description": None,
-                    "image": None,
-                    "site_name": None
-                }
-                
-                # Extract OpenGraph tags
-                og_tags = soup.find_all('meta', property=re.compile(r'^og:'))
-                for tag in og_tags:
-                    prop = tag.get('property', '').replace('og:', '')
-                    content = tag.get('content')
-                    
-                    if prop in metadata:
-                        metadata[prop] = content
-                
-                # Fallback to regular meta tags
-                if not metadata['title']:
-                    title_tag = soup.find('title')
-                    if title_tag:
-                        metadata['title'] = title_tag.text.strip()
-                
-                if not metadata['description']:
-                    desc_tag = soup.find('meta', attrs={'name': 'description'})
-                    if desc_tag:
-                        metadata['description'] = desc_tag.get('content')
+                metadata = cpu_pool.run(parse_opengraph, response.content, url)
                 
                 logger.info(f"✅ Extracted metadata from {url}")
                 return metadata
@@ -251,7 +302,9 @@ class WebScrapers:
     def fetch_trending_hashtags(self, platform: str) -> List[str]:
         """Fetch trending hashtags for a specific platform"""
         # Only YouTube supports hashtags in remaining platforms
-        return []
+        if platform != "youtube":
+            return []
+        return [entry["tag"] for entry in hashtag_index.trending(20)]
     
     def fetch_reddit_content(self, subreddit: str = "popular", limit: int = 10) -> List[Dict[str, Any]]:
         """Fetch Reddit content via scraping"""
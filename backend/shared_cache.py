@@ -0,0 +1,259 @@
+"""
+Cross-Process Shared Cache
+Rewrite results and upstream social-data responses shared by every uvicorn worker
+(and every dyno on the same disk) through a WAL-mode SQLite store.
+
+Backends implement CacheBackend; create_cache_backend() picks one from a URL:
+    sqlite:///path/to/cache.db   (default, shared across processes)
+    memory://                    (per-process, handy for tests)
+A Redis-compatible backend only needs the same six methods and a branch in the factory.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from metrics import metrics
+
+
+def make_key(*parts: Any) -> str:
+    """Stable key for any JSON-serialisable parts"""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# BACKEND INTERFACE
+# ============================================================================
+
+class CacheBackend(ABC):
+    """Namespaced key/value cache with per-entry TTL and a global size bound"""
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: Any, ttl: float):
+        ...
+
+    @abstractmethod
+    def contains(self, namespace: str, key: str) -> bool:
+        """Existence check that doesn't count as a hit or miss"""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str):
+        ...
+
+    @abstractmethod
+    def clear(self, namespace: Optional[str] = None):
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+    def _record(self, namespace: str, hit: bool):
+        metrics.inc("cache_requests_total", namespace=namespace, result="hit" if hit else "miss")
+
+
+# ============================================================================
+# IN-PROCESS BACKEND
+# ============================================================================
+
+class MemoryCache(CacheBackend):
+    """LRU dict - not shared between processes"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            if entry is None or entry[1] <= time.time():
+                self._data.pop((namespace, key), None)
+                self._record(namespace, False)
+                return None
+            self._data.move_to_end((namespace, key))
+        self._record(namespace, True)
+        return json.loads(entry[0])
+
+    def set(self, namespace, key, value, ttl):
+        with self._lock:
+            self._data[(namespace, key)] = (json.dumps(value), time.time() + ttl)
+            self._data.move_to_end((namespace, key))
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def contains(self, namespace, key):
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            return entry is not None and entry[1] > time.time()
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._data.pop((namespace, key), None)
+
+    def clear(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                self._data.clear()
+            else:
+                for entry_key in [k for k in self._data if k[0] == namespace]:
+                    del self._data[entry_key]
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._data)}
+
+
+# ============================================================================
+# SQLITE BACKEND (shared across processes)
+# ============================================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache (expires_at);
+CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at);
+"""
+
+
+class SQLiteCache(CacheBackend):
+    """
+    WAL-mode SQLite cache. Every write is a single atomic upsert, so concurrent
+    processes never see torn entries. Readers skip expired rows; every
+    `evict_every` writes one process purges expired rows and, if the store is
+    over `max_bytes`, deletes least-recently-used rows until it is back under
+    (90% of) the bound - the bound therefore holds across all processes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, evict_every: int = 100):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self._local = threading.local()
+        self._writes = 0
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread, reused across calls"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace, key):
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, now)
+        ).fetchone()
+        self._record(namespace, row is not None)
+        if row is None:
+            return None
+
+        try:
+            self._conn().execute(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?", (now, namespace, key)
+            )
+        except sqlite3.OperationalError:
+            pass  # LRU bookkeeping is best-effort under write contention
+        return json.loads(row[0])
+
+    def set(self, namespace, key, value, ttl):
+        payload = json.dumps(value)
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, size, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (namespace, key, payload, len(payload), now + ttl, now)
+        )
+
+        self._writes += 1
+        if self._writes % self.evict_every == 0:
+            self.evict()
+
+    def contains(self, namespace, key):
+        row = self._conn().execute(
+            "SELECT 1 FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def delete(self, namespace, key):
+        self._conn().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def clear(self, namespace=None):
+        if namespace is None:
+            self._conn().execute("DELETE FROM cache")
+        else:
+            self._conn().execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+
+    def evict(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            evicted = 0
+            if total > self.max_bytes:
+                target = int(self.max_bytes * 0.9)
+                rows = conn.execute("SELECT namespace, key, size FROM cache ORDER BY accessed_at").fetchall()
+                victims = []
+                for namespace, key, size in rows:
+                    if total <= target:
+                        break
+                    victims.append((namespace, key))
+                    total -= size
+                conn.executemany("DELETE FROM cache WHERE namespace = ? AND key = ?", victims)
+                evicted = len(victims)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        metrics.inc("cache_evictions_total", expired + evicted)
+
+    def stats(self):
+        row = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache WHERE expires_at > ?", (time.time(),)
+        ).fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": row[0],
+            "bytes": row[1],
+            "max_bytes": self.max_bytes
+        }
+
+
+# ============================================================================
+# FACTORY
+# ============================================================================
+
+def create_cache_backend(url: str, max_bytes: int = 64 * 1024 * 1024) -> CacheBackend:
+    if url.startswith("sqlite:///"):
+        return SQLiteCache(url[len("sqlite:///"):], max_bytes=max_bytes)
+    if url.startswith("memory://"):
+        return MemoryCache()
+    raise ValueError(f"Unsupported CACHE_BACKEND '{url}' (use sqlite:///path or memory://)")
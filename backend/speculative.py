@@ -0,0 +1,134 @@
+"""
+Speculative Pre-Rewrites
+After a comment fetch, the top comments are rewritten in the background into the
+platform's recommended tones so that the user's click is served from the rewrite cache.
+Speculation only uses spare LLM capacity: it is rate limited, drops work instead of
+queueing behind interactive traffic, and never retries.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from metrics import metrics
+
+# rewrite_fn(comment, tone, platform) -> awaitable; must write its result into the rewrite cache
+RewriteFn = Callable[[str, str, Optional[str]], Awaitable[Any]]
+# is_cached(comment, tone, platform) -> bool
+CachedFn = Callable[[str, str, Optional[str]], bool]
+# is_busy() -> True when interactive traffic needs the capacity
+BusyFn = Callable[[], bool]
+
+
+class SpeculativeRewriter:
+    """
+    Bounded queue of (comment, tone, platform) drained by a few asyncio workers.
+
+    schedule() never blocks the request that produced the comments; when the queue
+    is full the extra work is dropped. Each worker skips tasks that are already
+    cached, stays idle while `is_busy()` is true, and stops spending once
+    `max_per_minute` speculative rewrites have been started in the last minute.
+    """
+
+    def __init__(
+        self,
+        rewrite_fn: RewriteFn,
+        is_cached: CachedFn,
+        is_busy: BusyFn,
+        workers: int = 1,
+        max_queue: int = 100,
+        max_per_minute: int = 30,
+        busy_backoff: float = 1.0
+    ):
+        self.rewrite_fn = rewrite_fn
+        self.is_cached = is_cached
+        self.is_busy = is_busy
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_per_minute = max_per_minute
+        self.busy_backoff = busy_backoff
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._started = deque()  # start timestamps within the last minute
+
+        metrics.register_gauge("speculative_queue_depth", lambda: self._queue.qsize() if self._queue else 0)
+
+    # ------------------------------------------------------------------
+    # Lifecycle (called from the app lifespan)
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ------------------------------------------------------------------
+
+    def schedule(self, comments: List[str], tones: List[str], platform: Optional[str]) -> int:
+        """Queue every (comment, tone) pair; returns how many were accepted"""
+        if self._queue is None:
+            return 0
+
+        accepted = 0
+        for comment in comments:
+            for tone in tones:
+                try:
+                    self._queue.put_nowait((comment, tone, platform))
+                    accepted += 1
+                except asyncio.QueueFull:
+                    metrics.inc("speculative_dropped_total", reason="queue_full")
+        metrics.inc("speculative_scheduled_total", accepted)
+        return accepted
+
+    def _within_budget(self) -> bool:
+        now = time.monotonic()
+        while self._started and now - self._started[0] > 60:
+            self._started.popleft()
+        return len(self._started) < self.max_per_minute
+
+    async def _worker(self):
+        while True:
+            comment, tone, platform = await self._queue.get()
+            try:
+                await self._process(comment, tone, platform)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, comment: str, tone: str, platform: Optional[str]):
+        if self.is_cached(comment, tone, platform):
+            metrics.inc("speculative_dropped_total", reason="cached")
+            return
+
+        while self.is_busy():
+            await asyncio.sleep(self.busy_backoff)
+
+        if not self._within_budget():
+            metrics.inc("speculative_dropped_total", reason="budget")
+            return
+
+        self._started.append(time.monotonic())
+        start = time.perf_counter()
+        try:
+            await self.rewrite_fn(comment, tone, platform)
+        except Exception as e:
+            metrics.inc("speculative_dropped_total", reason=type(e).__name__)
+            return
+        metrics.inc("speculative_completed_total")
+        metrics.observe("speculative_rewrite_seconds", time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._tasks),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "started_last_minute": len(self._started),
+            "max_per_minute": self.max_per_minute
+        }
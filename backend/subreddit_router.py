@@ -0,0 +1,188 @@
+"""
+Topic -> Subreddit Router
+A token-level inverted index from query words to weighted subreddits. It starts from
+hand-picked seed routes, and the weights are learned from how many meaningful comments
+each subreddit actually produced for queries containing that word.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS route_stats (
+    token TEXT NOT NULL,
+    subreddit TEXT NOT NULL,
+    tries INTEGER NOT NULL,
+    yield_sum REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (token, subreddit)
+);
+"""
+
+UPSERT = """
+INSERT INTO route_stats (token, subreddit, tries, yield_sum, updated_at) VALUES (?, ?, 1, ?, ?)
+ON CONFLICT (token, subreddit) DO UPDATE SET
+    tries = tries + 1,
+    yield_sum = yield_sum + excluded.yield_sum,
+    updated_at = excluded.updated_at
+"""
+
+# (words, subreddits) - whole words only, so "ai" no longer matches "rain" or "said"
+SEED_ROUTES = [
+    (["tech", "technology", "technical", "ai", "artificial", "intelligence", "computer", "computers",
+      "software", "programming", "programmer", "code", "coding", "developer"],
+     ["technology", "programming", "learnprogramming"]),
+    (["game", "games", "gaming", "gamer", "videogame", "videogames"], ["gaming", "Games"]),
+    (["movie", "movies", "film", "films", "tv", "show", "shows", "series", "television"], ["movies", "television"]),
+    (["science", "scientific", "research", "study", "studies"], ["science", "askscience"]),
+    (["news", "politics", "political", "world", "election"], ["news", "worldnews"]),
+    (["book", "books", "read", "reading", "novel", "novels"], ["books", "literature"]),
+]
+
+# General-purpose subreddits: a weak match for any topic, and the fallback when nothing matches
+GENERAL_SUBREDDITS = ["AskReddit", "todayilearned", "explainlikeimfive"]
+GENERAL_PRIOR = 0.2
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words that say nothing about the topic (and would otherwise learn links to every subreddit)
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "is", "are", "was", "be", "it",
+    "this", "that", "what", "why", "how", "who", "when", "best", "about", "with", "my", "your",
+    "do", "does", "i", "you", "we", "they", "new", "top", "most", "vs"
+}
+
+
+def tokenize(query: str) -> List[str]:
+    tokens = [token for token in TOKEN_RE.findall(query.lower()) if token not in STOPWORDS]
+    # "video game" is also seen as the single token "videogame"
+    return tokens + [a + b for a, b in zip(tokens, tokens[1:])]
+
+
+class SubredditRouter:
+    """
+    token -> {subreddit: prior} index plus learned (tries, yield) per (token, subreddit).
+
+    A subreddit's score for a query is the sum over the query's tokens of its smoothed
+    yield for that token: (yield_sum + prior * m) / (tries + m). Seed routes give the
+    prior; a route that keeps returning nothing fades, and one that works for a word it
+    wasn't seeded with (e.g. a general subreddit) gains weight for that word.
+    """
+
+    def __init__(self, db_path: str, smoothing: float = 3.0, refresh_interval: float = 300.0):
+        self.db_path = db_path
+        self.smoothing = smoothing
+        self.refresh_interval = refresh_interval
+
+        self._priors: Dict[str, Dict[str, float]] = {}
+        self._order: Dict[str, int] = {}  # seed order breaks ties
+        for words, subreddits in SEED_ROUTES:
+            for subreddit in subreddits:
+                self._order.setdefault(subreddit, len(self._order))
+            for word in words:
+                for subreddit in subreddits:
+                    self._priors.setdefault(word, {})[subreddit] = 1.0
+
+        self._learned: Dict[str, Dict[str, Tuple[int, float]]] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self._reload()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _reload(self):
+        """Pick up stats recorded by other worker processes"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT token, subreddit, tries, yield_sum FROM route_stats").fetchall()
+        learned: Dict[str, Dict[str, Tuple[int, float]]] = {}
+        for token, subreddit, tries, yield_sum in rows:
+            learned.setdefault(token, {})[subreddit] = (tries, yield_sum)
+        with self._lock:
+            self._learned = learned
+            self._loaded_at = time.monotonic()
+
+    # ------------------------------------------------------------------
+
+    def scores(self, query: str) -> Dict[str, float]:
+        """Subreddit -> score for the query (only subreddits indexed under one of its tokens)"""
+        if time.monotonic() - self._loaded_at > self.refresh_interval:
+            self._reload()
+
+        m = self.smoothing
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for token in set(tokenize(query)):
+                priors = self._priors.get(token, {})
+                learned = self._learned.get(token, {})
+                for subreddit in set(priors) | set(learned):
+                    prior = priors.get(subreddit, GENERAL_PRIOR if subreddit in GENERAL_SUBREDDITS else 0.0)
+                    tries, yield_sum = learned.get(subreddit, (0, 0.0))
+                    score = (yield_sum + prior * m) / (tries + m)
+                    totals[subreddit] = totals.get(subreddit, 0.0) + score
+        return totals
+
+    def route(self, query: str, limit: int = 3) -> List[str]:
+        """Best `limit` subreddits for the query, topped up with general ones"""
+        scores = self.scores(query)
+        ranked = [
+            subreddit for subreddit, score in sorted(scores.items(), key=lambda item: (-item[1], self._order.get(item[0], len(self._order))))
+            if score > 0
+        ]
+        metrics.inc("subreddit_routes_total", result="indexed" if ranked else "fallback")
+
+        for subreddit in GENERAL_SUBREDDITS:
+            if len(ranked) >= limit:
+                break
+            if subreddit not in ranked:
+                ranked.append(subreddit)
+        return ranked[:limit]
+
+    def record(self, query: str, subreddit: str, meaningful: int, wanted: int):
+        """Feedback after fetching from `subreddit`: `meaningful` of the `wanted` comments were usable"""
+        if wanted <= 0:
+            return
+        yield_ratio = min(1.0, meaningful / wanted)
+        now = time.time()
+        tokens = set(tokenize(query))
+
+        with self._lock:
+            for token in tokens:
+                tries, yield_sum = self._learned.setdefault(token, {}).get(subreddit, (0, 0.0))
+                self._learned[token][subreddit] = (tries + 1, yield_sum + yield_ratio)
+        try:
+            with self._connect() as conn:
+                conn.executemany(UPSERT, [(token, subreddit, yield_ratio, now) for token in tokens])
+        except sqlite3.Error as e:
+            logger.warning(f"Could not save route stats for r/{subreddit}: {e}")
+        metrics.observe("subreddit_route_yield", yield_ratio)
+
+    def snapshot(self, query: str) -> Dict[str, float]:
+        return {subreddit: round(score, 3) for subreddit, score in sorted(self.scores(query).items(), key=lambda item: -item[1])}
+
+
+# ============================================================================
+# INITIALIZE GLOBAL ROUTER
+# ============================================================================
+
+subreddit_router = SubredditRouter(os.getenv("ROUTER_DB_PATH", "router.db"))
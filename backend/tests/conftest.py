@@ -0,0 +1,21 @@
+"""
+Test setup: backend modules are imported from the parent directory, and every SQLite
+store they create at import time goes to a throwaway directory instead of the cwd.
+"""
+
+import os
+import sys
+import tempfile
+
+_STATE_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+for var, name in [
+    ("CORPUS_DB_PATH", "corpus.db"),
+    ("JOBS_DB_PATH", "jobs.db"),
+    ("ROUTER_DB_PATH", "router.db"),
+    ("WATERMARK_DB_PATH", "watermarks.db"),
+]:
+    os.environ.setdefault(var, os.path.join(_STATE_DIR, name))
+os.environ.setdefault("CACHE_BACKEND", f"sqlite:///{os.path.join(_STATE_DIR, 'cache.db')}")
+os.environ.setdefault("CORPUS_ENABLED", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
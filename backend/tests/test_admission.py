@@ -0,0 +1,64 @@
+"""Admission controller: slot accounting under timeouts and cancellation"""
+
+import asyncio
+
+import pytest
+
+import admission
+from admission import AdmissionController, AdmissionRejected
+
+
+def controller(**kwargs):
+    return AdmissionController("test", max_concurrent=1, max_queue=8, **kwargs)
+
+
+def test_cancelled_waiter_after_handoff_does_not_leak_slot(monkeypatch):
+    """The slot is handed to a waiter that is cancelled before it resumes (as on Python 3.12+)"""
+    async def handed_off_then_cancelled(future, timeout):
+        await future
+        raise asyncio.CancelledError
+
+    async def scenario():
+        ac = controller()
+        await ac.acquire("interactive")
+        monkeypatch.setattr(admission.asyncio, "wait_for", handed_off_then_cancelled)
+        waiter = asyncio.create_task(ac.acquire("interactive"))
+        await asyncio.sleep(0)
+
+        ac.release()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return ac.in_flight
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_queue_timeout_rejects_and_frees_nothing():
+    async def scenario():
+        ac = controller(lane_max_wait={"batch": 0.05})
+        await ac.acquire("interactive")
+        with pytest.raises(AdmissionRejected) as rejected:
+            await ac.acquire("batch")
+        ac.release()
+        return rejected.value.status_code, ac.in_flight
+
+    assert asyncio.run(scenario()) == (503, 0)
+
+
+def test_interactive_lane_is_served_before_batch():
+    async def scenario():
+        ac = controller()
+        order = []
+        await ac.acquire("interactive")
+
+        async def wait(lane):
+            async with ac.slot(lane):
+                order.append(lane)
+
+        tasks = [asyncio.create_task(wait("batch")), asyncio.create_task(wait("interactive"))]
+        await asyncio.sleep(0)
+        ac.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["interactive", "batch"]
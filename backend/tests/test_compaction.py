@@ -0,0 +1,43 @@
+"""Input compaction: markup stripping and placeholder round-trips"""
+
+from compaction import compact_input, restore_placeholders
+
+
+def compact(text):
+    return compact_input(text, 512)
+
+
+def test_emphasis_inside_words_is_left_alone():
+    assert compact("2*3*4 equals 24")["text"] == "2*3*4 equals 24"
+    assert compact("override __init__ and snake_case_name")["text"] == "override __init__ and snake_case_name"
+
+
+def test_word_boundary_emphasis_is_stripped():
+    assert compact("this is **really** *good*, ~~not~~ `bad`")["text"] == "this is really good, not bad"
+
+
+def test_urls_and_quotes_round_trip():
+    result = compact("> you said this\nsee https://example.com/a for more")
+    (quote_key,) = [k for k in result["placeholders"] if k.startswith("[QUOTE")]
+    (url_key,) = [k for k in result["placeholders"] if k.startswith("[URL")]
+    assert result["text"] == f"{quote_key}\nsee {url_key} for more"
+
+    restored = restore_placeholders(f"{quote_key} check {url_key} please", result["placeholders"])
+    assert restored == "> you said this\n\ncheck https://example.com/a please"
+
+
+def test_literal_placeholder_text_from_the_user_survives():
+    result = compact("paste it as [URL1] or [QUOTE1], not https://example.com")
+    assert "[URL1] or [QUOTE1]" in result["text"]
+
+    (url_key,) = result["placeholders"]
+    restored = restore_placeholders(result["text"], result["placeholders"])
+    assert restored == "paste it as [URL1] or [QUOTE1], not https://example.com"
+    assert url_key not in restored
+
+
+def test_invented_placeholders_with_this_calls_nonce_are_dropped():
+    result = compact("see https://example.com")
+    (url_key,) = result["placeholders"]
+    invented = url_key.replace("[URL1", "[URL2")
+    assert restore_placeholders(f"look {url_key} {invented}", result["placeholders"]) == "look https://example.com"
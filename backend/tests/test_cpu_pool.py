@@ -0,0 +1,36 @@
+"""CPU pool: batch timeouts and recovery from a broken pool"""
+
+import asyncio
+import time
+
+import pytest
+
+from cpu_pool import CpuPool
+from text_tasks import sentiment_label
+
+
+@pytest.fixture
+def pool():
+    pool = CpuPool(workers=1, chunk_size=2, task_timeout=30)
+    pool.start()
+    yield pool
+    pool.stop()
+
+
+def test_amap_times_out_instead_of_waiting_forever(pool):
+    pool.run(sentiment_label, "spawn and warm the worker first")
+    pool.task_timeout = 0.3
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(pool.amap(time.sleep, [2]))
+
+
+def test_broken_pool_runs_inline_and_is_replaced(pool):
+    assert pool.run(sentiment_label, "I love this") == "positive"
+    broken = pool._executor
+    for process in list(broken._processes.values()):
+        process.kill()
+        process.join()
+
+    assert asyncio.run(pool.amap(sentiment_label, ["great", "awful", "fine"])) == ["positive", "negative", "positive"]
+    assert pool._executor is not broken
+    assert pool.run(sentiment_label, "awful") == "negative"
@@ -0,0 +1,42 @@
+"""Deadline-bounded workflow runs: the admission slot outlives an abandoned thread"""
+
+import asyncio
+import threading
+
+import pytest
+
+import main
+from deadlines import Deadline, DeadlineExceeded, set_deadline
+
+
+def test_timed_out_workflow_keeps_its_slot_until_the_thread_ends():
+    release = threading.Event()
+
+    def slow_workflow():
+        release.wait(5)
+        return "done"
+
+    async def scenario():
+        set_deadline(Deadline(0.05))
+        with pytest.raises(DeadlineExceeded):
+            await main.run_within_deadline("interactive", slow_workflow)
+        held_after_timeout = main.llm_admission.in_flight
+
+        release.set()
+        for _ in range(100):
+            if main.llm_admission.in_flight == 0:
+                break
+            await asyncio.sleep(0.01)
+        return held_after_timeout, main.llm_admission.in_flight
+
+    assert asyncio.run(scenario()) == (1, 0)
+
+
+def test_finished_workflow_returns_result_and_frees_slot():
+    async def scenario():
+        set_deadline(Deadline(5))
+        result = await main.run_within_deadline("interactive", lambda x: x * 2, 21)
+        await asyncio.sleep(0)
+        return result, main.llm_admission.in_flight
+
+    assert asyncio.run(scenario()) == (42, 0)
@@ -0,0 +1,19 @@
+"""Engagement scoring: /rewrite predictions and bulk scoring share one feature set"""
+
+import main
+from engagement import BASE_SCORE, LENGTH_BAND_BONUS, score_engagement
+
+
+def test_length_band_is_scored():
+    config = {"best_tones": [], "emoji_friendly": False}
+    in_band, too_short = score_engagement(["x" * 150, "x" * 20], "casual", "youtube", config)
+    assert in_band == BASE_SCORE + LENGTH_BAND_BONUS
+    assert too_short == BASE_SCORE
+
+
+def test_rewrite_prediction_matches_bulk_score():
+    comments = ["x" * 150, "short one?", "y" * 300 + " 🎉"]
+    for platform in ("reddit", "youtube"):
+        bulk = score_engagement(comments, "funny", platform, main.PLATFORM_CONFIGS[platform])
+        single = [main.predict_engagement(comment, "funny", platform)["virality_score"] for comment in comments]
+        assert single == [int(score) for score in bulk]
@@ -0,0 +1,24 @@
+"""Hashtag index: keyword/tag keying and size limits"""
+
+from hashtag_index import HashtagIndex
+
+
+def test_plain_word_suggests_its_own_hashtag():
+    index = HashtagIndex()
+    index.observe(["Building a castle today #Minecraft #gaming"])
+
+    assert set(index.suggest("minecraft castle ideas")) == {"#Minecraft", "#gaming"}
+    assert index.suggest("#minecraft") == ["#gaming"]
+
+
+def test_tags_already_in_the_text_are_not_suggested():
+    index = HashtagIndex()
+    index.observe(["speedrun practice #minecraft #speedrun"])
+    assert index.suggest("my speedrun #speedrun") == ["#minecraft"]
+
+
+def test_tag_counts_have_their_own_limit():
+    index = HashtagIndex(max_keywords=1000, max_hashtags=2)
+    index.observe([f"post number {i} #tag{i}" for i in range(5)])
+    assert index.stats()["tags"] == 2
+    assert index.stats()["keywords"] > 2
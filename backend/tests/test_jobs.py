@@ -0,0 +1,184 @@
+"""Job queue: claiming, lease takeover, cancellation and retries while waiting for LLM capacity"""
+
+import threading
+import time
+from collections import Counter
+
+from jobs import CANCELLED, COMPLETED, DONE, FAILED, PENDING, RUNNING, JobManager, RetryItem
+
+
+def fake_rewrite(comment, params):
+    """Deterministic local stand-in for the Gemini rewrite: same input, same output, no network"""
+    return {"rewritten": f"{params.get('tone', 'casual')}: {comment[::-1]}", "model_used": "fake"}
+
+
+def wait_for(predicate, timeout=5.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def item_statuses(manager, job_id):
+    with manager._connect() as conn:
+        return [row[0] for row in conn.execute("SELECT status FROM job_items WHERE job_id = ? ORDER BY idx", (job_id,))]
+
+
+def test_fake_rewrite_job_runs_to_completion(tmp_path):
+    manager = JobManager(str(tmp_path / "jobs.db"), fake_rewrite, workers=2)
+    job = manager.submit(["hello", "world"], {"tone": "funny"})
+    manager.start()
+    try:
+        assert wait_for(lambda: manager.get(job["job_id"])["status"] == COMPLETED)
+    finally:
+        manager.stop()
+    assert [r["result"]["rewritten"] for r in manager.results(job["job_id"])] == ["funny: olleh", "funny: dlrow"]
+
+
+def test_two_managers_never_claim_the_same_item(tmp_path):
+    """Two processes' worth of workers on one database: every item is rewritten exactly once"""
+    calls = Counter()
+    lock = threading.Lock()
+
+    def counting_rewrite(comment, params):
+        with lock:
+            calls[comment] += 1
+        return fake_rewrite(comment, params)
+
+    path = str(tmp_path / "jobs.db")
+    managers = [JobManager(path, counting_rewrite, workers=4) for _ in range(2)]
+    job = managers[0].submit([f"comment {i}" for i in range(200)], {})
+    for manager in managers:
+        manager.start()
+    try:
+        assert wait_for(lambda: managers[0].get(job["job_id"])["status"] == COMPLETED, timeout=30)
+    finally:
+        for manager in managers:
+            manager.stop()
+
+    assert len(calls) == 200 and set(calls.values()) == {1}
+    assert managers[0].get(job["job_id"])["completed"] == 200
+
+
+def test_expired_lease_is_reclaimed_and_the_old_owner_cannot_write(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    crashed = JobManager(path, fake_rewrite, workers=1, lease_seconds=0.2)
+    job = crashed.submit(["hello"], {})
+    stale_item = crashed._claim_next()  # claimed, then the "process" dies without finishing
+    assert item_statuses(crashed, job["job_id"]) == [RUNNING]
+
+    survivor = JobManager(path, fake_rewrite, workers=1)
+    assert survivor._claim_next() is None  # lease still held
+    survivor.start()
+    try:
+        assert wait_for(lambda: survivor.get(job["job_id"])["status"] == COMPLETED)
+    finally:
+        survivor.stop()
+
+    crashed._process(stale_item)  # late result from the old owner is dropped
+    assert survivor.get(job["job_id"])["completed"] == 1
+
+
+def test_cancel_skips_the_remaining_items(tmp_path):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def blocking_rewrite(comment, params):
+        calls.append(comment)
+        started.set()
+        release.wait(5)
+        return fake_rewrite(comment, params)
+
+    manager = JobManager(str(tmp_path / "jobs.db"), blocking_rewrite, workers=1)
+    job = manager.submit([f"comment {i}" for i in range(5)], {})
+    manager.start()
+    try:
+        assert started.wait(5)
+        assert manager.cancel(job["job_id"])["status"] == CANCELLED
+        release.set()
+        assert wait_for(lambda: PENDING not in item_statuses(manager, job["job_id"])
+                        and RUNNING not in item_statuses(manager, job["job_id"]))
+    finally:
+        manager.stop()
+
+    assert calls == ["comment 0"]
+    assert item_statuses(manager, job["job_id"]) == [DONE] + [CANCELLED] * 4
+    assert manager.get(job["job_id"])["status"] == CANCELLED
+
+
+def test_retry_item_is_retried_then_succeeds(tmp_path):
+    attempts = []
+
+    def rewrite(comment, params):
+        attempts.append(comment)
+        if len(attempts) < 3:
+            raise RetryItem(0.01, "queue_full")
+        return {"rewritten": comment.upper()}
+
+    manager = JobManager(str(tmp_path / "jobs.db"), rewrite, workers=1)
+    job = manager.submit(["hello"], {})
+    manager.start()
+    try:
+        assert wait_for(lambda: manager.get(job["job_id"])["completed"] == 1)
+    finally:
+        manager.stop()
+    assert len(attempts) == 3
+    assert manager.results(job["job_id"])[0]["status"] == DONE
+
+
+def test_retries_are_bounded(tmp_path):
+    def rewrite(comment, params):
+        raise RetryItem(0.01, "queue_full")
+
+    manager = JobManager(str(tmp_path / "jobs.db"), rewrite, workers=1, max_retries=2)
+    job = manager.submit(["hello"], {})
+    manager.start()
+    try:
+        assert wait_for(lambda: manager.get(job["job_id"])["failed"] == 1)
+    finally:
+        manager.stop()
+    result = manager.results(job["job_id"])[0]
+    assert result["status"] == FAILED
+    assert "queue_full" in result["error"]
+
+
+def test_cancel_stops_a_retrying_item(tmp_path):
+    retrying = threading.Event()
+
+    def rewrite(comment, params):
+        retrying.set()
+        raise RetryItem(0.05, "queue_full")
+
+    manager = JobManager(str(tmp_path / "jobs.db"), rewrite, workers=1)
+    job = manager.submit(["hello"], {})
+    manager.start()
+    try:
+        assert retrying.wait(5)
+        manager.cancel(job["job_id"])
+        with manager._connect() as conn:
+            status = lambda: conn.execute("SELECT status FROM job_items").fetchone()[0]
+            assert wait_for(lambda: status() == CANCELLED)
+    finally:
+        manager.stop()
+
+
+def test_retry_wait_renews_the_lease(tmp_path):
+    started = threading.Event()
+
+    def rewrite(comment, params):
+        started.set()
+        raise RetryItem(0.2, "queue_full")
+
+    manager = JobManager(str(tmp_path / "jobs.db"), rewrite, workers=1, lease_seconds=0.3, max_retries=5)
+    manager.submit(["hello"], {})
+    manager.start()
+    try:
+        assert started.wait(5)
+        time.sleep(0.5)
+        with manager._connect() as conn:
+            lease_until = conn.execute("SELECT lease_until FROM job_items").fetchone()[0]
+        assert lease_until > time.time()
+    finally:
+        manager.stop()
@@ -0,0 +1,25 @@
+"""Gemini key pool: member naming and rate-limit ejection"""
+
+import pytest
+
+from llm_pool import LLMPool, LLMPoolExhausted
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def test_member_names_are_unique_for_keys_with_the_same_suffix():
+    pool = LLMPool.from_config(["aaa-1234", "bbb-1234"], ["flash"], lambda key, model: None)
+    assert [member.name for member in pool.members] == ["key1/flash", "key2/flash"]
+
+
+def test_rate_limited_member_is_skipped_until_pool_is_exhausted():
+    pool = LLMPool.from_config(["k1", "k2"], ["flash"], lambda key, model: None)
+    first = pool.acquire()
+    pool.report_failure(first, RateLimited("429 RESOURCE_EXHAUSTED"))
+    second = pool.acquire()
+    assert second is not first
+    pool.report_failure(second, RateLimited("429 RESOURCE_EXHAUSTED"))
+    with pytest.raises(LLMPoolExhausted):
+        pool.acquire()
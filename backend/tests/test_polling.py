@@ -0,0 +1,81 @@
+"""Incremental Twitter/YouTube polling: empty polls and gap handling"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import api_clients
+from watermarks import WatermarkStore
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    store = WatermarkStore(str(tmp_path / "watermarks.db"))
+    monkeypatch.setattr(api_clients, "watermarks", store)
+    return store
+
+
+class FakeTwitter:
+    """search_recent_tweets over ids 1..n, newest first, honouring since_id/until_id"""
+
+    def __init__(self, n=0):
+        self.n = n
+
+    def search_recent_tweets(self, query, max_results, since_id=None, until_id=None, tweet_fields=None):
+        ids = [i for i in range(self.n, 0, -1) if (not since_id or i > since_id) and (not until_id or i < until_id)]
+        data = [
+            SimpleNamespace(id=i, text=f"tweet {i}", created_at=None, public_metrics={})
+            for i in ids[:max_results]
+        ]
+        return SimpleNamespace(data=data or None)
+
+
+def twitter(n):
+    client = api_clients.TwitterClient.__new__(api_clients.TwitterClient)
+    client.available = True
+    client.client = FakeTwitter(n)
+    return client
+
+
+def test_empty_first_twitter_poll_keeps_no_cursor():
+    result = twitter(0).poll_recent_tweets("quiet", max_results=10)
+    assert result["new"] == 0
+    assert result["watermark"] == {"since_id": None}
+
+
+def test_twitter_poll_pages_back_and_fills_gap():
+    client = twitter(5)
+    client.poll_recent_tweets("topic", max_results=10)
+
+    # 47 new tweets, 10 per page, 2 pages per poll -> the rest is a gap for the next polls
+    client.client.n = 52
+    first = client.poll_recent_tweets("topic", max_results=10, max_pages=2)
+    assert first["new"] == 20
+    assert first["watermark"]["since_id"] == 52
+    assert first["watermark"]["gap_until_id"] == 33
+
+    seen = {item["id"] for item in first["items"]}
+    for _ in range(3):
+        seen |= {item["id"] for item in client.poll_recent_tweets("topic", max_results=10, max_pages=2)["items"]}
+    assert seen == set(range(1, 53))
+    assert "gap_until_id" not in api_clients.watermarks.cursor("twitter:search:topic")
+
+
+def test_twitter_error_keeps_previous_cursor():
+    client = twitter(5)
+    client.poll_recent_tweets("topic", max_results=10)
+
+    def boom(**kwargs):
+        raise RuntimeError("429")
+    client.client.search_recent_tweets = boom
+    result = client.poll_recent_tweets("topic", max_results=10)
+    assert result["watermark"]["since_id"] == 5
+
+
+def test_empty_first_youtube_poll(monkeypatch):
+    client = api_clients.YouTubeClient.__new__(api_clients.YouTubeClient)
+    client.available = True
+    monkeypatch.setattr(client, "_comment_page", lambda *args, **kwargs: ([], None), raising=False)
+    result = client.poll_video_comments("vid", max_results=20)
+    assert result["new"] == 0
+    assert result["watermark"] == {"latest_published_at": None}
@@ -0,0 +1,60 @@
+"""Reddit post comments: the lean raw-JSON fetch and its public-API fallback"""
+
+from types import SimpleNamespace
+
+import api_clients
+
+
+class FakeForest(list):
+    def replace_more(self, limit=None):
+        self.replaced = limit
+
+
+class FakePost:
+    id = "abc"
+    title = "A post"
+    subreddit = "python"
+
+    def __init__(self, n):
+        self.comments = FakeForest(
+            SimpleNamespace(id=f"c{i}", body=f"comment {i}", score=i, author="someone", created_utc=0)
+            for i in range(n)
+        )
+
+
+def reddit(core=None):
+    client = api_clients.RedditClient.__new__(api_clients.RedditClient)
+    client.available = True
+    client.client = SimpleNamespace(_core=core) if core is not None else SimpleNamespace()
+    return client
+
+
+def test_lean_fetch_builds_records_from_raw_json():
+    class Core:
+        def request(self, method, path, params=None, timeout=None):
+            post = {"data": {"children": [{"data": {"title": "A post", "subreddit": "python"}}]}}
+            comments = {"data": {"children": [
+                {"kind": "t1", "data": {"id": "c1", "body": "hi", "score": 3, "author": None, "created_utc": 1}},
+                {"kind": "more", "data": {}}
+            ]}}
+            return post, comments
+
+    (comment,) = reddit(Core())._post_comments(FakePost(0), 5)
+    assert comment["id"] == "c1" and comment["author"] == "[deleted]" and comment["post_title"] == "A post"
+
+
+def test_missing_private_session_falls_back_to_comment_forest():
+    post = FakePost(8)
+    comments = reddit()._post_comments(post, 3)
+
+    assert [c["id"] for c in comments] == ["c0", "c1", "c2"]
+    assert post.comment_limit == 3 and post.comment_sort == "top"
+    assert post.comments.replaced == 0
+
+
+def test_changed_private_signature_falls_back_to_comment_forest():
+    class OldCore:
+        def request(self, method, path):
+            raise AssertionError("not reached")
+
+    assert len(reddit(OldCore())._post_comments(FakePost(2), 5)) == 2
@@ -0,0 +1,58 @@
+"""Circuit breaker permits and request hedging"""
+
+import asyncio
+import concurrent.futures
+import time
+
+import pytest
+
+from metrics import metrics
+from resilience import CLOSED, HALF_OPEN, CircuitBreaker, RequestHedger
+
+
+def test_half_open_permit_is_a_counted_probe():
+    breaker = CircuitBreaker("test-permit", min_calls=1, open_seconds=0, half_open_probes=1)
+    assert breaker.allow_request() == CLOSED
+    breaker.record_failure()
+
+    assert breaker.allow_request() == HALF_OPEN
+    assert breaker.allow_request() is None
+    breaker.release_probe()
+    assert breaker.allow_request() == HALF_OPEN
+
+
+def test_timed_out_attempts_are_recorded_apart_from_completed_calls():
+    hedger = RequestHedger(
+        "test-abandon", latency_metric="test_abandon_seconds", latency_labels={"outcome": "ok"},
+        default_delay=0.01, budget=1.0
+    )
+
+    async def never_finishes():
+        await asyncio.sleep(10)
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        hedger.run(never_finishes, timeout=0.2)
+
+    # The attempts are cancelled on the hedger's loop thread after run() gives up
+    for _ in range(100):
+        abandoned = metrics.get_summary("test_abandon_seconds", outcome="abandoned")
+        if abandoned is not None and abandoned.count == 2:  # primary and hedge
+            break
+        time.sleep(0.01)
+    assert abandoned is not None and abandoned.count == 2
+    assert metrics.get_summary("test_abandon_seconds", outcome="ok") is None
+
+
+def test_losing_attempt_is_cancelled_and_winner_returned():
+    hedger = RequestHedger(
+        "test-race", latency_metric="test_race_seconds", default_delay=0.01, budget=1.0
+    )
+    calls = []
+
+    async def attempt():
+        calls.append(len(calls))
+        await asyncio.sleep(1 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    assert hedger.run(attempt, timeout=2) == 2
+    assert metrics.get_summary("test_race_seconds", outcome="abandoned").count == 1
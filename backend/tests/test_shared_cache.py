@@ -0,0 +1,38 @@
+"""Shared cache backends: the interface and TTL behaviour"""
+
+import time
+
+import pytest
+
+from shared_cache import CacheBackend, create_cache_backend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    url = "memory://" if request.param == "memory" else f"sqlite:///{tmp_path / 'cache.db'}"
+    return create_cache_backend(url)
+
+
+def test_incomplete_backend_cannot_be_created():
+    class GetOnly(CacheBackend):
+        def get(self, namespace, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
+
+
+def test_round_trip_and_namespaces(cache):
+    cache.set("rewrite", "k", {"rewritten": "hi"}, ttl=60)
+    assert cache.get("rewrite", "k") == {"rewritten": "hi"}
+    assert cache.get("social", "k") is None
+    assert cache.contains("rewrite", "k")
+
+    cache.delete("rewrite", "k")
+    assert not cache.contains("rewrite", "k")
+
+
+def test_expired_entries_are_misses(cache):
+    cache.set("social", "k", [1, 2], ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get("social", "k") is None
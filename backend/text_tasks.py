@@ -0,0 +1,122 @@
+"""
+CPU-Bound Text Tasks
+Pure, picklable functions for sentiment, explanation scans and HTML parsing.
+They run in the shared process pool (see cpu_pool.py) or inline when it is not running.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+# ============================================================================
+# WORKER WARM-UP
+# ============================================================================
+
+def warm_up() -> bool:
+    """Process-pool initializer: load the TextBlob lexicon and the HTML parser once per worker"""
+    try:
+        from textblob import TextBlob
+        TextBlob("Warming up the sentiment lexicon").sentiment
+    except Exception:
+        pass
+    from bs4 import BeautifulSoup
+    BeautifulSoup("<html><title>warm</title></html>", "html.parser")
+    return True
+
+
+# ============================================================================
+# SENTIMENT
+# ============================================================================
+
+def sentiment_label(text: str) -> str:
+    """negative / neutral / positive from TextBlob polarity"""
+    try:
+        from textblob import TextBlob
+        polarity = TextBlob(text).sentiment.polarity
+    except Exception:
+        return "neutral"
+
+    if polarity < -0.3:
+        return "negative"
+    elif polarity > 0.3:
+        return "positive"
+    return "neutral"
+
+
+# ============================================================================
+# EXPLANATIONS
+# ============================================================================
+
+def explain_original(comment: str) -> List[str]:
+    """Explanations that depend only on the original comment (shared across tones)"""
+    explanations = []
+    original = comment.lower()
+
+    if any(word in original for word in ["trash", "suck", "terrible", "awful"]):
+        explanations.append("Removed harsh language for constructive tone")
+    if "wrong" in original or "stupid" in original:
+        explanations.append("Softened criticism to maintain respect")
+
+    return explanations
+
+def explain_rewrite(original_notes: List[str], comment: str, rewritten: str, tone: str,
+                    detected_sentiment: Optional[str]) -> List[str]:
+    """Combine the shared original notes with the per-rewrite explanations"""
+    explanations = list(original_notes)
+
+    if len(rewritten) > len(comment) * 1.3:
+        explanations.append("Added context and clarity")
+    if detected_sentiment == "negative" and tone in ["supportive", "empathetic"]:
+        explanations.append(f"Shifted from negative to {tone} sentiment")
+
+    if not explanations:
+        explanations.append(f"Adjusted phrasing to match {tone} tone")
+
+    return explanations
+
+
+# ============================================================================
+# HTML PARSING
+# ============================================================================
+
+def parse_opengraph(html: bytes, url: str) -> Dict[str, Any]:
+    """OpenGraph metadata (with <title>/description fallbacks) from a page"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+
+    metadata = {
+        "url": url,
+        "title": None,
+        "description": None,
+        "image": None,
+        "site_name": None
+    }
+
+    # Extract OpenGraph tags
+    og_tags = soup.find_all('meta', property=re.compile(r'^og:'))
+    for tag in og_tags:
+        prop = tag.get('property', '').replace('og:', '')
+        content = tag.get('content')
+
+        if prop in metadata:
+            metadata[prop] = content
+
+    # Fallback to regular meta tags
+    if not metadata['title']:
+        title_tag = soup.find('title')
+        if title_tag:
+            metadata['title'] = title_tag.text.strip()
+
+    if not metadata['description']:
+        desc_tag = soup.find('meta', attrs={'name': 'description'})
+        if desc_tag:
+            metadata['description'] = desc_tag.get('content')
+
+    return metadata
+
+def parse_trend_titles(html: bytes, limit: int = 10) -> List[str]:
+    """Trending topic names from a trends aggregator page"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Parse trending topics (structure may vary)
+    return [trend.text.strip() for trend in soup.find_all('a', class_='trend-title', limit=limit)]
@@ -0,0 +1,107 @@
+"""
+Incremental Fetch Watermarks
+Per-source high-water marks (Twitter since_id, Reddit fullnames, YouTube page tokens
+and latest publishedAt) plus the items fetched so far, so repeat polls only download
+what is new and merge it into the earlier results.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from metrics import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watermarks (
+    source TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    items TEXT NOT NULL,
+    refreshed_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class WatermarkStore:
+    """
+    SQLite-backed map of source -> (cursor state, merged items).
+
+    `max_age` bounds how long a cursor is trusted: after that a poll does a full
+    fetch (cursors can go stale, e.g. a deleted Reddit post or a since_id older
+    than the search window). Merged item lists are capped at `max_items`.
+    """
+
+    def __init__(self, db_path: str, max_items: int = 500, max_age: float = 6 * 3600):
+        self.db_path = db_path
+        self.max_items = max_items
+        self.max_age = max_age
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def cursor(self, source: str) -> Dict[str, Any]:
+        """Saved cursor state for `source`, or {} if there is none or it is too old to trust"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT state, refreshed_at FROM watermarks WHERE source = ?", (source,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.max_age:
+            return {}
+        return json.loads(row[0])
+
+    def merge(self, source: str, state: Dict[str, Any], new_items: List[Dict[str, Any]],
+              sort_key: str, key: str = "id", full_refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Save the new cursor state and merge `new_items` into the stored items
+        (deduplicated by `key`, newest first by `sort_key`). Returns the merged list.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT items, refreshed_at FROM watermarks WHERE source = ?", (source,)
+            ).fetchone()
+
+            merged = {item.get(key): item for item in (json.loads(row[0]) if row else [])}
+            merged.update({item.get(key): item for item in new_items})
+            items = sorted(merged.values(), key=lambda item: item.get(sort_key) or 0, reverse=True)
+            items = items[:self.max_items]
+
+            refreshed_at = now if full_refresh or row is None else row[1]
+            conn.execute(
+                "INSERT OR REPLACE INTO watermarks (source, state, items, refreshed_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (source, json.dumps(state), json.dumps(items, default=str), refreshed_at, now)
+            )
+
+        metrics.inc("incremental_polls_total", kind="full" if full_refresh else "incremental")
+        metrics.inc("incremental_new_items_total", len(new_items))
+        return items
+
+    def reset(self, source: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM watermarks WHERE source = ?", (source,))
+
+
+# ============================================================================
+# INITIALIZE GLOBAL WATERMARK STORE
+# ============================================================================
+
+watermarks = WatermarkStore(
+    os.getenv("WATERMARK_DB_PATH", "watermarks.db"),
+    max_items=int(os.getenv("WATERMARK_MAX_ITEMS", "500")),
+    max_age=float(os.getenv("WATERMARK_MAX_AGE_SECONDS", str(6 * 3600)))
+)